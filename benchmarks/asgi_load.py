@@ -0,0 +1,215 @@
+"""Throughput and tail latency of the sync (gunicorn) and ASGI (uvicorn) deployments.
+
+Seeds a database, starts each server as a subprocess, logs in as a seeded
+user and keeps --concurrency clients requesting --path for --seconds.
+Prints requests/sec and p50/p99 latency per mode. Clients reuse
+connections when the server allows it; gunicorn's sync workers close
+every connection, so their latencies include the reconnect, just as in
+production.
+
+--db-latency-ms adds a fixed wait to every SQL statement to stand in for
+the network hop to a remote database (see load_apps.py). With SQLite on the
+same machine, every statement is pure CPU and the async mode has nothing
+to overlap.
+
+    python -m benchmarks.asgi_load --tasks 100000 --concurrency 500 --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+MODES = {
+    "sync": lambda port, workers: [
+        sys.executable, "-m", "gunicorn", "-b", f"127.0.0.1:{port}", "-w", str(workers),
+        "--backlog", "4096", "benchmarks.load_apps:sync_app",
+    ],
+    "asgi": lambda port, workers: [
+        sys.executable, "-m", "uvicorn", "benchmarks.load_apps:asgi_app", "--port", str(port),
+        "--workers", str(workers), "--backlog", "4096", "--no-access-log", "--log-level", "warning",
+    ],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not become ready")
+
+
+def _login(port: int) -> str:
+    from .seed import PASSWORD
+
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/auth/login",
+        data=json.dumps({"username": "user1", "password": PASSWORD}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    return json.loads(urllib.request.urlopen(req).read())["access_token"]
+
+
+def start_server(mode: str, workers: int, env: dict):
+    """Start `mode` on a free port and wait until it answers; returns (process, port)."""
+    port = _free_port()
+    server = subprocess.Popen(MODES[mode](port, workers), env=env, stdout=subprocess.DEVNULL)
+    try:
+        _wait_ready(port)
+    except Exception:
+        server.terminate()
+        server.wait()
+        raise
+    return server, port
+
+
+def http_request(method: str, path: str, token: str = None, body: dict = None) -> bytes:
+    """A raw HTTP/1.1 request for the load driver."""
+    lines = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1"]
+    if token:
+        lines.append(f"Authorization: Bearer {token}")
+    payload = json.dumps(body).encode() if body is not None else b""
+    if body is not None:
+        lines += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    await reader.readexactly(int(headers.get("content-length", "0")))
+    return status, headers.get("connection", "").lower() != "close"
+
+
+async def _drive(port: int, request: bytes, clients: int, seconds: float):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal errors
+        writer = None
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                status, keep_alive = await _read_response(reader)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors += 1
+                writer = None
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, errors
+
+
+def _drive_process(args):
+    return asyncio.run(_drive(*args))
+
+
+def _percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def summarize(latencies, errors: int, seconds: float) -> dict:
+    """Throughput and latency percentiles (ms) of successful requests."""
+    latencies = sorted(latencies)
+    summary = {"requests": len(latencies), "errors": errors, "rps": len(latencies) / seconds}
+    for p in (50, 90, 95, 99):
+        summary[f"p{p}_ms"] = _percentile(latencies, p / 100) * 1000
+    summary["max_ms"] = latencies[-1] * 1000 if latencies else float("nan")
+    return summary
+
+
+def run_load(port: int, request: bytes, concurrency: int, seconds: float, procs: int) -> dict:
+    """Drive `concurrency` clients sending `request`, spread over `procs` processes."""
+    shares = [concurrency // procs + (i < concurrency % procs) for i in range(procs)]
+    with multiprocessing.Pool(procs) as pool:
+        results = pool.map(_drive_process, [(port, request, n, seconds) for n in shares if n])
+    return summarize([l for lats, _ in results for l in lats], sum(e for _, e in results), seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--workers", type=int, default=1, help="server processes per mode")
+    parser.add_argument("--client-procs", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--path", default="/tasks/?page_size=20")
+    parser.add_argument("--modes", default="sync,asgi")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="simulated per-statement DB round trip")
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'load.db')}",
+        # Measure the database path, not cache hits (the async reads bypass the cache)
+        RESPONSE_CACHE="off",
+        NOTIFICATIONS_ENABLED="false",
+        # One user drives all the load; admission control would turn it into 429s/503s
+        RATE_LIMIT="off",
+        CONCURRENCY_LIMITS="",
+        JWT_SECRET_KEY="benchmark-jwt-secret-of-at-least-32-bytes",
+        BENCH_DB_LATENCY_MS=str(args.db_latency_ms),
+    )
+    os.environ.update(env)
+
+    from task_manager.app import create_app, db
+    from task_manager.app.schema import upgrade_database
+
+    from .seed import seed
+
+    app = create_app()
+    with app.app_context():
+        upgrade_database()
+        seed(db.engine, users=10, projects_per_user=5, tasks=args.tasks, create_schema=False)
+        db.engine.dispose()
+
+    print(f"{args.concurrency} clients, {args.seconds:.0f}s, GET {args.path}, {args.workers} worker(s), "
+          f"+{args.db_latency_ms:g} ms per statement")
+    print(f"{'mode':<6}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode in args.modes.split(","):
+        server, port = start_server(mode, args.workers, env)
+        try:
+            request = http_request("GET", args.path, token=_login(port))
+            r = run_load(port, request, args.concurrency, args.seconds, args.client_procs)
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{mode:<6}{r['requests']:>10}{r['rps']:>10.1f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Per-endpoint throughput, latency percentiles and SQL statement counts.
+
+Seeds a database (or reuses one that already holds a dataset), then drives
+every endpoint in ENDPOINTS twice:
+
+- in-process through the Flask test client, one request at a time, counting
+  the statements each request sends;
+- over HTTP against gunicorn (``--server asgi`` for uvicorn) with
+  --concurrency clients for --seconds per endpoint.
+
+It also records process cold-start times (see startup.py).
+
+The response cache is off unless --response-cache is given, so the numbers
+measure the database path. Results, the commit and the dataset size are
+written to --out as JSON; ``compare`` prints the change between two runs:
+
+    python -m benchmarks.endpoints --url sqlite:////tmp/bench.db --tasks 1000000 --out before.json
+    python -m benchmarks.endpoints --url sqlite:////tmp/bench.db --out after.json
+    python -m benchmarks.endpoints compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from .asgi_load import http_request, run_load, start_server, summarize
+from .startup import measure as measure_startup, print_results as print_startup
+
+# name -> (method, path, JSON body); {task_id} and {project_id} belong to
+# user1. Nothing here imports task_manager, whose config is read on import,
+# before main() has pointed DATABASE_URL at the benchmark database.
+ENDPOINTS = {
+    "login": ("POST", "/auth/login", {"username": "user1", "password": "benchmark"}),
+    "me": ("GET", "/auth/me", None),
+    "list_tasks": ("GET", "/tasks/?page_size=20", None),
+    "list_tasks cursor": ("GET", "/tasks/?page_size=20&cursor=", None),
+    "list_tasks status+priority": ("GET", "/tasks/?status=todo&priority=high&page_size=20", None),
+    "list_tasks sort=due_date": ("GET", "/tasks/?sort=due_date&page_size=20", None),
+    "list_tasks search": ("GET", "/tasks/?q=invoice&page_size=20", None),
+    "get_task": ("GET", "/tasks/{task_id}", None),
+    "task stats": ("GET", "/tasks/stats", None),
+    "list_projects": ("GET", "/projects/", None),
+    "get_project": ("GET", "/projects/{project_id}", None),
+    "project stats": ("GET", "/projects/{project_id}/stats", None),
+}
+WARMUP = 5
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_dataset(app, users, projects_per_user, tasks):
+    """Migrate and seed the app's database (unless it already holds users).
+
+    Returns the row counts and the ids to hit.
+    """
+    from sqlalchemy import func, select
+
+    from task_manager.app import db
+    from task_manager.app.models import Project, Task, User
+    from task_manager.app.schema import upgrade_database
+
+    from .seed import seed
+
+    with app.app_context():
+        upgrade_database()
+        engine = db.engine
+        with engine.connect() as conn:
+            existing = conn.scalar(select(func.count(User.id)))
+        if not existing:
+            seed(engine, users=users, projects_per_user=projects_per_user, tasks=tasks, create_schema=False)
+        with engine.connect() as conn:
+            counts = {
+                "users": conn.scalar(select(func.count(User.id))),
+                "projects": conn.scalar(select(func.count(Project.id))),
+                "tasks": conn.scalar(select(func.count(Task.id))),
+            }
+            user_id = conn.scalar(select(User.id).where(User.username == "user1"))
+            # user1's busiest project, so get_project renders a realistic task list
+            project_id, _ = conn.execute(
+                select(Task.project_id, func.count(Task.id))
+                .join(Project, Task.project_id == Project.id)
+                .where(Project.owner_id == user_id)
+                .group_by(Task.project_id)
+                .order_by(func.count(Task.id).desc())
+                .limit(1)
+            ).one()
+            task_id = conn.scalar(select(func.min(Task.id)).where(Task.project_id == project_id))
+        engine.dispose()
+    return counts, {"project_id": project_id, "task_id": task_id}
+
+
+def run_in_process(app, ids, requests: int) -> dict:
+    """Sequential requests through the test client, with statements counted per request."""
+    from task_manager.app.query_counter import count_queries
+
+    client = app.test_client()
+    method, path, body = ENDPOINTS["login"]
+    token = client.post(path, json=body).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results = {}
+    for name, (method, path, body) in ENDPOINTS.items():
+        path = path.format(**ids)
+        latencies, statements, errors = [], [], 0
+        with app.app_context():
+            for i in range(WARMUP + requests):
+                with count_queries() as counter:
+                    start = time.perf_counter()
+                    resp = client.open(path, method=method, json=body, headers=headers)
+                    elapsed = time.perf_counter() - start
+                if i < WARMUP:
+                    continue
+                if resp.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append(elapsed)
+                statements.append(counter.count)
+        result = summarize(latencies, errors, sum(latencies) or 1.0)
+        result["sql_statements"] = {
+            "median": statistics.median(statements) if statements else None,
+            "max": max(statements, default=None),
+        }
+        results[name] = result
+        _print_row(name, result)
+    return results
+
+
+def run_http(mode: str, env: dict, ids, concurrency: int, seconds: float, workers: int, procs: int) -> dict:
+    from .asgi_load import _login
+
+    server, port = start_server(mode, workers, env)
+    try:
+        token = _login(port)
+        results = {}
+        for name, (method, path, body) in ENDPOINTS.items():
+            request = http_request(method, path.format(**ids), token=token, body=body)
+            results[name] = run_load(port, request, concurrency, seconds, procs)
+            _print_row(name, results[name])
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def _print_header(title: str):
+    print(f"\n{title}")
+    print(f"{'endpoint':<28}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'SQL':>6}{'errors':>8}")
+
+
+def _print_row(name: str, r: dict):
+    sql = r.get("sql_statements", {}).get("max")
+    sql = "" if sql is None else sql
+    print(f"{name:<28}{r['rps']:>10.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{sql:>6}{r['errors']:>8}")
+
+
+def compare(baseline_path: str, current_path: str):
+    """Print per-endpoint changes in throughput, p99 and statement counts between two result files."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    print(f"{baseline['meta']['commit']} -> {current['meta']['commit']}")
+    for section in ("in_process", "http"):
+        if not baseline.get(section) or not current.get(section):
+            continue
+        print(f"\n{section}")
+        print(f"{'endpoint':<28}{'req/s':>18}{'p99 ms':>22}{'SQL':>10}")
+        for name, new in current[section].items():
+            old = baseline[section].get(name)
+            if old is None:
+                continue
+            rps = (new["rps"] / old["rps"] - 1) * 100 if old["rps"] else float("nan")
+            sql_old = (old.get("sql_statements") or {}).get("max")
+            sql_new = (new.get("sql_statements") or {}).get("max")
+            sql = f"{sql_old}->{sql_new}" if sql_old is not None else ""
+            print(f"{name:<28}{new['rps']:>10.1f} ({rps:+5.1f}%)"
+                  f"{old['p99_ms']:>10.2f}->{new['p99_ms']:<9.2f}{sql:>10}")
+    for case, new in (current.get("startup") or {}).items():
+        old = (baseline.get("startup") or {}).get(case)
+        if old:
+            print(f"startup {case:<20}{old['total']:>10.1f} -> {new['total']:.1f} ms")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="benchmarks.endpoints compare")
+        parser.add_argument("baseline")
+        parser.add_argument("current")
+        args = parser.parse_args(argv[1:])
+        return compare(args.baseline, args.current)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:////tmp/task_manager_bench.db",
+                        help="database to seed or reuse (SQLite or Postgres)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects-per-user", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=200, help="in-process requests per endpoint")
+    parser.add_argument("--seconds", type=float, default=10.0, help="HTTP load per endpoint")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--server", choices=("sync", "asgi"), default="sync")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--client-procs", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--response-cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--out", default="benchmark-results.json")
+    args = parser.parse_args(argv)
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.url,
+        RESPONSE_CACHE=os.environ.get("RESPONSE_CACHE", "memory") if args.response_cache else "off",
+        NOTIFICATIONS_ENABLED="false",
+        # One user drives all the load; admission control would turn it into 429s/503s
+        RATE_LIMIT="off",
+        CONCURRENCY_LIMITS="",
+        JWT_SECRET_KEY=os.environ.get("JWT_SECRET_KEY", "benchmark-jwt-secret-of-at-least-32-bytes"),
+    )
+    os.environ.update(env)
+
+    from task_manager.app import create_app
+
+    app = create_app()
+    counts, ids = prepare_dataset(app, args.users, args.projects_per_user, args.tasks)
+    print(f"{counts['users']} users, {counts['projects']} projects, {counts['tasks']} tasks in {args.url}")
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0],
+            "dataset": counts,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "response_cache": args.response_cache,
+            "settings": {k: getattr(args, k) for k in ("requests", "seconds", "concurrency", "server", "workers")},
+        },
+    }
+    _print_header(f"in-process, {args.requests} sequential requests per endpoint")
+    results["in_process"] = run_in_process(app, ids, args.requests)
+    with app.app_context():
+        from task_manager.app import db
+        db.engine.dispose()
+
+    print("\nstartup, median of 3 fresh processes")
+    results["startup"] = measure_startup(env, runs=3)
+    print_startup(results["startup"])
+
+    if not args.skip_http:
+        _print_header(f"HTTP ({args.server}), {args.concurrency} clients x {args.seconds:.0f}s per endpoint")
+        results["http"] = run_http(args.server, env, ids, args.concurrency, args.seconds,
+                                   args.workers, args.client_procs)
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""WSGI/ASGI apps for benchmarks.asgi_load with simulated database latency.
+
+BENCH_DB_LATENCY_MS adds a fixed wait to every statement, standing in for
+the network round trip to a remote Postgres. The sync app sleeps, blocking
+its worker as a real round trip would. The ASGI app awaits the wait, so the
+event loop keeps serving other requests, as it does with asyncpg.
+
+Loaded by name from the server command line (module attributes are built on
+first access):
+
+    gunicorn benchmarks.load_apps:sync_app
+    uvicorn benchmarks.load_apps:asgi_app
+"""
+import asyncio
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.util import await_only
+
+
+def _add_latency(engine, is_async=False):
+    delay = float(os.getenv("BENCH_DB_LATENCY_MS", "0")) / 1000
+    if delay <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _wait(conn, cursor, statement, parameters, context, executemany):
+        # Async engines run events inside SQLAlchemy's greenlet on the event loop
+        if is_async:
+            await_only(asyncio.sleep(delay))
+        else:
+            time.sleep(delay)
+
+
+def __getattr__(name):
+    from task_manager.app import create_app, db
+
+    if name not in ("sync_app", "asgi_app"):
+        raise AttributeError(name)
+    app = create_app()
+    with app.app_context():
+        _add_latency(db.engine)
+    if name == "sync_app":
+        globals()[name] = app
+        return app
+
+    from task_manager.app.asgi import create_asgi_app
+
+    asgi_app = create_asgi_app(app)
+    _add_latency(asgi_app.engine.sync_engine, is_async=True)
+    globals()[name] = asgi_app
+    return asgi_app
@@ -0,0 +1,115 @@
+"""Compare query plans and latency of the hot queries with and without indexes.
+
+Seeds (or reuses) a database, drops the ``ix_*`` indexes declared on the
+task and project tables, explains and times each query, recreates the indexes and repeats.
+
+    python -m benchmarks.query_plans --url sqlite:////tmp/bench.db --tasks 1000000
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy import create_engine, inspect, select
+
+from task_manager.app.models import PRIORITY_RANK, STATUS_RANK, Project, Task
+
+from .seed import seed
+
+REPEAT = 5
+
+
+def hot_queries(owner_id: int, project_id: int, assignee_id: int):
+    """Statements mirroring routes/tasks.py, routes/projects.py and the overdue job."""
+    owned = select(Task).join(Project, Task.project_id == Project.id).where(Project.owner_id == owner_id)
+    return {
+        "list_tasks default": owned.order_by(Task.created_at.desc(), Task.id.desc()).limit(20),
+        "list_tasks status+project": owned.where(Task.project_id == project_id, Task.status_rank == STATUS_RANK["todo"])
+        .order_by(Task.created_at.desc(), Task.id.desc()).limit(20),
+        "list_tasks sort=due_date": owned.order_by(Task.due_date.is_(None), Task.due_date.asc(), Task.id.asc()).limit(20),
+        "list_tasks priority filter": owned.where(Task.priority_rank == PRIORITY_RANK["high"])
+        .order_by(Task.created_at.desc(), Task.id.desc()).limit(20),
+        "list_tasks sort=priority": owned.order_by(Task.priority_rank.desc(), Task.id.desc()).limit(20),
+        "list_projects": select(Project).where(Project.owner_id == owner_id)
+        .order_by(Project.created_at.desc(), Project.id.desc()),
+        "get_project tasks": select(Task).where(Task.project_id == project_id).order_by(Task.created_at.desc()),
+        "overdue summary": select(Task).where(Task.assigned_to == assignee_id, Task.due_date < date.today())
+        .order_by(Task.due_date.asc()),
+    }
+
+
+def _explain(conn, stmt):
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+        return [row[-1] for row in rows]
+    return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}").all()]
+
+
+def _time(conn, stmt):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        conn.execute(stmt).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+# Only the tables the hot queries read; indexes elsewhere stay untouched
+TABLES = (Task.__table__, Project.__table__)
+
+
+def _managed_indexes():
+    return [ix for table in TABLES for ix in table.indexes if ix.name.startswith("ix_")]
+
+
+def run_phase(engine, queries):
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            results[name] = {"plan": _explain(conn, stmt), "median_ms": round(_time(conn, stmt), 3)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:////tmp/task_manager_bench.db")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects-per-user", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    if not args.skip_seed:
+        print(f"Seeding {args.tasks} tasks...")
+        seed(engine, args.users, args.projects_per_user, args.tasks)
+
+    queries = hot_queries(owner_id=1, project_id=1, assignee_id=1)
+    indexes = _managed_indexes()
+    existing = {ix["name"] for table in TABLES for ix in inspect(engine).get_indexes(table.name)}
+    for ix in indexes:
+        if ix.name in existing:
+            ix.drop(engine)
+    before = run_phase(engine, queries)
+    for ix in indexes:
+        ix.create(engine)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    after = run_phase(engine, queries)
+
+    for name in queries:
+        print(f"\n== {name}: {before[name]['median_ms']} ms -> {after[name]['median_ms']} ms")
+        print("  before: " + "\n          ".join(before[name]["plan"]))
+        print("  after:  " + "\n          ".join(after[name]["plan"]))
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"tasks": args.tasks, "before": before, "after": after}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Synthetic dataset generator for benchmarks.
+
+Writes straight through SQLAlchemy Core executemany batches so millions of
+tasks load in seconds, bypassing the ORM and the HTTP API.
+
+    python -m benchmarks.seed --url sqlite:////tmp/bench.db --tasks 1000000
+"""
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from werkzeug.security import generate_password_hash
+
+from task_manager.app import db
+from task_manager.app.models import PRIORITY_RANK, STATUS_RANK, Project, Task, User
+from task_manager.app.stats import rebuild as rebuild_stats
+
+STATUS_WEIGHTS = {"todo": 50, "in_progress": 30, "done": 20}
+PRIORITY_WEIGHTS = {"low": 30, "medium": 50, "high": 20}
+# Task titles are "<verb> <noun> #<id>" so full-text search has realistic selectivity
+TITLE_VERBS = ("Review", "Fix", "Write", "Update", "Plan", "Test", "Deploy", "Design", "Refactor", "Document")
+TITLE_NOUNS = ("invoice", "login page", "release notes", "database backup", "onboarding flow",
+               "API client", "search index", "budget report", "test suite", "dashboard")
+BATCH_SIZE = 10_000
+PASSWORD = "benchmark"
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def seed(engine, users=100, projects_per_user=10, tasks=100_000, seed_value=42, create_schema=True):
+    """Populate `engine` with users, projects and tasks; returns the row counts.
+
+    Every user gets the same password (``PASSWORD``) so load drivers can log in.
+    Task status/priority follow STATUS_WEIGHTS/PRIORITY_WEIGHTS, ~30% have no
+    due date, the rest fall within two months either side of today (so a
+    healthy share is overdue), and ~20% are unassigned.
+    """
+    rng = random.Random(seed_value)
+    if create_schema:
+        db.metadata.create_all(engine)
+    pw_hash = generate_password_hash(PASSWORD)
+    today = date.today()
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"id": u, "username": f"user{u}", "email": f"user{u}@bench.local", "password": pw_hash}
+            for u in range(1, users + 1)
+        ])
+        project_rows = [
+            {
+                "id": (u - 1) * projects_per_user + n + 1,
+                "name": f"Project {n} of user{u}",
+                "owner_id": u,
+                "created_at": now - timedelta(days=rng.randint(0, 365)),
+                "updated_at": now,
+            }
+            for u in range(1, users + 1)
+            for n in range(projects_per_user)
+        ]
+        conn.execute(insert(Project.__table__), project_rows)
+
+    n_projects = len(project_rows)
+    task_table = Task.__table__
+    written = 0
+    while written < tasks:
+        batch = []
+        for i in range(written, min(tasks, written + BATCH_SIZE)):
+            due = None if rng.random() < 0.3 else today + timedelta(days=rng.randint(-60, 60))
+            status = _weighted(rng, STATUS_WEIGHTS)
+            priority = _weighted(rng, PRIORITY_WEIGHTS)
+            created_at = now - timedelta(seconds=rng.randint(0, 365 * 86400))
+            batch.append({
+                "id": i + 1,
+                "title": f"{rng.choice(TITLE_VERBS)} {rng.choice(TITLE_NOUNS)} #{i + 1}",
+                "description": "Synthetic benchmark task" if rng.random() < 0.5 else None,
+                "status": status,
+                "priority": priority,
+                "status_rank": STATUS_RANK[status],
+                "priority_rank": PRIORITY_RANK[priority],
+                "due_date": due,
+                "project_id": rng.randint(1, n_projects),
+                "assigned_to": None if rng.random() < 0.2 else rng.randint(1, users),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(task_table), batch)
+        written += len(batch)
+
+    with engine.begin() as conn:
+        rebuild_stats(conn)
+
+    if engine.dialect.name == "postgresql":
+        # Explicit ids above don't advance the serial sequences
+        with engine.begin() as conn:
+            for table in ("user", "project", "task"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+                )
+
+    return {"users": users, "projects": n_projects, "tasks": written}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:////tmp/task_manager_bench.db")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects-per-user", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    counts = seed(engine, args.users, args.projects_per_user, args.tasks, args.seed)
+    print(f"Seeded {counts['users']} users, {counts['projects']} projects, {counts['tasks']} tasks into {args.url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Throughput of the task list serialization paths.
+
+Compares ORM hydration + task_to_dict + Flask's stdlib JSON provider with
+column-tuple rows + task_row_to_dict under the stdlib and orjson providers,
+for 100-, 1k- and 10k-task payloads.
+
+    python -m benchmarks.serialization
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import joinedload
+
+SIZES = (100, 1_000, 10_000)
+
+
+def _rate(fn, min_seconds=1.0):
+    """Calls per second of `fn`, measured over at least `min_seconds`."""
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0, help="measurement time per case")
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'serialization.db')}"
+
+    from task_manager.app import create_app, db
+    from task_manager.app.json_provider import OrjsonProvider, orjson
+    from task_manager.app.models import Project, Task, User
+    from task_manager.app.routes.tasks import TASK_LIST_COLUMNS, task_row_to_dict, task_to_dict
+    from task_manager.app.schema import upgrade_database
+
+    from .seed import seed
+
+    app = create_app()
+    providers = {"stdlib": DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+
+    with app.app_context():
+        upgrade_database()
+        seed(db.engine, users=10, projects_per_user=5, tasks=max(SIZES), create_schema=False)
+
+        def orm_page(n):
+            tasks = (
+                Task.query.options(joinedload(Task.project), joinedload(Task.assignee))
+                .order_by(Task.id).limit(n).all()
+            )
+            return [task_to_dict(t, include_refs=True) for t in tasks]
+
+        def row_page(n):
+            rows = (
+                db.session.query(*TASK_LIST_COLUMNS)
+                .join(Project, Task.project_id == Project.id)
+                .outerjoin(User, Task.assigned_to == User.id)
+                .order_by(Task.id).limit(n).all()
+            )
+            return [task_row_to_dict(r) for r in rows]
+
+        cases = [("orm + stdlib", orm_page, providers["stdlib"])]
+        cases += [(f"rows + {name}", row_page, provider) for name, provider in providers.items()]
+
+        print("tasks serialized per second, by page size")
+        print(f"{'case':<16}" + "".join(f"{f'{n:,}-task page':>18}" for n in SIZES))
+        for label, fetch, provider in cases:
+            rates = []
+            for n in SIZES:
+                def run():
+                    provider.response(fetch(n)).get_data()
+                    db.session.expunge_all()
+                rates.append(_rate(run, args.seconds) * n)
+            print(f"{label:<16}" + "".join(f"{r:>18,.0f}" for r in rates))
+
+
+if __name__ == "__main__":
+    main()
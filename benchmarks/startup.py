@@ -0,0 +1,104 @@
+"""Cold-start time of an API process and a Celery worker.
+
+Each case runs in a fresh interpreter against an already migrated SQLite
+database and reports, as medians over --runs:
+
+- total: process spawn until ready, including interpreter startup;
+- import: importing the app package (or the Celery app);
+- create: create_app();
+- first_request: the first GET /healthz through the test client.
+
+``api+migrate`` sets MIGRATE_ON_STARTUP, i.e. the old behaviour of checking
+the schema through Alembic on every process start.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CASES = {
+    "api": {},
+    "api+migrate": {"MIGRATE_ON_STARTUP": "true"},
+    "worker": {},
+}
+
+
+def _child(case: str):
+    start = time.perf_counter()
+    timings = {}
+    if case == "worker":
+        try:
+            import celery  # noqa: F401
+        except ImportError:
+            print(json.dumps(None))
+            return
+        import task_manager.celery_app  # noqa: F401
+        timings["import"] = time.perf_counter() - start
+    else:
+        from task_manager.app import create_app
+        timings["import"] = time.perf_counter() - start
+        mark = time.perf_counter()
+        app = create_app()
+        timings["create"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        app.test_client().get("/healthz")
+        timings["first_request"] = time.perf_counter() - mark
+    print(json.dumps(timings))
+
+
+def measure(env: dict, runs: int = 5) -> dict:
+    """Median startup timings (ms) per case; the database in `env` must be migrated."""
+    results = {}
+    for case, extra in CASES.items():
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, "-W", "ignore", "-m", "benchmarks.startup", "--child", case],
+                env={**env, **extra}, capture_output=True, text=True, check=True,
+            )
+            total = time.perf_counter() - start
+            timings = json.loads(out.stdout.strip().splitlines()[-1])
+            if timings is None:
+                break
+            samples.append({"total": total, **timings})
+        if samples:
+            results[case] = {k: statistics.median(s[k] for s in samples) * 1000 for k in samples[0]}
+    return results
+
+
+def print_results(results: dict):
+    print(f"{'case':<14}{'total ms':>10}{'import ms':>11}{'create ms':>11}{'first req ms':>14}")
+    for case, r in results.items():
+        cells = [f"{r[k]:.1f}" if k in r else "-" for k in ("total", "import", "create", "first_request")]
+        print(f"{case:<14}{cells[0]:>10}{cells[1]:>11}{cells[2]:>11}{cells[3]:>14}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=sorted(CASES), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return _child(args.child)
+
+    tmpdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'startup.db')}",
+        NOTIFICATIONS_ENABLED="false",
+        CELERY_BROKER_URL=os.environ.get("CELERY_BROKER_URL", "memory://"),
+    )
+    subprocess.run([sys.executable, "-W", "ignore", "-m", "task_manager.manage"], env=env, check=True,
+                   capture_output=True)
+    print_results(measure(env, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,124 @@
-from flask import Flask, g
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import JWTManager
 from ..config import Config
 
 db = SQLAlchemy()
 jwt = JWTManager()
 
-def create_app():
+# Schema changes are not applied here: run `python -m task_manager.manage`
+# once per deploy (see schema.py), or set MIGRATE_ON_STARTUP for local use.
+
+def _create_base_app():
+    """Config, database engine and mailer: what both the API and the Celery worker need."""
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    from .db_pool import engine_options, init_engine
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app)
     db.init_app(app)
+    init_engine(app)
+
+    from .mailer import init_mail
+    init_mail(app)
+
+    if app.config["MIGRATE_ON_STARTUP"]:
+        with app.app_context():
+            from .schema import upgrade_database
+            upgrade_database()
+    return app
+
+
+def create_worker_app():
+    """App for Celery workers: no blueprints, JWT or request hooks.
+
+    The response cache and change feed are set up so background jobs can
+    invalidate shared (Redis) caches and wake other processes' streams.
+    """
+    app = _create_base_app()
+
+    from .response_cache import init_response_cache
+    init_response_cache(app)
+
+    from .changes import init_change_feed
+    init_change_feed(app)
+
+    # Slow-query logging only; there are no requests to time
+    from .instrumentation import instrument_engine
+    with app.app_context():
+        instrument_engine(db.engine, app)
+    return app
+
+
+def create_app():
+    app = _create_base_app()
+
+    if app.config["PROXY_FIX_X_FOR"]:
+        # Client addresses (rate limits, logs) from the proxies' X-Forwarded-For
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"])
+
+    from .json_provider import init_json
+    init_json(app)
     jwt.init_app(app)
-    # Mail/Celery removed
+
+    # First before_request hook, so the request timer covers the others
+    from .instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    from .identity import init_identity
+    init_identity(app)
+
+    # After identity: limits are keyed on the user it attaches
+    from .admission import init_admission
+    init_admission(app)
+
+    from .passwords import init_passwords
+    init_passwords(app)
+
+    from .authz import init_authz
+    init_authz(app)
+
+    from .db_pool import pool_status
+    from .response_cache import cache_stats, init_response_cache
+    init_response_cache(app)
+
+    from .changes import init_change_feed
+    init_change_feed(app)
+
+    from .notifications import notifications_enabled, start_background_drainer
+    if notifications_enabled(app.config) and not app.config["CELERY_BROKER_URL"]:
+        # No broker to run the beat drain task; drain the outbox in-process
+        start_background_drainer(app)
+
+    if not app.config["CELERY_BROKER_URL"]:
+        # Likewise for project delete/archive/restore jobs too big for one request
+        from .project_jobs import start_background_runner
+        start_background_runner(app)
 
     # Import and register blueprints once
     from .routes.auth import auth_bp
+    from .routes.changes import changes_bp
     from .routes.projects import projects_bp
     from .routes.tasks import tasks_bp
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(projects_bp, url_prefix="/projects")
     app.register_blueprint(tasks_bp, url_prefix="/tasks")
+    app.register_blueprint(changes_bp, url_prefix="/changes")
 
-    # Attach user_id from JWT (if present) to flask.g
-    @app.before_request
-    def attach_user_from_jwt():
-        try:
-            verify_jwt_in_request(optional=True)
-            ident = get_jwt_identity()
-            try:
-                g.user_id = int(ident) if ident is not None else None
-            except (TypeError, ValueError):
-                g.user_id = None
-        except Exception:
-            g.user_id = None
     @app.get("/")
     def index():
         return {
             "message": "Task Manager API",
-            "endpoints": ["/auth", "/projects", "/tasks", "/healthz"],
+            "endpoints": ["/auth", "/projects", "/tasks", "/changes", "/healthz"],
         }, 200
 
     @app.get("/healthz")
     def healthz():
-        return {"status": "ok"}, 200
+        return {"status": "ok", "db_pool": pool_status(), "response_cache": cache_stats()}, 200
 
     @app.get("/favicon.ico")
     def favicon():
         return "", 204
 
-    # Auto-create tables inside container if they don't exist yet
-    with app.app_context():
-        try:
-            from .models import User, Project, Task  # noqa: F401
-            db.create_all()
-        except Exception as e:
-            app.logger.error("DB initialization failed: %s", e)
-
-    return app
\ No newline at end of file
+    return app
@@ -0,0 +1,256 @@
+"""Per-client token-bucket rate limits (429) and per-endpoint concurrency limits (503)."""
+import math
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+from .cache import TTLCache
+
+EXTENSION_KEY = 'admission'
+
+DEFAULT_TARGET = 'default'
+
+PERIODS = {
+    'second': 1, 's': 1,
+    'minute': 60, 'm': 60,
+    'hour': 3600, 'h': 3600,
+    'day': 86400, 'd': 86400,
+}
+
+
+class Limit:
+    __slots__ = ('rate', 'burst')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+
+    @property
+    def refill_seconds(self) -> float:
+        """Time for an empty bucket to fill up again."""
+        return self.burst / self.rate
+
+
+def parse_limit(spec: str):
+    """``"10/minute"`` or ``"20/second:40"`` as a Limit; None for ``"off"``."""
+    spec = spec.strip().lower()
+    if spec == 'off':
+        return None
+    try:
+        amount, _, rest = spec.partition('/')
+        period, _, burst = rest.partition(':')
+        count = int(amount)
+        limit = Limit(count / PERIODS[period.strip()], float(burst) if burst else float(count))
+    except (KeyError, ValueError):
+        raise RuntimeError(f"Invalid rate limit {spec!r}, expected e.g. '10/minute' or '20/second:40'") from None
+    if count <= 0 or limit.burst < 1:
+        raise RuntimeError(f"Invalid rate limit {spec!r}: needs at least one request")
+    return limit
+
+
+def parse_slots(spec: str) -> int:
+    """A concurrency limit: the number of requests allowed in flight per process."""
+    try:
+        slots = int(spec)
+    except ValueError:
+        slots = 0
+    if slots < 1:
+        raise RuntimeError(f"Invalid concurrency limit {spec.strip()!r}, expected a positive integer")
+    return slots
+
+
+def parse_entries(value, parse) -> dict:
+    """``"auth.login=10/minute, tasks=20/second"`` (or an equivalent dict) as ``{target: parse(spec)}``."""
+    if isinstance(value, dict):
+        return {target: parse(str(spec)) for target, spec in value.items()}
+    entries = {}
+    for entry in (value or '').split(','):
+        if not entry.strip():
+            continue
+        target, sep, spec = entry.partition('=')
+        if not sep or not target.strip():
+            raise RuntimeError(f"Invalid limit entry {entry.strip()!r}, expected <endpoint or blueprint>=<limit>")
+        entries[target.strip()] = parse(spec)
+    return entries
+
+
+def take_token(tokens: float, elapsed: float, limit: Limit):
+    """Refill a bucket for `elapsed` seconds and take one token.
+
+    Returns ``(tokens_left, wait)``. `wait` is 0 when the request is allowed,
+    else the seconds until a token is available (the bucket is unchanged).
+    """
+    tokens = min(limit.burst, tokens + max(elapsed, 0.0) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / limit.rate
+
+
+class MemoryBuckets:
+    def __init__(self, maxsize: int, ttl: float):
+        # An idle bucket expires once it would have refilled anyway; evicting
+        # a busier one under pressure only ever errs towards letting through
+        self._buckets = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, at = self._buckets.get(key) or (limit.burst, now)
+            tokens, wait = take_token(tokens, now - at, limit)
+            self._buckets.set(key, (tokens, now))
+        return wait
+
+
+# Same arithmetic as take_token, atomically on the server's clock. The wait
+# comes back as a string: Lua numbers returned to Redis are truncated.
+TAKE_SCRIPT = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or burst
+local at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - at, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    def __init__(self, url: str, prefix: str = 'taskmgr:rl:'):
+        try:
+            import redis
+        except ImportError:  # pragma: no cover
+            raise RuntimeError("RATE_LIMIT=redis but the redis package is not installed") from None
+        self._client = redis.Redis.from_url(url, socket_timeout=1)
+        self._take = self._client.register_script(TAKE_SCRIPT)
+        self._prefix = prefix
+
+    def take(self, key: str, limit: Limit) -> float:
+        try:
+            return float(self._take(keys=[self._prefix + key], args=[limit.rate, limit.burst]))
+        except Exception:
+            # A limiter outage must not take the API down with it
+            current_app.logger.warning("Rate limit backend unavailable, admitting request", exc_info=True)
+            return 0.0
+
+
+class Admission:
+    def __init__(self, buckets, default, rate_limits: dict, concurrency: dict, retry_after: int, by_ip: bool):
+        self.buckets = buckets
+        self.by_ip = by_ip
+        self.default = default
+        self.rate_limits = rate_limits
+        self.retry_after = retry_after
+        self.slots = {target: threading.BoundedSemaphore(n) for target, n in concurrency.items()}
+
+    def rate_limit(self):
+        """``(target, limit)`` for the current request; limit is None when it is not limited."""
+        if request.endpoint in self.rate_limits:
+            return request.endpoint, self.rate_limits[request.endpoint]
+        if request.blueprint in self.rate_limits:
+            return request.blueprint, self.rate_limits[request.blueprint]
+        if request.blueprint:
+            return DEFAULT_TARGET, self.default
+        return None, None
+
+    def slot(self):
+        return self.slots.get(request.endpoint) or self.slots.get(request.blueprint)
+
+
+LOGIN_ENDPOINT = 'auth.login'
+
+
+def client_keys(by_ip: bool) -> list:
+    """Buckets the current request draws from; none leaves it unlimited.
+
+    The JWT user; else, for logins, the submitted username (guessing one
+    account's password is limited whatever the address), plus the remote
+    address when it can be trusted.
+    """
+    user_id = g.get('user_id')
+    if user_id:
+        return [f"user:{user_id}"]
+    keys = []
+    if request.endpoint == LOGIN_ENDPOINT:
+        data = request.get_json(silent=True)
+        username = data.get('username') if isinstance(data, dict) else None
+        if isinstance(username, str) and username.strip():
+            keys.append(f"login:{username.strip()}")
+    if by_ip:
+        keys.append(f"ip:{request.remote_addr}")
+    return keys
+
+
+def too_many_requests(retry_after: float):
+    resp = jsonify({'error': 'Too many requests, retry later'})
+    resp.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return resp, 429
+
+
+def busy_response(retry_after: int = 1):
+    resp = jsonify({'error': 'Server busy, retry shortly'})
+    resp.headers['Retry-After'] = str(retry_after)
+    return resp, 503
+
+
+def _admit():
+    admission = current_app.extensions[EXTENSION_KEY]
+    clients = client_keys(admission.by_ip) if admission.buckets is not None else []
+    if clients:
+        target, limit = admission.rate_limit()
+        if limit is not None:
+            wait = max(admission.buckets.take(f"{target}:{client}", limit) for client in clients)
+            if wait > 0:
+                return too_many_requests(wait)
+    slot = admission.slot()
+    if slot is not None:
+        if not slot.acquire(blocking=False):
+            return busy_response(admission.retry_after)
+        g.admission_slot = slot
+
+
+def _release(exc=None):
+    slot = g.pop('admission_slot', None)
+    if slot is not None:
+        slot.release()
+
+
+def init_admission(app):
+    """Install the admission hooks; call after init_identity, which sets the user the limits key on."""
+    config = app.config
+    choice = config.get("RATE_LIMIT", "auto")
+    if choice == "auto":
+        choice = "redis" if config.get("RATE_LIMIT_URL") else "memory"
+    default = parse_limit(config["RATE_LIMIT_DEFAULT"])
+    rate_limits = parse_entries(config["RATE_LIMITS"], parse_limit)
+    concurrency = parse_entries(config["CONCURRENCY_LIMITS"], parse_slots)
+
+    if choice == "memory":
+        refills = [l.refill_seconds for l in (default, *rate_limits.values()) if l is not None]
+        buckets = MemoryBuckets(config["RATE_LIMIT_SIZE"], max(refills, default=1.0))
+    elif choice == "redis":
+        if not config.get("RATE_LIMIT_URL"):
+            raise RuntimeError("RATE_LIMIT=redis needs RATE_LIMIT_URL")
+        buckets = RedisBuckets(config["RATE_LIMIT_URL"])
+    else:
+        buckets = None
+
+    app.extensions[EXTENSION_KEY] = Admission(
+        buckets, default, rate_limits, concurrency, config["CONCURRENCY_RETRY_AFTER"],
+        # Behind a proxy every client shares its address, and one bucket
+        by_ip=config["RATE_LIMIT_BY_IP"] or config["PROXY_FIX_X_FOR"] > 0,
+    )
+    if buckets is None and not concurrency:
+        return
+    app.before_request(_admit)
+    app.teardown_request(_release)
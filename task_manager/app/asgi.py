@@ -0,0 +1,238 @@
+"""ASGI serving mode: GET /tasks/, /tasks/<id> and /changes/stream on an async engine, everything else through Flask.
+
+The async views reuse the sync views' statement builders and renderers, so responses match the WSGI app.
+"""
+import asyncio
+import io
+import re
+import time
+
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import abort, current_app, g, jsonify
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+
+from . import changes
+from .conditional import not_modified
+from .db_pool import install_sqlite_pragmas
+from .identity import raise_for_identity
+from .instrumentation import instrument_engine
+from .routes import changes as change_views
+from .routes import tasks as task_views
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+}
+POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping')
+
+
+def async_database_url(app):
+    """ASYNC_DATABASE_URL, else SQLALCHEMY_DATABASE_URI with its async driver swapped in."""
+    if app.config.get("ASYNC_DATABASE_URL"):
+        return app.config["ASYNC_DATABASE_URL"]
+    url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver for {url.get_backend_name()}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=driver)
+
+
+def async_engine_options(app) -> dict:
+    """The sync engine's pool settings, with connect_args translated for the async drivers."""
+    sync_options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    options = {k: v for k, v in sync_options.items() if k in POOL_OPTIONS}
+    connect_args = dict(sync_options.get("connect_args") or {})
+    # libpq's "-c statement_timeout=N" becomes an asyncpg server setting
+    match = re.search(r"statement_timeout=(\d+)", connect_args.pop("options", ""))
+    if match:
+        connect_args["server_settings"] = {"statement_timeout": match.group(1)}
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+async def list_tasks(session):
+    raise_for_identity()
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    row = (await session.execute(task_views.task_list_validators_statement())).one()
+    etag = task_views.task_list_validators(row)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    plan, error = task_views.task_list_plan()
+    if error:
+        return error
+    rows = (await session.execute(plan.statement)).all()
+    return task_views.task_list_response(plan, rows, etag)
+
+
+async def get_task(session, task_id: int):
+    raise_for_identity()
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    t = (await session.scalars(task_views.task_statement(task_id))).first()
+    if t is None:
+        abort(404)
+    return task_views.task_response(t)
+
+
+ASYNC_VIEWS = {
+    'tasks.list_tasks': list_tasks,
+    'tasks.get_task': get_task,
+}
+
+
+async def stream_changes(sessions, receive, send):
+    """routes/changes.stream_changes, waiting on the event loop instead of a thread."""
+    raise_for_identity()
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    since, error = change_views.since_arg()
+    if error:
+        return error
+    async with sessions() as session:
+        if since is None:
+            since = await session.scalar(changes.LATEST_SEQ) or 0
+        elif change_views.cursor_gone(since, await session.scalar(changes.OLDEST_SEQ)):
+            return change_views.gone_response()
+
+    config = current_app.config
+    user_id = g.user_id
+    broker = changes.get_broker()
+    dumps = current_app.json.dumps
+    page_size = config["CHANGE_FEED_PAGE_SIZE"]
+    heartbeat = config["CHANGE_STREAM_HEARTBEAT"]
+    deadline = time.monotonic() + config["CHANGE_STREAM_MAX_SECONDS"]
+    sub = broker.subscribe(user_id, asyncio.get_running_loop())
+    closed = False
+
+    async def watch_disconnect():
+        nonlocal closed
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        closed = True
+        sub.wake()
+
+    async def write(text: str):
+        await send({"type": "http.response.body", "body": text.encode(), "more_body": True})
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        headers = [(b"content-type", b"text/event-stream; charset=utf-8")]
+        headers += [(k.lower().encode("latin1"), v.encode("latin1")) for k, v in change_views.STREAM_HEADERS.items()]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        cursor = since
+        await write(change_views.sse_preamble(cursor))
+        check = True
+        while not closed:
+            while check and not closed:
+                # A session per read: no connection is held while waiting
+                async with sessions() as session:
+                    rows = (await session.execute(change_views.changes_statement(user_id, cursor, page_size))).all()
+                entries, check = change_views.change_entries(rows, page_size)
+                if entries:
+                    cursor = entries[-1]["seq"]
+                    await write("".join(change_views.sse_event(e, dumps) for e in entries))
+            remaining = deadline - time.monotonic()
+            if closed or remaining <= 0:
+                break
+            check = await sub.wait_async(min(heartbeat, remaining))
+            if not check and not closed:
+                await write(change_views.SSE_KEEPALIVE)
+                check = not broker.cross_process
+        if not closed:
+            await send({"type": "http.response.body", "body": b""})
+    finally:
+        watcher.cancel()
+        broker.unsubscribe(sub)
+
+
+# Views that send their own (streaming) response; they return None once done
+ASYNC_STREAMS = {
+    'changes.stream_changes': stream_changes,
+}
+
+
+class AsyncReadApp:
+    def __init__(self, flask_app):
+        config = flask_app.config
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=config["ASGI_WSGI_THREADS"])
+        self.views = {**ASYNC_VIEWS, **ASYNC_STREAMS} if config["ASGI_ASYNC_READS"] else {}
+        self.urls = flask_app.url_map.bind('localhost')
+
+        self.engine = create_async_engine(async_database_url(flask_app), **async_engine_options(flask_app))
+        if self.engine.dialect.name == 'sqlite':
+            install_sqlite_pragmas(self.engine.sync_engine, config.get("SQLITE_WAL", True))
+        instrument_engine(self.engine.sync_engine, flask_app)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    def _match(self, scope):
+        if scope["method"] != "GET" or not self.views:
+            return None, None
+        try:
+            endpoint, args = self.urls.match(scope["path"], method="GET")
+        except HTTPException:  # 404/405 and redirects: let Flask answer
+            return None, None
+        return self.views.get(endpoint), args
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] == "http":
+            view, args = self._match(scope)
+            if view is not None:
+                return await self._serve(view, args, scope, receive, send)
+        return await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _serve(self, view, args, scope, receive, send):
+        app = self.flask_app
+        # Same request lifecycle as Flask.full_dispatch_request, with an awaited view
+        ctx = app.request_context(build_environ(scope, io.BytesIO()))
+        ctx.push()
+        try:
+            try:
+                # before_request hooks may block (the Redis rate limiter); keep them off the loop
+                rv = await asyncio.to_thread(app.preprocess_request)
+                if rv is None and view in ASYNC_STREAMS.values():
+                    rv = await view(self.sessions, receive, send, **args)
+                    if rv is None:
+                        return
+                elif rv is None:
+                    async with self.sessions() as session:
+                        rv = await view(session, **args)
+            except Exception as e:
+                try:
+                    rv = app.handle_user_exception(e)
+                except Exception as unhandled:
+                    rv = app.handle_exception(unhandled)
+            response = app.process_response(app.make_response(rv))
+            body = response.get_data()
+            headers = [(k.lower().encode("latin1"), v.encode("latin1")) for k, v in response.headers.items()]
+        finally:
+            ctx.pop()
+
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(flask_app):
+    return AsyncReadApp(flask_app)
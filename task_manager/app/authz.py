@@ -0,0 +1,84 @@
+"""Project ownership lookups backed by a per-process project -> owner cache.
+
+Only active projects have an owner here: deleting, archived and other
+job-held projects (see project_jobs.py) look nonexistent to writers.
+Anything that deletes a project, changes its owner_id or takes it out of
+the active state must call invalidate_project() so the cached owner can't
+outlive the row in this process. Other workers' entries expire after
+AUTHZ_CACHE_TTL seconds, so task inserts re-check with lock_active_projects().
+"""
+from flask import current_app
+from sqlalchemy import select
+
+from . import db
+from .cache import TTLCache
+from .models import PROJECT_ACTIVE, Project
+
+EXTENSION_KEY = 'authz_owner_cache'
+
+
+def init_authz(app):
+    app.extensions[EXTENSION_KEY] = TTLCache(
+        maxsize=app.config["AUTHZ_CACHE_SIZE"],
+        ttl=app.config["AUTHZ_CACHE_TTL"],
+    )
+
+
+def _cache() -> TTLCache:
+    return current_app.extensions[EXTENSION_KEY]
+
+
+def remember_owner(project_id: int, owner_id: int):
+    """Seed the cache from a project row the caller already loaded."""
+    _cache().set(project_id, owner_id)
+
+
+def project_owner(project_id: int):
+    """Owner id of `project_id`, or None if it doesn't exist or isn't active."""
+    cache = _cache()
+    owner_id = cache.get(project_id)
+    if owner_id is None:
+        owner_id = db.session.scalar(
+            select(Project.owner_id).where(Project.id == project_id, Project.state == PROJECT_ACTIVE)
+        )
+        if owner_id is not None:
+            cache.set(project_id, owner_id)
+    return owner_id
+
+
+def owned_project_ids(project_ids, user_id: int) -> set:
+    """Subset of `project_ids` owned by `user_id`; one query for the uncached ids."""
+    cache = _cache()
+    owned, missing = set(), []
+    for pid in project_ids:
+        owner_id = cache.get(pid)
+        if owner_id is None:
+            missing.append(pid)
+        elif owner_id == user_id:
+            owned.add(pid)
+    if missing:
+        for pid, owner_id in db.session.execute(
+            select(Project.id, Project.owner_id).where(Project.id.in_(missing), Project.state == PROJECT_ACTIVE)
+        ):
+            cache.set(pid, owner_id)
+            if owner_id == user_id:
+                owned.add(pid)
+    return owned
+
+
+def lock_active_projects(project_ids) -> set:
+    """Subset of `project_ids` still active, share-locked until commit.
+
+    Call after inserting the rows that depend on them, in the same
+    transaction: on SQLite the insert has then taken the write lock, and on
+    Postgres FOR SHARE blocks a concurrent state change until commit.
+    """
+    return set(db.session.scalars(
+        select(Project.id)
+        .where(Project.id.in_(list(project_ids)), Project.state == PROJECT_ACTIVE)
+        .with_for_update(read=True)
+    ))
+
+
+def invalidate_project(project_id: int):
+    _cache().delete(project_id)
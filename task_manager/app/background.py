@@ -0,0 +1,37 @@
+"""Claims on rows worked off-request (outbox events, project jobs) and the in-process runner thread."""
+import threading
+from datetime import timedelta
+
+from sqlalchemy import or_
+
+# A claim is a (claimed_at, claim_token) pair set by a conditional UPDATE, so
+# of two runners only one wins. Claims older than this are assumed to belong
+# to a runner that crashed, and the rows become claimable again.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def claimable(model, now):
+    """Rows of `model` that nobody holds a live claim on."""
+    return or_(model.claimed_at.is_(None), model.claimed_at < now - CLAIM_TIMEOUT)
+
+
+def start_runner(app, name: str, interval: float, work) -> threading.Event:
+    """Call `work()` in an app context every `interval` seconds on a daemon thread.
+
+    Used when no Celery broker is configured. Setting the returned event
+    runs it at once instead of at the next poll.
+    """
+    wake = threading.Event()
+
+    def run():
+        while True:
+            wake.wait(interval)
+            wake.clear()
+            try:
+                with app.app_context():
+                    work()
+            except Exception:
+                app.logger.exception("Background runner %s failed", name)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return wake
@@ -6,13 +6,31 @@ def make_celery(app):
         broker=app.config['CELERY_BROKER_URL'],
         backend=app.config['CELERY_RESULT_BACKEND']
     )
-    celery.conf.update(app.config)
+    # Not celery.conf.update(app.config): its upper-case CELERY_* keys are
+    # old-style setting names, which Celery 5 refuses to mix with the new
+    # lower-case ones below
     # Celery Beat schedule
     celery.conf.beat_schedule = {
         'daily-overdue-summary': {
             'task': 'tasks.send_daily_overdue_summary',
             'schedule': 24 * 60 * 60,  # every 24 hours
-        }
+        },
+        'drain-notifications': {
+            'task': 'tasks.drain_notifications',
+            'schedule': app.config['NOTIFICATION_DRAIN_INTERVAL'],
+        },
+        'rebuild-task-stats': {
+            'task': 'tasks.rebuild_task_stats',
+            'schedule': 24 * 60 * 60,  # repairs any drift in the incremental counters
+        },
+        'prune-change-log': {
+            'task': 'tasks.prune_change_log',
+            'schedule': 60 * 60,
+        },
+        'run-project-jobs': {
+            'task': 'tasks.run_project_jobs',
+            'schedule': app.config['PROJECT_JOB_INTERVAL'],
+        },
     }
     TaskBase = celery.Task
 
@@ -0,0 +1,213 @@
+"""Per-user change feed: record() before commit, publish() after, read by ``seq`` in routes/changes.py."""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import Integer, DateTime, String, column, delete, func, insert, select, true, values
+
+from . import db
+from .models import ChangeLog
+
+TASK = 'task'
+PROJECT = 'project'
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+# Project only: its tasks left the task listings (archived) or came back (restored)
+ARCHIVED = 'archived'
+RESTORED = 'restored'
+
+EXTENSION_KEY = 'change_feed'
+
+# First key of the two-key advisory lock serializing one user's change_log writes
+ADVISORY_LOCK_CLASS = 0x7461736B
+
+
+def record(user_id: int, changes):
+    """Add (entity, entity_id, action, project_id) tuples to user_id's feed in the current transaction."""
+    # Readers page by seq, so one user's rows must commit in seq order. SQLite
+    # serializes writers; on Postgres the advisory lock (held until commit) does
+    now = datetime.utcnow()
+    rows = [(user_id, entity, entity_id, action, project_id, now) for entity, entity_id, action, project_id in changes]
+    if not rows:
+        return
+    names = ['user_id', 'entity', 'entity_id', 'action', 'project_id', 'created_at']
+    if db.session.get_bind().dialect.name == 'postgresql':
+        data = values(
+            column('user_id', Integer), column('entity', String), column('entity_id', Integer),
+            column('action', String), column('project_id', Integer), column('created_at', DateTime),
+            name='changes',
+        ).data(rows)
+        lock = func.pg_advisory_xact_lock(ADVISORY_LOCK_CLASS, user_id).table_valued()
+        db.session.execute(insert(ChangeLog).from_select(names, select(data).join(lock, true())))
+    else:
+        db.session.execute(insert(ChangeLog), [dict(zip(names, row)) for row in rows])
+
+
+def publish(user_id: int):
+    """Wake user_id's open change streams; call after commit."""
+    broker = current_app.extensions.get(EXTENSION_KEY)
+    if broker is not None:
+        broker.publish(user_id)
+
+
+def prune_change_log() -> int:
+    """Delete entries older than CHANGE_LOG_RETENTION_DAYS; returns the number removed.
+
+    Clients whose cursor predates the oldest remaining entry get 410 from
+    /changes and resync from the list endpoints. The newest entry is always
+    kept, so an emptied log cannot pass for one with nothing missing.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config["CHANGE_LOG_RETENTION_DAYS"])
+    newest = select(func.max(ChangeLog.seq)).scalar_subquery()
+    removed = db.session.execute(
+        delete(ChangeLog).where(ChangeLog.created_at < cutoff, ChangeLog.seq < newest)
+    ).rowcount
+    db.session.commit()
+    return removed
+
+
+# Statements behind oldest_seq/latest_seq, also run by the async stream
+OLDEST_SEQ = select(func.min(ChangeLog.seq))
+LATEST_SEQ = select(func.max(ChangeLog.seq))
+
+
+def oldest_seq():
+    return db.session.scalar(OLDEST_SEQ)
+
+
+def latest_seq() -> int:
+    return db.session.scalar(LATEST_SEQ) or 0
+
+
+class Subscription:
+    """One open stream's wake-up flag; async streams pass their event loop."""
+
+    def __init__(self, user_id: int, loop=None):
+        self.user_id = user_id
+        self._loop = loop
+        self._event = asyncio.Event() if loop is not None else threading.Event()
+
+    def wake(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._event.set)
+        else:
+            self._event.set()
+
+    # Both waits clear the flag before returning, so a publish that lands
+    # while the caller reads the log is kept for the next wait
+    def wait(self, timeout: float) -> bool:
+        woke = self._event.wait(timeout)
+        self._event.clear()
+        return woke
+
+    async def wait_async(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+
+class MemoryBroker:
+    cross_process = False
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int, loop=None) -> Subscription:
+        sub = Subscription(user_id, loop)
+        with self._lock:
+            self._subscribers[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def notify(self, user_id: int):
+        with self._lock:
+            subs = list(self._subscribers.get(user_id, ()))
+        for sub in subs:
+            sub.wake()
+
+    def publish(self, user_id: int):
+        self.notify(user_id)
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+class RedisBroker(MemoryBroker):
+    """Fans publishes out through a Redis channel to every process's local subscribers."""
+    cross_process = True
+
+    def __init__(self, url: str, channel: str = 'taskmgr:changes'):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:  # pragma: no cover
+            raise RuntimeError("CHANGE_FEED_BROKER=redis but the redis package is not installed") from None
+        self._client = redis.Redis.from_url(url)
+        self._channel = channel
+        self._listener = None
+
+    def subscribe(self, user_id: int, loop=None) -> Subscription:
+        # The listener connection is only opened by processes that hold streams
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='change-feed-listener', daemon=True)
+                self._listener.start()
+        return super().subscribe(user_id, loop)
+
+    def publish(self, user_id: int):
+        self._client.publish(self._channel, str(user_id))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    try:
+                        self.notify(int(message['data']))
+                    except (TypeError, ValueError):
+                        continue
+            except Exception:
+                # Lost the connection: wake everyone so streams catch up, then resubscribe
+                with self._lock:
+                    users = list(self._subscribers)
+                for user_id in users:
+                    self.notify(user_id)
+                time.sleep(1)
+
+
+def init_change_feed(app):
+    config = app.config
+    choice = config.get("CHANGE_FEED_BROKER", "auto")
+    if choice == "auto":
+        choice = "redis" if config.get("CHANGE_FEED_REDIS_URL") else "memory"
+    if choice == "redis":
+        if not config.get("CHANGE_FEED_REDIS_URL"):
+            raise RuntimeError("CHANGE_FEED_BROKER=redis needs CHANGE_FEED_REDIS_URL")
+        broker = RedisBroker(config["CHANGE_FEED_REDIS_URL"])
+    else:
+        broker = MemoryBroker()
+    app.extensions[EXTENSION_KEY] = broker
+
+
+def get_broker():
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,41 @@
+"""ETag / Last-Modified helpers for the polling-heavy read endpoints.
+
+Validators are computed from cheap aggregates (row count plus the newest
+updated_at) rather than from the serialized body, so a matching request is
+answered with 304 before any rows are loaded. A deleted row moves the
+count but not the newest updated_at, so responses covering several rows
+carry only an ETag; Last-Modified is reserved for single rows.
+"""
+import hashlib
+from datetime import timezone
+
+from flask import current_app, request
+
+
+def make_etag(*parts) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+
+
+def _as_utc(dt):
+    return dt.replace(tzinfo=timezone.utc, microsecond=0) if dt else None
+
+
+def not_modified(etag: str, last_modified=None):
+    """Return a 304 response if the request's validators still match, else None."""
+    matched = False
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        matched = _as_utc(last_modified) <= request.if_modified_since
+    if not matched:
+        return None
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def with_validators(resp, etag: str, last_modified=None):
+    resp.set_etag(etag, weak=True)
+    if last_modified:
+        resp.last_modified = _as_utc(last_modified)
+    # Let clients and proxies store the body but always revalidate
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
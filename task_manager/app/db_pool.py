@@ -0,0 +1,126 @@
+"""Engine tuning and connection pool statistics.
+
+Pool statistics are per process (i.e. per gunicorn worker); checkout wait
+time is only tracked for QueuePool, which is what server databases use.
+"""
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from . import db
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def engine_options(app) -> dict:
+    """Engine options from config, with the instrumented pool for server databases."""
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        options.setdefault("poolclass", InstrumentedQueuePool)
+    return options
+
+
+def install_sqlite_pragmas(engine, wal: bool):
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        # Off by default in SQLite; the ON DELETE actions in models.py need it
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if wal:
+            # Readers no longer block the writer; NORMAL sync is safe under WAL
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+def init_engine(app):
+    """Attach per-connection setup and pool event counters to the app's engine."""
+    with app.app_context():
+        engine = db.engine
+    stats = getattr(engine.pool, "stats", None)
+
+    if engine.dialect.name == "sqlite":
+        install_sqlite_pragmas(engine, app.config.get("SQLITE_WAL", True))
+
+    if stats is not None:
+        @event.listens_for(engine, "connect")
+        def _count_connect(dbapi_conn, record):
+            stats.incr("connects")
+
+        @event.listens_for(engine, "invalidate")
+        def _count_invalidate(dbapi_conn, record, exc):
+            stats.incr("invalidations")
+
+
+def pool_status() -> dict:
+    """Current pool occupancy plus cumulative wait statistics; needs an app context."""
+    pool = db.engine.pool
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,207 @@
+"""Per-request timing and SQL instrumentation, served as Prometheus metrics on /metrics."""
+import bisect
+import threading
+import time
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+from . import db
+
+EXTENSION_KEY = 'metrics'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # one counter per bucket plus +Inf, then the sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {series[-1]}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = dict(self._values)
+        for label_values, value in sorted(snapshot.items()):
+            labels = _labels(self.labels, label_values)
+            yield f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}"
+
+
+def _labels(names, values) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    def __init__(self):
+        route = ('blueprint', 'endpoint', 'method')
+        self.requests = Counter('http_requests_total', 'Requests by route and status code.', route + ('status',))
+        self.duration = Histogram('http_request_duration_seconds', 'Time spent handling a request.',
+                                  route, DURATION_BUCKETS)
+        self.statements = Histogram('http_request_sql_statements', 'SQL statements executed per request.',
+                                    route, STATEMENT_BUCKETS)
+        self.sql_duration = Histogram('http_request_sql_duration_seconds', 'Time spent in SQL per request.',
+                                      route, DURATION_BUCKETS)
+        self.slow_queries = Counter('db_slow_queries_total', 'Statements slower than SLOW_QUERY_MS.')
+
+    def render(self) -> str:
+        from .db_pool import pool_status
+
+        lines = []
+        for metric in (self.requests, self.duration, self.statements, self.sql_duration, self.slow_queries):
+            lines.extend(metric.render())
+        # Pool occupancy and cumulative wait statistics, as on /healthz
+        for key, value in pool_status().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE db_pool_{key} gauge")
+                lines.append(f"db_pool_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    __slots__ = ('start', 'statements', 'sql_seconds')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+
+def _redacted(parameters, executemany: bool) -> str:
+    """Describe bound parameters by type only; values may be credentials or personal data."""
+    if executemany:
+        return f"{len(parameters)} parameter sets"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in parameters or ()) + ")"
+
+
+def instrument_engine(engine, app):
+    """Attribute statements on `engine` to the current request and log slow ones."""
+    metrics = app.extensions.get(EXTENSION_KEY)
+    slow_query = app.config["SLOW_QUERY_MS"] / 1000
+    if metrics is None and not slow_query:
+        return
+    logger = app.logger
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        stats = g.get('request_stats') if has_app_context() else None
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_seconds += elapsed
+        if slow_query and elapsed >= slow_query:
+            if metrics is not None:
+                metrics.slow_queries.inc()
+            logger.warning("Slow query (%.1f ms) %s with %s", elapsed * 1000,
+                           " ".join(statement.split()), _redacted(parameters, executemany))
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        # after_cursor_execute never fires for a failed statement
+        starts = context.connection.info.get('query_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+def _route_labels():
+    return (request.blueprint or '', request.endpoint or '<unmatched>', request.method)
+
+
+def init_instrumentation(app):
+    config = app.config
+    if config["REQUEST_METRICS"]:
+        app.extensions[EXTENSION_KEY] = Metrics()
+    metrics = app.extensions.get(EXTENSION_KEY)
+    server_timing = config["SERVER_TIMING"]
+    slow_request = config["SLOW_REQUEST_MS"] / 1000
+
+    with app.app_context():
+        instrument_engine(db.engine, app)
+
+    if metrics is None and not server_timing and not slow_request:
+        return
+
+    @app.before_request
+    def _start_request():
+        g.request_stats = RequestStats()
+
+    @app.after_request
+    def _finish_request(response):
+        stats = g.pop('request_stats', None)
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.start
+        if metrics is not None:
+            labels = _route_labels()
+            metrics.requests.inc(labels + (response.status_code,))
+            metrics.duration.observe(labels, elapsed)
+            metrics.statements.observe(labels, stats.statements)
+            metrics.sql_duration.observe(labels, stats.sql_seconds)
+        if server_timing:
+            response.headers.add(
+                'Server-Timing',
+                f'app;dur={elapsed * 1000:.1f}, db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.statements} queries"',
+            )
+        if slow_request and elapsed >= slow_request:
+            app.logger.warning("Slow request %s %s: %.1f ms, %d statements, %.1f ms in SQL", request.method,
+                               request.path, elapsed * 1000, stats.statements, stats.sql_seconds * 1000)
+        return response
+
+    if metrics is not None:
+        @app.get("/metrics")
+        def metrics_endpoint():
+            return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,44 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:  # optional speedup; falls back to the stdlib provider
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson.
+
+    Encodes straight to bytes in C. Keys stay sorted like Flask's default
+    provider, and anything orjson can't handle natively goes through the
+    default provider's ``default`` hook.
+    """
+
+    def _options(self, indent: bool = False) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options("indent" in kwargs)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the JSON provider selected by ``JSON_PROVIDER`` (auto|orjson|default)."""
+    choice = app.config.get("JSON_PROVIDER", "auto")
+    if choice == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed")
+    if choice in ("auto", "orjson") and orjson is not None:
+        app.json = OrjsonProvider(app)
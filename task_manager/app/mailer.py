@@ -0,0 +1,177 @@
+"""Minimal SMTP client that can send many messages over one connection."""
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+from flask import current_app
+
+
+class MailConnection:
+    def __init__(self, smtp, default_sender):
+        self._smtp = smtp
+        self._default_sender = default_sender
+        self.broken = False
+
+    def send(self, subject: str, recipients, body: str, sender: str = None):
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = sender or self._default_sender
+        msg["To"] = ", ".join(recipients)
+        msg.set_content(body)
+        try:
+            self._smtp.send_message(msg)
+        except (smtplib.SMTPException, OSError):
+            # The session may be dropped or mid-transaction: never reuse it
+            self.broken = True
+            raise
+
+
+class Mailer:
+    # Idle pooled connections older than this are probed with NOOP before reuse
+    PROBE_AFTER = 30.0
+
+    def __init__(self, server=None, port=25, username=None, password=None,
+                 use_tls=False, use_ssl=False, default_sender=None, timeout=30, pool_size=2):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.default_sender = default_sender
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle = []  # (smtp, returned_at)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            server=config.get("MAIL_SERVER"),
+            port=config.get("MAIL_PORT", 25),
+            username=config.get("MAIL_USERNAME"),
+            password=config.get("MAIL_PASSWORD"),
+            use_tls=config.get("MAIL_USE_TLS", False),
+            use_ssl=config.get("MAIL_USE_SSL", False),
+            default_sender=config.get("MAIL_DEFAULT_SENDER"),
+            pool_size=config.get("MAIL_POOL_SIZE", 2),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.server)
+
+    def _open(self):
+        if not self.configured:
+            raise RuntimeError("MAIL_SERVER is not configured")
+        smtp_cls = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_cls(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except Exception:
+            self._close(smtp)
+            raise
+        return smtp
+
+    @staticmethod
+    def _close(smtp):
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    @contextmanager
+    def connect(self):
+        """Open one SMTP session; send as many messages through it as needed."""
+        smtp = self._open()
+        try:
+            yield MailConnection(smtp, self.default_sender)
+        finally:
+            self._close(smtp)
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                smtp, returned_at = self._idle.pop()
+            if time.monotonic() - returned_at < self.PROBE_AFTER:
+                return smtp
+            try:
+                if smtp.noop()[0] == 250:
+                    return smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(smtp)
+        return self._open()
+
+    @contextmanager
+    def pooled(self):
+        """Like connect(), but keeps up to `pool_size` sessions open between uses.
+
+        Meant for long-lived senders (the notification drainer); a session that
+        raised or failed a send is discarded rather than returned to the pool.
+        """
+        smtp = self._checkout()
+        conn = MailConnection(smtp, self.default_sender)
+        try:
+            yield conn
+        except Exception:
+            self._close(smtp)
+            raise
+        if conn.broken:
+            self._close(smtp)
+            return
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((smtp, time.monotonic()))
+                smtp = None
+        if smtp is not None:
+            self._close(smtp)
+
+    def send(self, subject: str, recipients, body: str):
+        with self.connect() as conn:
+            conn.send(subject, recipients, body)
+
+    def send_many(self, messages, pooled: bool = False) -> set:
+        """Send ``(subject, recipients, body)`` tuples; returns the indexes of those sent.
+
+        A message that fails is tried once more on a new session, then logged
+        and skipped. Stops early if the server cannot be reached.
+        """
+        sent, retried = set(), set()
+        pending = deque(enumerate(messages))
+        session = self.pooled if pooled else self.connect
+        while pending:
+            try:
+                with session() as conn:
+                    while pending and not conn.broken:
+                        i, (subject, recipients, body) = pending[0]
+                        try:
+                            conn.send(subject, recipients, body)
+                        except (smtplib.SMTPException, OSError):
+                            if i not in retried:
+                                retried.add(i)
+                                continue
+                            current_app.logger.exception("Failed to send mail to %s", ", ".join(recipients))
+                        else:
+                            sent.add(i)
+                        pending.popleft()
+            except (smtplib.SMTPException, OSError):
+                current_app.logger.exception("Mail server unavailable, %d messages not sent", len(pending))
+                break
+        return sent
+
+
+def init_mail(app):
+    app.extensions["mailer"] = Mailer.from_config(app.config)
+
+
+def get_mailer() -> Mailer:
+    return current_app.extensions["mailer"]
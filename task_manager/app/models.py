@@ -1,5 +1,19 @@
 from . import db
 from datetime import datetime
+from sqlalchemy.orm import validates
+
+# Ordered lowest to highest; the position is the ordinal stored in *_rank
+STATUSES = ('todo', 'in_progress', 'done')
+PRIORITIES = ('low', 'medium', 'high')
+STATUS_RANK = {s: i for i, s in enumerate(STATUSES)}
+PRIORITY_RANK = {p: i for i, p in enumerate(PRIORITIES)}
+
+# Project.state; everything but active is set by a background job (project_jobs.py)
+PROJECT_ACTIVE = 'active'
+PROJECT_DELETING = 'deleting'
+PROJECT_ARCHIVING = 'archiving'
+PROJECT_ARCHIVED = 'archived'
+PROJECT_RESTORING = 'restoring'
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -8,7 +22,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     # Relationships
     projects = db.relationship('Project', backref='owner', lazy=True)
-    assigned_tasks = db.relationship('Task', backref='assignee', foreign_keys='Task.assigned_to', lazy=True)
+    assigned_tasks = db.relationship('Task', backref='assignee', foreign_keys='Task.assigned_to', lazy=True,
+                                     passive_deletes=True)
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -16,7 +31,18 @@ class Project(db.Model):
     description = db.Column(db.Text)
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    tasks = db.relationship('Task', backref='project', lazy=True)
+    # Bumped on every UPDATE (ORM or bulk); feeds ETag/Last-Modified
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Only active projects accept writes and show up in task listings;
+    # deleting ones are hidden entirely
+    state = db.Column(db.String(16), nullable=False, default=PROJECT_ACTIVE, server_default=PROJECT_ACTIVE)
+    # The database deletes a project's tasks (ON DELETE CASCADE); never load them for it
+    tasks = db.relationship('Task', backref='project', lazy=True, passive_deletes=True)
+
+    __table_args__ = (
+        # list_projects and the ownership join in list_tasks
+        db.Index('ix_project_owner_created', 'owner_id', 'created_at', 'id'),
+    )
 
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -24,7 +50,142 @@ class Task(db.Model):
     description = db.Column(db.Text)
     status = db.Column(db.String(20), default='todo')
     priority = db.Column(db.String(20), default='medium')
+    # Integer mirrors of status/priority so ordering is semantic and indexable.
+    # Kept in sync by the validators below; Core/bulk writes must set them too.
+    status_rank = db.Column(db.SmallInteger, nullable=False, default=STATUS_RANK['todo'])
+    priority_rank = db.Column(db.SmallInteger, nullable=False, default=PRIORITY_RANK['medium'])
     due_date = db.Column(db.Date)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
-    assigned_to = db.Column(db.Integer, db.ForeignKey('user.id'))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', name='fk_task_project_id_project', ondelete='CASCADE'),
+                           nullable=False)
+    assigned_to = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_task_assigned_to_user', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Shaped after the queries in routes/tasks.py, routes/projects.py and
+    # tasks_email.send_daily_overdue_summary; keep in sync with migrations/.
+    __table_args__ = (
+        # Per-project listing in default order, project_to_dict, project delete
+        db.Index('ix_task_project_created', 'project_id', 'created_at', 'id'),
+        # Per-project filters on status / priority / due_date
+        db.Index('ix_task_project_status', 'project_id', 'status_rank'),
+        db.Index('ix_task_project_priority', 'project_id', 'priority_rank', 'id'),
+        db.Index('ix_task_project_due', 'project_id', 'due_date'),
+        # count/max(updated_at) validators for conditional GETs
+        db.Index('ix_task_project_updated', 'project_id', 'updated_at'),
+        # Cross-project listings walk the sort order and check ownership per row
+        db.Index('ix_task_created', 'created_at', 'id'),
+        db.Index('ix_task_priority', 'priority_rank', 'id'),
+        # Overdue summary: tasks per assignee by due date
+        db.Index('ix_task_assigned_due', 'assigned_to', 'due_date'),
+        # Archived tasks keep their ids while out of the table; never hand them out again
+        {'sqlite_autoincrement': True},
+    )
+
+    @validates('status')
+    def _sync_status_rank(self, key, value):
+        self.status_rank = STATUS_RANK.get(value, STATUS_RANK['todo'])
+        return value
+
+    @validates('priority')
+    def _sync_priority_rank(self, key, value):
+        self.priority_rank = PRIORITY_RANK.get(value, PRIORITY_RANK['medium'])
+        return value
+
+
+# The bookkeeping tables below have no foreign keys: their rows outlive what
+# they describe, or are cleared explicitly (in chunks) with the project.
+
+
+class NotificationEvent(db.Model):
+    """Outbox row written in the same transaction as the task change it reports (see notifications.py)."""
+    __tablename__ = 'notification_event'
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(32), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime)
+    claim_token = db.Column(db.String(32))
+
+    __table_args__ = (
+        db.Index('ix_notification_event_task', 'task_id'),
+        db.Index('ix_notification_event_claim', 'claim_token'),
+    )
+
+
+class TaskStat(db.Model):
+    """Running task count for one (project, kind, key) bucket, maintained by stats.py."""
+    __tablename__ = 'task_stat'
+
+    project_id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(16), primary_key=True)
+    key = db.Column(db.String(64), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ChangeLog(db.Model):
+    """One entry of a user's change feed (see changes.py); user_id is the project owner."""
+    __tablename__ = 'change_log'
+
+    # The cursor clients pass back; AUTOINCREMENT on SQLite so pruned seqs are never reused
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    entity = db.Column(db.String(16), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(16), nullable=False)
+    project_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # GET /changes?since= and the streams: one user's entries after a cursor
+        db.Index('ix_change_log_user_seq', 'user_id', 'seq'),
+        # Retention pruning
+        db.Index('ix_change_log_created', 'created_at'),
+        {'sqlite_autoincrement': True},
+    )
+
+
+class TaskArchive(db.Model):
+    """A task moved out of the live table when its project was archived; same columns as Task, id included."""
+    __tablename__ = 'task_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(120), nullable=False)
+    description = db.Column(db.Text)
+    status = db.Column(db.String(20))
+    priority = db.Column(db.String(20))
+    status_rank = db.Column(db.SmallInteger, nullable=False)
+    priority_rank = db.Column(db.SmallInteger, nullable=False)
+    due_date = db.Column(db.Date)
+    project_id = db.Column(db.Integer, nullable=False)
+    assigned_to = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_task_archive_project', 'project_id', 'id'),
+    )
+
+
+class ProjectJob(db.Model):
+    """A chunked delete, archive or restore of one project (see project_jobs.py); kept once done."""
+    __tablename__ = 'project_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, nullable=False)
+    owner_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(16), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default='pending')
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
+    claim_token = db.Column(db.String(32))
+
+    __table_args__ = (
+        db.Index('ix_project_job_status', 'status', 'id'),
+        db.Index('ix_project_job_project', 'project_id'),
+    )
@@ -0,0 +1,122 @@
+"""Transactional outbox for task notification emails: enqueue() in the request, drain_notifications() later."""
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+
+from . import db
+from .background import claimable, start_runner
+from .mailer import get_mailer
+from .models import NotificationEvent, Task, User
+
+EXTENSION_KEY = 'notification_drainer'
+
+ASSIGNED = 'assigned'
+STATUS_CHANGED = 'status_changed'
+
+
+def notifications_enabled(config) -> bool:
+    """NOTIFICATIONS_ENABLED, and a MAIL_SERVER to send through."""
+    return bool(config["NOTIFICATIONS_ENABLED"] and config["MAIL_SERVER"])
+
+
+def enqueue(events):
+    """Add (task_id, action) pairs to the current transaction in one statement.
+
+    A no-op while notifications are disabled: nothing would ever drain them.
+    """
+    if events and notifications_enabled(current_app.config):
+        db.session.execute(insert(NotificationEvent), [{"task_id": t, "action": a} for t, a in events])
+
+
+def _render(row, actions):
+    described = " and ".join(a.replace('_', ' ') for a in actions)
+    subject = f"Task '{row.title}': " + ", ".join(a.replace('_', ' ').title() for a in actions)
+    body = (
+        f"Hello {row.username},\n\nThe task '{row.title}' has been {described}.\n\n"
+        f"Status: {row.status}\nPriority: {row.priority}\nDue: {row.due_date}\n\nRegards,\nTask Manager"
+    )
+    return subject, body
+
+
+def drain_notifications() -> int:
+    """Send one batch of due notifications; returns the number of tasks handled.
+
+    Events of tasks whose email could not be sent stay queued.
+
+    A task's events become due once its oldest pending event is
+    NOTIFICATION_COALESCE_SECONDS old, so a burst of edits yields one email.
+    """
+    config = current_app.config
+    if not notifications_enabled(config):
+        return 0
+    mailer = get_mailer()
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=config["NOTIFICATION_COALESCE_SECONDS"])
+    unclaimed = claimable(NotificationEvent, now)
+
+    task_ids = db.session.scalars(
+        select(NotificationEvent.task_id)
+        .where(unclaimed)
+        .group_by(NotificationEvent.task_id)
+        .having(func.min(NotificationEvent.created_at) <= cutoff)
+        .limit(config["NOTIFICATION_BATCH_SIZE"])
+    ).all()
+    if not task_ids:
+        db.session.rollback()
+        return 0
+
+    # Claim atomically; a concurrent drainer that lost the race claims nothing
+    token = uuid.uuid4().hex
+    db.session.execute(
+        update(NotificationEvent)
+        .where(NotificationEvent.task_id.in_(task_ids), unclaimed)
+        .values(claimed_at=now, claim_token=token)
+    )
+    db.session.commit()
+
+    actions = {}
+    for task_id, action in db.session.execute(
+        select(NotificationEvent.task_id, NotificationEvent.action)
+        .where(NotificationEvent.claim_token == token)
+        .order_by(NotificationEvent.id)
+    ):
+        seen = actions.setdefault(task_id, [])
+        if action not in seen:
+            seen.append(action)
+
+    recipients = db.session.execute(
+        select(Task.id, Task.title, Task.status, Task.priority, Task.due_date, User.username, User.email)
+        .join(User, Task.assigned_to == User.id)
+        .where(Task.id.in_(actions), User.email.isnot(None), User.email != '')
+    ).all()
+    messages = []
+    for row in recipients:
+        subject, body = _render(row, actions[row.id])
+        messages.append((subject, [row.email], body))
+    sent = mailer.send_many(messages, pooled=True) if messages else set()
+    failed = [row.id for i, row in enumerate(recipients) if i not in sent]
+    if failed:
+        # Unclaimed again, so a later drain retries them
+        db.session.execute(
+            update(NotificationEvent)
+            .where(NotificationEvent.claim_token == token, NotificationEvent.task_id.in_(failed))
+            .values(claimed_at=None, claim_token=None)
+        )
+    db.session.execute(delete(NotificationEvent).where(NotificationEvent.claim_token == token))
+    db.session.commit()
+    return len(actions) - len(failed)
+
+
+def start_background_drainer(app):
+    """Drain the outbox from a daemon thread; used when no Celery broker is configured."""
+    batch_size = app.config["NOTIFICATION_BATCH_SIZE"]
+
+    def drain():
+        while drain_notifications() >= batch_size:
+            pass
+
+    app.extensions[EXTENSION_KEY] = start_runner(
+        app, "notification-drainer", app.config["NOTIFICATION_DRAIN_INTERVAL"], drain,
+    )
@@ -0,0 +1,54 @@
+import base64
+import json
+
+from flask import request
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, values) -> str:
+    """Pack the sort key of the last row returned into an opaque token."""
+    raw = json.dumps({"s": sort, "v": list(values)}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str) -> list:
+    """Inverse of encode_cursor; rejects tokens minted for a different sort order."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = data["v"]
+        cursor_sort = data["s"]
+    except Exception:
+        raise InvalidCursor(token)
+    if cursor_sort != sort or not isinstance(values, list):
+        raise InvalidCursor(token)
+    return values
+
+
+def page_size_arg(default: int = 20, maximum: int = 100) -> int:
+    return min(maximum, max(1, request.args.get('page_size', default=default, type=int)))
+
+
+def keyset_requested() -> bool:
+    """Cursor mode is opt-in: clients pass `cursor` (empty for the first page)."""
+    return 'cursor' in request.args
+
+
+def keyset_page(query, page_size: int, sort: str, key_of):
+    """Fetch one page from an already filtered/ordered query.
+
+    `key_of(row)` returns the sort-key values used to build the next cursor.
+    Returns ``(items, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    return keyset_result(query.limit(page_size + 1).all(), page_size, sort, key_of)
+
+
+def keyset_result(rows, page_size: int, sort: str, key_of):
+    """keyset_page for rows the caller fetched itself with ``LIMIT page_size + 1``."""
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(sort, key_of(rows[-1]))
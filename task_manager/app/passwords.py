@@ -0,0 +1,71 @@
+"""Password hashing on a bounded worker pool, with rehash-on-login when the method changes."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+EXTENSION_KEY = 'password_hasher'
+
+# werkzeug's defaults for parameters a method string leaves out
+METHOD_DEFAULTS = {
+    'scrypt': ('32768', '8', '1'),
+    'pbkdf2': ('sha256', str(DEFAULT_PBKDF2_ITERATIONS)),
+}
+
+
+class HashingBusy(RuntimeError):
+    """Too many password hashes pending; the caller should retry later."""
+
+
+class PasswordHasher:
+    def __init__(self, method: str, workers: int, queue: int, timeout: float):
+        # Stored hashes are compared against the full form ("scrypt" -> "scrypt:32768:8:1")
+        self.method = normalize_method(method)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(queue)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout=self.timeout)
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored: str, password: str) -> bool:
+        return self._run(check_password_hash, stored, password)
+
+    def needs_rehash(self, stored: str) -> bool:
+        return stored.split('$', 1)[0] != self.method
+
+
+def normalize_method(method: str) -> str:
+    """The method prefix werkzeug writes into hashes made with `method`."""
+    name, *params = method.split(':')
+    defaults = METHOD_DEFAULTS.get(name)
+    if defaults is None or len(params) > len(defaults):
+        # Unknown layout: let werkzeug tell us, at the cost of one hash
+        return generate_password_hash('', method=method).split('$', 1)[0]
+    return ':'.join([name, *params, *defaults[len(params):]])
+
+
+def init_passwords(app):
+    config = app.config
+    app.extensions[EXTENSION_KEY] = PasswordHasher(
+        method=config["PASSWORD_HASH_METHOD"],
+        workers=config["PASSWORD_HASH_WORKERS"],
+        queue=config["PASSWORD_HASH_QUEUE"],
+        timeout=config["PASSWORD_HASH_TIMEOUT"],
+    )
+
+
+def get_hasher() -> PasswordHasher:
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,255 @@
+"""Project delete/archive/restore, moving tasks in chunks of one short transaction each.
+
+start_job() takes the project out of service at once; run_job() does the work.
+"""
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, literal, and_, select, update
+
+from . import changes, db
+from .authz import invalidate_project
+from .background import claimable, start_runner
+from .models import (
+    PROJECT_ACTIVE, PROJECT_ARCHIVED, PROJECT_ARCHIVING, PROJECT_DELETING, PROJECT_RESTORING,
+    Project, ProjectJob, Task, TaskArchive,
+)
+from .response_cache import invalidate, project_ns, project_tasks_ns, user_projects_ns, user_tasks_ns
+from .stats import forget_project, rebuild
+
+DELETE = 'delete'
+ARCHIVE = 'archive'
+RESTORE = 'restore'
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+
+# Project states a job may start from, and the state it holds the project in while running
+STARTS_FROM = {
+    DELETE: (PROJECT_ACTIVE, PROJECT_ARCHIVED),
+    ARCHIVE: (PROJECT_ACTIVE,),
+    RESTORE: (PROJECT_ARCHIVED,),
+}
+RUNNING_STATE = {DELETE: PROJECT_DELETING, ARCHIVE: PROJECT_ARCHIVING, RESTORE: PROJECT_RESTORING}
+
+EXTENSION_KEY = 'project_job_runner'
+
+TASK_COLUMNS = (
+    'id', 'title', 'description', 'status', 'priority', 'status_rank', 'priority_rank',
+    'due_date', 'project_id', 'assigned_to', 'created_at', 'updated_at',
+)
+
+
+class JobConflict(Exception):
+    """The project is not in a state the requested job can start from."""
+
+
+def job_to_dict(job: ProjectJob):
+    return {
+        "id": job.id,
+        "project_id": job.project_id,
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "progress": round(min(job.processed / job.total, 1.0), 4) if job.total else (1.0 if job.status == DONE else 0.0),
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def _count(model, project_id: int) -> int:
+    return db.session.scalar(select(func.count(model.id)).where(model.project_id == project_id))
+
+
+def start_job(project_id: int, owner_id: int, kind: str) -> ProjectJob:
+    """Take the project out of service and queue `kind`; commits.
+
+    Raises JobConflict if another job holds the project or its state does
+    not allow `kind`. The state flip is a conditional UPDATE, so of two
+    concurrent requests only one wins.
+    """
+    flipped = db.session.execute(
+        update(Project)
+        .where(Project.id == project_id, Project.owner_id == owner_id, Project.state.in_(STARTS_FROM[kind]))
+        .values(state=RUNNING_STATE[kind])
+    ).rowcount
+    if not flipped:
+        db.session.rollback()
+        raise JobConflict(kind)
+
+    if kind == RESTORE:
+        total = _count(TaskArchive, project_id)
+    else:
+        total = _count(Task, project_id) + (_count(TaskArchive, project_id) if kind == DELETE else 0)
+    job = ProjectJob(project_id=project_id, owner_id=owner_id, kind=kind, status=PENDING, total=total)
+    db.session.add(job)
+    if kind != RESTORE:
+        # Counters only describe live tasks of active projects
+        forget_project(project_id)
+    if kind == DELETE:
+        changes.record(owner_id, [(changes.PROJECT, project_id, changes.DELETED, project_id)])
+    elif kind == ARCHIVE:
+        changes.record(owner_id, [(changes.PROJECT, project_id, changes.ARCHIVED, project_id)])
+    else:
+        changes.record(owner_id, [(changes.PROJECT, project_id, changes.UPDATED, project_id)])
+    db.session.commit()
+    # Only needed here: the owner cache never holds projects that aren't active
+    invalidate_project(project_id)
+    _after_commit(job)
+    return job
+
+
+def _after_commit(job: ProjectJob):
+    invalidate(
+        project_ns(job.project_id), project_tasks_ns(job.project_id),
+        user_projects_ns(job.owner_id), user_tasks_ns(job.owner_id),
+    )
+    changes.publish(job.owner_id)
+
+
+def _claimable(now):
+    return and_(ProjectJob.status != DONE, claimable(ProjectJob, now))
+
+
+def _claim(job_id: int = None):
+    """Claim `job_id`, or the oldest claimable job; returns ``(job, token)`` or ``(None, None)``."""
+    now = datetime.utcnow()
+    if job_id is None:
+        job_id = db.session.scalar(select(ProjectJob.id).where(_claimable(now)).order_by(ProjectJob.id).limit(1))
+        if job_id is None:
+            db.session.rollback()
+            return None, None
+    token = uuid.uuid4().hex
+    claimed = db.session.execute(
+        update(ProjectJob)
+        .where(ProjectJob.id == job_id, _claimable(now))
+        .values(status=RUNNING, claimed_at=now, claim_token=token)
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        return None, None
+    return db.session.get(ProjectJob, job_id), token
+
+
+def _chunk_ids(model, project_id: int, size: int):
+    return db.session.scalars(
+        select(model.id).where(model.project_id == project_id).order_by(model.id).limit(size)
+    ).all()
+
+
+def _move(source, target, ids):
+    columns = [getattr(source, c) for c in TASK_COLUMNS]
+    names = list(TASK_COLUMNS)
+    if target is TaskArchive:
+        columns.append(literal(datetime.utcnow(), TaskArchive.archived_at.type))
+        names.append('archived_at')
+    db.session.execute(insert(target).from_select(names, select(*columns).where(source.id.in_(ids))))
+    db.session.execute(delete(source).where(source.id.in_(ids)))
+
+
+def _step(job: ProjectJob, size: int) -> int:
+    """Process one chunk of `job` in the current transaction; returns the rows handled (0: none left)."""
+    pid = job.project_id
+    if job.kind == DELETE:
+        # The archive has no foreign key to cascade from, so it goes first
+        for model in (TaskArchive, Task):
+            ids = _chunk_ids(model, pid, size)
+            if ids:
+                db.session.execute(delete(model).where(model.id.in_(ids)))
+                return len(ids)
+        return 0
+    source, target = (Task, TaskArchive) if job.kind == ARCHIVE else (TaskArchive, Task)
+    ids = _chunk_ids(source, pid, size)
+    if ids:
+        _move(source, target, ids)
+    return len(ids)
+
+
+def _finish(job: ProjectJob):
+    """Leave the project in its final state, in the current transaction."""
+    pid = job.project_id
+    if job.kind == DELETE:
+        forget_project(pid)
+        db.session.execute(delete(Project).where(Project.id == pid))
+    elif job.kind == ARCHIVE:
+        forget_project(pid)
+        db.session.execute(update(Project).where(Project.id == pid).values(state=PROJECT_ARCHIVED))
+        changes.record(job.owner_id, [(changes.PROJECT, pid, changes.UPDATED, pid)])
+    else:
+        rebuild(db.session.connection(), [pid])
+        db.session.execute(update(Project).where(Project.id == pid).values(state=PROJECT_ACTIVE))
+        changes.record(job.owner_id, [(changes.PROJECT, pid, changes.RESTORED, pid)])
+
+
+def run_job(job: ProjectJob, token: str) -> bool:
+    """Work through a claimed job chunk by chunk; returns True once it is done.
+
+    Every chunk commits together with the job's progress, and only while
+    the claim is still ours. A failure is recorded on the job, which is
+    retried once its claim times out.
+    """
+    config = current_app.config
+    size = config["PROJECT_JOB_CHUNK_SIZE"]
+    pause = config["PROJECT_JOB_CHUNK_PAUSE_MS"] / 1000
+    job_id = job.id
+    while True:
+        try:
+            n = _step(job, size)
+            now = datetime.utcnow()
+            progress = {"processed": ProjectJob.processed + n, "claimed_at": now}
+            if not n:
+                _finish(job)
+                progress.update(status=DONE, finished_at=now, claim_token=None)
+            held = db.session.execute(
+                update(ProjectJob).where(ProjectJob.id == job_id, ProjectJob.claim_token == token).values(**progress)
+            ).rowcount
+            if not held:
+                db.session.rollback()
+                return False
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Project job %s failed", job_id)
+            db.session.execute(update(ProjectJob).where(ProjectJob.id == job_id).values(error=str(e)[:1000]))
+            db.session.commit()
+            return False
+        if not n:
+            _after_commit(job)
+            return True
+        # Let other writers take the lock between chunks
+        time.sleep(pause)
+
+
+def run_now(job: ProjectJob) -> bool:
+    """Run a small job inside the request; False if a runner got to it first."""
+    claimed, token = _claim(job.id)
+    return claimed is not None and run_job(claimed, token)
+
+
+def run_project_jobs() -> int:
+    """Worker entry point: run claimable jobs until none are left; returns how many finished."""
+    finished = 0
+    while True:
+        job, token = _claim()
+        if job is None:
+            return finished
+        finished += run_job(job, token)
+
+
+def wake_runner():
+    """Start queued jobs now instead of at the next poll; a no-op with Celery."""
+    wake = current_app.extensions.get(EXTENSION_KEY)
+    if wake is not None:
+        wake.set()
+
+
+def start_background_runner(app):
+    """Run jobs on a daemon thread; used when no Celery broker is configured."""
+    app.extensions[EXTENSION_KEY] = start_runner(
+        app, "project-job-runner", app.config["PROJECT_JOB_INTERVAL"], run_project_jobs,
+    )
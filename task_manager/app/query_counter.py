@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app
+from sqlalchemy import event
+
+from . import db
+
+
+class QueryCounter:
+    """Collects SQL statements executed on an engine while attached."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """Count statements sent to the database inside the block.
+
+    Usage::
+
+        with count_queries() as counter:
+            client.get('/tasks/')
+        assert counter.count == 1
+    """
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+
+
+@contextmanager
+def assert_max_queries(limit: int, engine=None):
+    """Fail with the offending statements if the block runs more than `limit` queries."""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {limit} queries, got {counter.count}:\n{listing}")
+
+
+def query_budget(limit: int):
+    """Declare the maximum number of statements a view may execute.
+
+    Only enforced when ``ENFORCE_QUERY_BUDGETS`` is set (e.g. in test configs),
+    so an endpoint that regresses into N+1 loading fails loudly instead of
+    silently getting slower.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("ENFORCE_QUERY_BUDGETS"):
+                return fn(*args, **kwargs)
+            with assert_max_queries(limit):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
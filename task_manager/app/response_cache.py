@@ -0,0 +1,227 @@
+"""Per-user cache of read responses, invalidated through namespace versions.
+
+Responses record the version token of each namespace they were built from
+(see the *_ns helpers); invalidate() swaps in fresh tokens after a commit.
+"""
+import json
+import threading
+import uuid
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+from .cache import TTLCache
+
+EXTENSION_KEY = 'response_cache'
+
+# Response headers replayed on a hit; the body is always JSON
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+def task_ns(task_id: int) -> str:
+    return f'task:{task_id}'
+
+
+def project_ns(project_id: int) -> str:
+    return f'project:{project_id}'
+
+
+def project_tasks_ns(project_id: int) -> str:
+    return f'project-tasks:{project_id}'
+
+
+def user_tasks_ns(user_id: int) -> str:
+    """Every task in projects owned by `user_id`, including their project names."""
+    return f'user-tasks:{user_id}'
+
+
+def user_projects_ns(user_id: int) -> str:
+    return f'user-projects:{user_id}'
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._data = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_many(self, keys):
+        return [self._data.get(k) for k in keys]
+
+    def set_many(self, mapping: dict):
+        for k, v in mapping.items():
+            self._data.set(k, v)
+
+    @property
+    def evictions(self) -> int:
+        return self._data.evictions
+
+
+class FakeBackend:
+    def __init__(self):
+        self.store = {}
+
+    def get_many(self, keys):
+        return [json.loads(self.store[k]) if k in self.store else None for k in keys]
+
+    def set_many(self, mapping: dict):
+        self.store.update((k, json.dumps(v)) for k, v in mapping.items())
+
+    evictions = 0
+
+
+class RedisBackend:
+    def __init__(self, url: str, ttl: float, prefix: str = 'taskmgr:rc:'):
+        # Optional, and slow to import; only loaded when this backend is used
+        try:
+            import redis
+        except ImportError:  # pragma: no cover
+            raise RuntimeError("RESPONSE_CACHE=redis but the redis package is not installed") from None
+        self._client = redis.Redis.from_url(url)
+        self._ttl = max(1, int(ttl))
+        self._prefix = prefix
+
+    def get_many(self, keys):
+        values = self._client.mget([self._prefix + k for k in keys])
+        return [json.loads(v) if v is not None else None for v in values]
+
+    def set_many(self, mapping: dict):
+        pipe = self._client.pipeline(transaction=False)
+        for k, v in mapping.items():
+            pipe.set(self._prefix + k, json.dumps(v), ex=self._ttl)
+        pipe.execute()
+
+    @property
+    def evictions(self) -> int:
+        # Server-wide: includes keys evicted from other users of the instance
+        return int(self._client.info('stats').get('evicted_keys', 0))
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def versions(self, namespaces) -> dict:
+        """Current token of each namespace, minting tokens for unknown ones."""
+        namespaces = list(namespaces)
+        current = dict(zip(namespaces, self.backend.get_many(['v:' + ns for ns in namespaces])))
+        fresh = {ns: uuid.uuid4().hex for ns, v in current.items() if v is None}
+        if fresh:
+            self.backend.set_many({'v:' + ns: token for ns, token in fresh.items()})
+            current.update(fresh)
+        return current
+
+    def invalidate(self, *namespaces):
+        self.backend.set_many({'v:' + ns: uuid.uuid4().hex for ns in namespaces})
+
+    def get(self, key: str):
+        """The cached entry for `key` if every namespace it depends on is unchanged."""
+        entry = self.backend.get_many(['r:' + key])[0]
+        hit = entry is not None and self.versions(entry['deps']) == entry['deps']
+        self._count(hit)
+        return entry if hit else None
+
+    def put(self, key: str, resp, deps: dict):
+        headers = [(h, resp.headers[h]) for h in CACHED_HEADERS if h in resp.headers]
+        self.backend.set_many({'r:' + key: {
+            'status': resp.status_code,
+            'body': resp.get_data(as_text=True),
+            'headers': headers,
+            'deps': deps,
+        }})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.backend.evictions,
+            }
+
+
+def init_response_cache(app):
+    config = app.config
+    choice = config.get("RESPONSE_CACHE", "auto")
+    if choice == "auto":
+        choice = "redis" if config.get("RESPONSE_CACHE_URL") else "off"
+    if choice == "memory":
+        backend = MemoryBackend(config["RESPONSE_CACHE_SIZE"], config["RESPONSE_CACHE_TTL"])
+    elif choice == "redis":
+        if not config.get("RESPONSE_CACHE_URL"):
+            raise RuntimeError("RESPONSE_CACHE=redis needs RESPONSE_CACHE_URL")
+        backend = RedisBackend(config["RESPONSE_CACHE_URL"], config["RESPONSE_CACHE_TTL"])
+    elif choice == "fake":
+        backend = FakeBackend()
+    else:
+        backend = None
+    app.extensions[EXTENSION_KEY] = ResponseCache(backend) if backend else None
+
+
+def get_response_cache():
+    return current_app.extensions.get(EXTENSION_KEY)
+
+
+def cache_stats():
+    cache = get_response_cache()
+    return cache.stats() if cache else None
+
+
+def invalidate(*namespaces):
+    """Drop every cached response built from `namespaces`; call after commit."""
+    cache = get_response_cache()
+    if cache and namespaces:
+        cache.invalidate(*namespaces)
+
+
+def depends_on(*namespaces):
+    """Add namespaces a cached view only discovers while running (e.g. a task's project)."""
+    versions = g.get('response_cache_deps')
+    if versions is not None:
+        versions.update(get_response_cache().versions(namespaces))
+
+
+def _request_key() -> str:
+    args = sorted(request.args.items(multi=True))
+    return f"{g.user_id}:{request.path}?{json.dumps(args, separators=(',', ':'))}"
+
+
+def cached_view(namespaces):
+    """Serve a GET view from the response cache, keyed by user, path and query string.
+
+    `namespaces(**view_kwargs)` lists what the response is built from. Only
+    200 responses are stored. Hits are made conditional, so a matching
+    If-None-Match still gets a 304 without touching the database.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            if cache is None or not g.get('user_id'):
+                return fn(*args, **kwargs)
+            key = _request_key()
+            entry = cache.get(key)
+            if entry is not None:
+                resp = current_app.response_class(entry['body'], status=entry['status'], headers=entry['headers'])
+                return resp.make_conditional(request)
+
+            # Taken before the view reads, so a racing write costs a miss, never a stale hit
+            g.response_cache_deps = cache.versions(namespaces(**kwargs))
+            try:
+                resp = make_response(fn(*args, **kwargs))
+                deps = g.response_cache_deps
+            finally:
+                g.pop('response_cache_deps', None)
+            if resp.status_code == 200:
+                cache.put(key, resp, deps)
+            return resp
+        return wrapper
+    return decorator
@@ -1,11 +1,14 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import create_access_token
+from ..admission import busy_response
+from ..identity import login_required
 from ..models import User
+from ..passwords import HashingBusy, get_hasher
 from .. import db
 
 auth_bp = Blueprint('auth', __name__)
 
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json(silent=True) or {}
@@ -19,7 +22,10 @@ def register():
     if User.query.filter((User.username == username) | (User.email == email)).first():
         return jsonify({'error': 'User already exists'}), 400
 
-    hashed_password = generate_password_hash(password)
+    try:
+        hashed_password = get_hasher().hash(password)
+    except (HashingBusy, TimeoutError):
+        return busy_response()
     user = User(username=username, password=hashed_password, email=email)
     db.session.add(user)
     db.session.commit()
@@ -34,22 +40,27 @@ def login():
         return jsonify({'error': 'Invalid input'}), 400
 
     user = User.query.filter_by(username=username).first()
-    if user and check_password_hash(user.password, password):
-        token = create_access_token(identity=str(user.id))
-        return jsonify({'access_token': token, 'user': {'id': user.id, 'username': user.username, 'email': user.email}}), 200
-    return jsonify({'error': 'Invalid credentials'}), 401
+    if not user:
+        return jsonify({'error': 'Invalid credentials'}), 401
+    hasher = get_hasher()
+    try:
+        if not hasher.verify(user.password, password):
+            return jsonify({'error': 'Invalid credentials'}), 401
+        if hasher.needs_rehash(user.password):
+            # Hash parameters changed since this password was set
+            user.password = hasher.hash(password)
+            db.session.commit()
+    except (HashingBusy, TimeoutError):
+        return busy_response()
+    token = create_access_token(identity=str(user.id))
+    return jsonify({'access_token': token, 'user': {'id': user.id, 'username': user.username, 'email': user.email}}), 200
 
 @auth_bp.route('/me', methods=['GET'])
-@jwt_required()
+@login_required
 def me():
-    uid = get_jwt_identity()
-    try:
-        uid_int = int(uid) if uid is not None else None
-    except (TypeError, ValueError):
-        uid_int = None
-    if uid_int is None:
+    if g.user_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
-    user = User.query.get(uid_int)
+    user = User.query.get(g.user_id)
     if not user:
         return jsonify({'error': 'Not found'}), 404
     return jsonify({'id': user.id, 'username': user.username, 'email': user.email}), 200
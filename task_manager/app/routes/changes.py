@@ -0,0 +1,231 @@
+from flask import Blueprint, Response, current_app, g, jsonify, request, stream_with_context
+from sqlalchemy import and_, select
+from sqlalchemy.orm import aliased
+from .. import changes, db
+from ..identity import login_required
+from ..models import ChangeLog, Project, Task, User
+from ..query_counter import query_budget
+from .tasks import TASK_LIST_COLUMNS, task_row_to_dict
+import time
+
+changes_bp = Blueprint('changes', __name__)
+
+# Milliseconds an EventSource waits before reconnecting
+STREAM_RETRY_MS = 2000
+
+STREAM_HEADERS = {
+    'Cache-Control': 'no-cache',
+    # Let each event through reverse proxies as soon as it is written
+    'X-Accel-Buffering': 'no',
+}
+
+ChangedProject = aliased(Project, name='changed_project')
+
+
+# The statement builders and renderers below are shared with the async
+# stream in app/asgi.py.
+
+def since_arg():
+    """The client's cursor: ?since=, else Last-Event-ID (EventSource reconnects); None if absent.
+
+    Returns ``(since, error_response)``.
+    """
+    raw = request.args.get('since')
+    if raw is None:
+        raw = request.headers.get('Last-Event-ID')
+    if raw is None or raw == '':
+        return None, None
+    try:
+        since = int(raw)
+    except ValueError:
+        since = -1
+    if since < 0:
+        return None, (jsonify({"error": "Invalid 'since'"}), 400)
+    return since, None
+
+
+def cursor_gone(since: int, oldest) -> bool:
+    """True when entries after `since` may have been pruned already."""
+    return oldest is not None and since < oldest - 1
+
+
+def gone_response():
+    return jsonify({"error": "Cursor too old, reload the task and project lists"}), 410
+
+
+def changes_statement(user_id: int, since: int, limit: int):
+    """A page of user_id's entries after `since`, with the current state of each changed row.
+
+    Tasks come as TASK_LIST_COLUMNS (same joins as list_tasks), projects
+    from a second, aliased join; rows deleted since are simply NULL.
+    """
+    return (
+        select(
+            ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.action,
+            ChangeLog.project_id.label('change_project_id'), ChangeLog.created_at.label('changed_at'),
+            *TASK_LIST_COLUMNS,
+            ChangedProject.id.label('changed_project_id'),
+            ChangedProject.name.label('changed_project_name'),
+            ChangedProject.description.label('changed_project_description'),
+            ChangedProject.owner_id.label('changed_project_owner_id'),
+            ChangedProject.created_at.label('changed_project_created_at'),
+            ChangedProject.state.label('changed_project_state'),
+        )
+        .select_from(ChangeLog)
+        .outerjoin(Task, and_(ChangeLog.entity == changes.TASK, Task.id == ChangeLog.entity_id))
+        .outerjoin(Project, Task.project_id == Project.id)
+        .outerjoin(User, Task.assigned_to == User.id)
+        .outerjoin(ChangedProject, and_(ChangeLog.entity == changes.PROJECT, ChangedProject.id == ChangeLog.entity_id))
+        .where(ChangeLog.user_id == user_id, ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+    )
+
+
+def _entry_data(r):
+    if r.action == changes.DELETED:
+        return None
+    if r.entity == changes.TASK:
+        return task_row_to_dict(r) if r.id is not None else None
+    if r.changed_project_id is None:
+        return None
+    return {
+        "id": r.changed_project_id,
+        "name": r.changed_project_name,
+        "description": r.changed_project_description,
+        "owner_id": r.changed_project_owner_id,
+        "created_at": r.changed_project_created_at.isoformat() if r.changed_project_created_at else None,
+        "state": r.changed_project_state,
+    }
+
+
+def change_entries(rows, limit: int):
+    """Render a changes_statement page; returns ``(entries, has_more)``.
+
+    Only the latest entry per entity is kept, since each carries the row's
+    current state anyway. That is always the page's last row, so the
+    cursor (the last entry's seq) is unaffected.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {(r.entity, r.entity_id): r for r in rows}
+    entries = [
+        {
+            "seq": r.seq,
+            "entity": r.entity,
+            "id": r.entity_id,
+            "action": r.action,
+            "project_id": r.change_project_id,
+            "at": r.changed_at.isoformat(),
+            "data": _entry_data(r),
+        }
+        for r in sorted(latest.values(), key=lambda r: r.seq)
+    ]
+    return entries, has_more
+
+
+def sse_event(entry, dumps) -> str:
+    return f"id: {entry['seq']}\nevent: change\ndata: {dumps(entry)}\n\n"
+
+
+SSE_KEEPALIVE = ": keepalive\n\n"
+
+
+def sse_preamble(cursor: int) -> str:
+    # The id sets the client's Last-Event-ID before the first change arrives
+    return f"retry: {STREAM_RETRY_MS}\nid: {cursor}\n\n"
+
+
+@changes_bp.route('/', methods=['GET'])
+@login_required
+@query_budget(2)
+def list_changes():
+    """Changes to the user's tasks and projects after ?since=<seq>, oldest first.
+
+    Each entity appears once per page, with its current row in `data`
+    (null once deleted), so clients upsert on created and updated alike.
+    Without `since`, returns no changes and the current cursor to start
+    from. A cursor older than the retained log gets 410: take a fresh cursor
+    (no `since`), then reload the lists. A project entry with action
+    deleted, archived or restored stands for all of the project's tasks.
+    """
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    since, error = since_arg()
+    if error:
+        return error
+    if since is None:
+        return jsonify({"changes": [], "cursor": changes.latest_seq(), "has_more": False}), 200
+    if cursor_gone(since, changes.oldest_seq()):
+        return gone_response()
+
+    page_size = current_app.config["CHANGE_FEED_PAGE_SIZE"]
+    limit = max(1, min(request.args.get('limit', default=page_size, type=int), page_size))
+    rows = db.session.execute(changes_statement(g.user_id, since, limit)).all()
+    entries, has_more = change_entries(rows, limit)
+    cursor = entries[-1]["seq"] if entries else since
+    return jsonify({"changes": entries, "cursor": cursor, "has_more": has_more}), 200
+
+
+@changes_bp.route('/stream', methods=['GET'])
+@login_required
+def stream_changes():
+    """Server-Sent Events: one ``change`` event per entry, pushed as changes are committed.
+
+    Resumes after Last-Event-ID (or ?since=), else starts at the current
+    cursor. Idle streams hold no database connection and run no queries
+    while the broker can wake them; with the per-process broker they also
+    check the log once per heartbeat, for changes made by other workers.
+    The stream ends after CHANGE_STREAM_MAX_SECONDS and the client
+    reconnects where it left off. Sync workers get 501 instead.
+    """
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    if not request.environ.get('wsgi.multithread'):
+        # A sync worker (gunicorn's default) would serve nothing else until the stream ends
+        return jsonify({
+            "error": "Event streams need a threaded or async server (SERVER_MODE=asgi); poll /changes/?since= instead",
+        }), 501
+    since, error = since_arg()
+    if error:
+        return error
+    if since is None:
+        since = changes.latest_seq()
+    elif cursor_gone(since, changes.oldest_seq()):
+        return gone_response()
+
+    config = current_app.config
+    user_id = g.user_id
+    broker = changes.get_broker()
+    dumps = current_app.json.dumps
+    page_size = config["CHANGE_FEED_PAGE_SIZE"]
+    heartbeat = config["CHANGE_STREAM_HEARTBEAT"]
+    deadline = time.monotonic() + config["CHANGE_STREAM_MAX_SECONDS"]
+
+    def events():
+        cursor = since
+        # Subscribed before the first read, so no publish can fall in between
+        sub = broker.subscribe(user_id)
+        try:
+            yield sse_preamble(cursor)
+            check = True
+            while True:
+                while check:
+                    rows = db.session.execute(changes_statement(user_id, cursor, page_size)).all()
+                    entries, check = change_entries(rows, page_size)
+                    if entries:
+                        cursor = entries[-1]["seq"]
+                        yield "".join(sse_event(e, dumps) for e in entries)
+                # Hand the connection back to the pool while idle
+                db.session.close()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                check = sub.wait(min(heartbeat, remaining))
+                if not check:
+                    yield SSE_KEEPALIVE
+                    check = not broker.cross_process
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers=STREAM_HEADERS)
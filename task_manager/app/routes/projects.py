@@ -1,7 +1,15 @@
-from flask import Blueprint, request, jsonify, g, abort
-from flask_jwt_extended import jwt_required
-from .. import db
-from ..models import Project, Task, User
+from flask import Blueprint, current_app, request, jsonify, g, abort, url_for
+from sqlalchemy import func, select, tuple_, union_all
+from .. import changes, db, project_jobs
+from ..authz import project_owner
+from ..conditional import make_etag, not_modified, with_validators
+from ..identity import login_required
+from ..models import PROJECT_ACTIVE, PROJECT_DELETING, Project, ProjectJob, Task, TaskArchive, User
+from ..pagination import InvalidCursor, decode_cursor, keyset_page, keyset_requested, page_size_arg
+from ..response_cache import (
+    cached_view, invalidate, project_ns, project_tasks_ns, user_projects_ns, user_tasks_ns,
+)
+from ..stats import project_stats
 from datetime import datetime
 
 projects_bp = Blueprint('projects', __name__)
@@ -14,8 +22,19 @@ def project_to_dict(p: Project, include_tasks: bool = False):
         "description": p.description,
         "owner_id": p.owner_id,
         "created_at": p.created_at.isoformat() if p.created_at else None,
+        "state": p.state,
     }
     if include_tasks:
+        def columns(model):
+            return select(
+                model.id, model.title, model.description, model.status, model.priority,
+                model.due_date, model.assigned_to, model.created_at,
+            ).where(model.project_id == p.id)
+
+        stmt = columns(Task)
+        if p.state != PROJECT_ACTIVE:
+            # Archived tasks, or both halves while a job moves them
+            stmt = union_all(stmt, columns(TaskArchive))
         data["tasks"] = [
             {
                 "id": t.id,
@@ -27,13 +46,13 @@ def project_to_dict(p: Project, include_tasks: bool = False):
                 "assigned_to": t.assigned_to,
                 "created_at": t.created_at.isoformat() if t.created_at else None,
             }
-            for t in Task.query.filter_by(project_id=p.id).order_by(Task.created_at.desc()).all()
+            for t in db.session.execute(stmt.order_by(stmt.selected_columns.created_at.desc()))
         ]
     return data
 
 
 @projects_bp.route('/', methods=['POST'])
-@jwt_required()
+@login_required
 def create_project():
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
@@ -45,42 +64,102 @@ def create_project():
 
     p = Project(name=name, description=description, owner_id=g.user_id)
     db.session.add(p)
+    db.session.flush()
+    changes.record(g.user_id, [(changes.PROJECT, p.id, changes.CREATED, p.id)])
     db.session.commit()
+    invalidate(user_projects_ns(g.user_id))
+    changes.publish(g.user_id)
     return jsonify(project_to_dict(p)), 201
 
 
 @projects_bp.route('/', methods=['GET'])
-@jwt_required()
+@login_required
+@cached_view(lambda: [user_projects_ns(g.user_id)])
 def list_projects():
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
-    projects = Project.query.filter_by(owner_id=g.user_id).order_by(Project.created_at.desc()).all()
-    return jsonify([project_to_dict(p) for p in projects]), 200
+    count, changed = (
+        db.session.query(func.count(Project.id), func.max(Project.updated_at))
+        .filter(Project.owner_id == g.user_id, Project.state != PROJECT_DELETING)
+        .one()
+    )
+    etag = make_etag('projects', g.user_id, sorted(request.args.items(multi=True)), count, changed)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    # Plain rows are enough for project_to_dict; skip ORM hydration
+    q = (
+        db.session.query(
+            Project.id, Project.name, Project.description, Project.owner_id, Project.created_at, Project.state,
+        )
+        .filter(Project.owner_id == g.user_id, Project.state != PROJECT_DELETING)
+        .order_by(Project.created_at.desc(), Project.id.desc())
+    )
+    if keyset_requested():
+        token = request.args.get('cursor') or ''
+        if token:
+            try:
+                created_at, last_id = decode_cursor(token, 'created_at')
+                q = q.filter(tuple_(Project.created_at, Project.id) < tuple_(datetime.fromisoformat(created_at), int(last_id)))
+            except (InvalidCursor, TypeError, ValueError):
+                return jsonify({"error": "Invalid cursor"}), 400
+        items, next_cursor = keyset_page(
+            q, page_size_arg(), 'created_at', lambda p: [p.created_at.isoformat(), p.id]
+        )
+        resp = jsonify({"items": [project_to_dict(p) for p in items], "next_cursor": next_cursor})
+        return with_validators(resp, etag), 200
+
+    projects = q.all()
+    return with_validators(jsonify([project_to_dict(p) for p in projects]), etag), 200
 
 
 @projects_bp.route('/<int:project_id>', methods=['GET'])
-@jwt_required()
+@login_required
+@cached_view(lambda project_id: [project_ns(project_id), project_tasks_ns(project_id)])
 def get_project(project_id: int):
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
     p = Project.query.get_or_404(project_id)
-    if p.owner_id != g.user_id:
+    if p.owner_id != g.user_id or p.state == PROJECT_DELETING:
         return jsonify({"error": "Not found"}), 404
 
-    return jsonify(project_to_dict(p, include_tasks=True)), 200
+    count, tasks_changed = (
+        db.session.query(func.count(Task.id), func.max(Task.updated_at))
+        .filter(Task.project_id == p.id)
+        .one()
+    )
+    etag = make_etag('project', p.id, p.updated_at, count, tasks_changed)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+    return with_validators(jsonify(project_to_dict(p, include_tasks=True)), etag), 200
+
+
+@projects_bp.route('/<int:project_id>/stats', methods=['GET'])
+@login_required
+def get_project_stats(project_id: int):
+    """Task counts by status, priority, assignee and overdue, from the stats counters."""
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    if project_owner(project_id) != g.user_id:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({"project_id": project_id, **project_stats(project_id)}), 200
 
 
 @projects_bp.route('/<int:project_id>', methods=['PATCH'])
-@jwt_required()
+@login_required
 def update_project(project_id: int):
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
     p = Project.query.get_or_404(project_id)
-    if p.owner_id != g.user_id:
+    if p.owner_id != g.user_id or p.state == PROJECT_DELETING:
         return jsonify({"error": "Not found"}), 404
+    if p.state != PROJECT_ACTIVE:
+        return jsonify({"error": f"Project is {p.state}"}), 409
 
     data = request.get_json(silent=True) or {}
     if "name" in data:
@@ -92,22 +171,79 @@ def update_project(project_id: int):
         desc = data.get("description")
         p.description = (desc or "").strip() or None
 
+    changes.record(g.user_id, [(changes.PROJECT, p.id, changes.UPDATED, p.id)])
     db.session.commit()
+    # Task listings embed the project name
+    invalidate(project_ns(p.id), user_projects_ns(g.user_id), user_tasks_ns(g.user_id))
+    changes.publish(g.user_id)
     return jsonify(project_to_dict(p)), 200
 
 
+def _run_project_job(p: Project, kind: str, done_message: str, started_message: str):
+    """Start `kind` on `p`: inline when it fits in one chunk (200), else in the background (202)."""
+    try:
+        job = project_jobs.start_job(p.id, g.user_id, kind)
+    except project_jobs.JobConflict:
+        return jsonify({"error": f"Project is {p.state}"}), 409
+    if job.total <= current_app.config["PROJECT_JOB_CHUNK_SIZE"] and project_jobs.run_now(job):
+        return jsonify({"message": done_message, "job": project_jobs.job_to_dict(job)}), 200
+
+    project_jobs.wake_runner()
+    resp = jsonify({"message": started_message, "job": project_jobs.job_to_dict(job)})
+    resp.headers['Location'] = url_for('projects.get_project_job', job_id=job.id)
+    return resp, 202
+
+
 @projects_bp.route('/<int:project_id>', methods=['DELETE'])
-@jwt_required()
+@login_required
 def delete_project(project_id: int):
+    """Delete the project and its tasks (archived ones included).
+
+    Large projects are deleted in chunks in the background; the project
+    disappears at once and the returned job reports progress.
+    """
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
     p = Project.query.get_or_404(project_id)
-    if p.owner_id != g.user_id:
+    if p.owner_id != g.user_id or p.state == PROJECT_DELETING:
         return jsonify({"error": "Not found"}), 404
+    return _run_project_job(p, project_jobs.DELETE, "Deleted", "Deletion started")
 
-    # Manually delete tasks to avoid FK issues if DB lacks ON DELETE CASCADE
-    Task.query.filter_by(project_id=p.id).delete(synchronize_session=False)
-    db.session.delete(p)
-    db.session.commit()
-    return jsonify({"message": "Deleted"}), 200
+
+@projects_bp.route('/<int:project_id>/archive', methods=['POST'])
+@login_required
+def archive_project(project_id: int):
+    """Move the project's tasks to the archive; the project stays listed, read-only."""
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    p = Project.query.get_or_404(project_id)
+    if p.owner_id != g.user_id or p.state == PROJECT_DELETING:
+        return jsonify({"error": "Not found"}), 404
+    return _run_project_job(p, project_jobs.ARCHIVE, "Archived", "Archiving started")
+
+
+@projects_bp.route('/<int:project_id>/restore', methods=['POST'])
+@login_required
+def restore_project(project_id: int):
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    p = Project.query.get_or_404(project_id)
+    if p.owner_id != g.user_id or p.state == PROJECT_DELETING:
+        return jsonify({"error": "Not found"}), 404
+    return _run_project_job(p, project_jobs.RESTORE, "Restored", "Restore started")
+
+
+@projects_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_project_job(job_id: int):
+    """Progress of a delete/archive/restore job."""
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    job = db.session.get(ProjectJob, job_id)
+    if job is None or job.owner_id != g.user_id:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify(project_jobs.job_to_dict(job)), 200
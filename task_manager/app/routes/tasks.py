@@ -1,12 +1,26 @@
-from flask import Blueprint, request, jsonify, g
-from flask_jwt_extended import jwt_required
-from .. import db
-from ..models import Task, Project, User
-from datetime import datetime
-# Email/Celery notifications disabled
-
-VALID_STATUSES = {"todo", "in_progress", "done"}
-VALID_PRIORITIES = {"low", "medium", "high"}
+from flask import Blueprint, Response, abort, current_app, request, jsonify, g, stream_with_context
+from sqlalchemy import and_, delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from .. import changes, db, notifications
+from ..authz import invalidate_project, lock_active_projects, owned_project_ids, project_owner
+from ..conditional import make_etag, not_modified, with_validators
+from ..identity import login_required
+from ..models import Task, Project, User, PRIORITIES, PRIORITY_RANK, PROJECT_ACTIVE, STATUSES, STATUS_RANK
+from ..pagination import InvalidCursor, decode_cursor, keyset_requested, keyset_result, page_size_arg
+from ..query_counter import query_budget
+from ..response_cache import (
+    cached_view, depends_on, invalidate, project_ns, project_tasks_ns, task_ns, user_tasks_ns,
+)
+from ..search import apply_search, search_arg
+from ..stats import TaskStatDelta, user_stats
+from datetime import date, datetime
+from typing import NamedTuple
+import csv
+import io
+
+VALID_STATUSES = set(STATUSES)
+VALID_PRIORITIES = set(PRIORITIES)
 
 
 tasks_bp = Blueprint('tasks', __name__)
@@ -34,8 +48,9 @@ def task_to_dict(t: Task, include_refs: bool = False):
         "created_at": t.created_at.isoformat() if t.created_at else None,
     }
     if include_refs:
-        proj = Project.query.get(t.project_id) if t.project_id else None
-        user = User.query.get(t.assigned_to) if t.assigned_to else None
+        # Relies on the caller eager-loading project/assignee (see load_task)
+        proj = t.project
+        user = t.assignee
         data["project"] = {
             "id": proj.id,
             "name": proj.name,
@@ -48,8 +63,153 @@ def task_to_dict(t: Task, include_refs: bool = False):
     return data
 
 
+# Read-only list endpoints select these columns as plain rows instead of
+# hydrating Task/Project/User objects; see task_row_to_dict.
+TASK_LIST_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.status, Task.priority, Task.due_date,
+    Task.project_id, Task.assigned_to, Task.created_at, Task.status_rank, Task.priority_rank,
+    Project.name.label('project_name'),
+    User.username.label('assignee_username'),
+    User.email.label('assignee_email'),
+)
+
+
+def task_row_to_dict(r):
+    """Same shape as task_to_dict(t, include_refs=True), for a TASK_LIST_COLUMNS row."""
+    return {
+        "id": r.id,
+        "title": r.title,
+        "description": r.description,
+        "status": r.status,
+        "priority": r.priority,
+        "due_date": r.due_date.isoformat() if r.due_date else None,
+        "project_id": r.project_id,
+        "assigned_to": r.assigned_to,
+        "created_at": r.created_at.isoformat() if r.created_at else None,
+        "project": {"id": r.project_id, "name": r.project_name},
+        "assigned_user": {
+            "id": r.assigned_to,
+            "username": r.assignee_username,
+            "email": r.assignee_email,
+        } if r.assignee_username is not None else None,
+    }
+
+
+def _apply_task_filters(q):
+    """Apply the list_tasks query-string filters to a Query or Select."""
+    status = request.args.get('status')
+    priority = request.args.get('priority')
+    due_date = parse_date(request.args.get('due_date'))
+    project_id = request.args.get('project_id', type=int)
+
+    # Known values filter on the indexed ordinals; unknown ones simply match nothing
+    if status:
+        q = q.filter(Task.status_rank == STATUS_RANK[status] if status in STATUS_RANK else Task.status == status)
+    if priority:
+        q = q.filter(Task.priority_rank == PRIORITY_RANK[priority] if priority in PRIORITY_RANK else Task.priority == priority)
+    if due_date:
+        q = q.filter(Task.due_date == due_date)
+    if project_id:
+        q = q.filter(Task.project_id == project_id)
+    return q
+
+
+def _sort_arg():
+    # id breaks ties in every order so both pagination modes are stable
+    sort = (request.args.get('sort') or '').strip()
+    return sort if sort in ('priority', 'status', 'due_date') else 'created_at'
+
+
+def _search_and_order(q):
+    """Apply the `q` text search and the requested order; returns ``(q, sort)``.
+
+    A search without an explicit `sort` is ranked by relevance, reported as
+    sort ``'relevance'``.
+    """
+    sort = _sort_arg()
+    text = search_arg()
+    if text:
+        q, by_rank = apply_search(q, text)
+        if not request.args.get('sort'):
+            return q.order_by(*by_rank), 'relevance'
+    return q.order_by(*_task_order(sort)), sort
+
+
+def _task_order(sort: str):
+    if sort == 'priority':
+        return [Task.priority_rank.desc(), Task.id.desc()]
+    if sort == 'status':
+        return [Task.status_rank.asc(), Task.id.asc()]
+    if sort == 'due_date':
+        # SQLite-safe: non-null first, then ascending dates
+        return [Task.due_date.is_(None), Task.due_date.asc(), Task.id.asc()]
+    return [Task.created_at.desc(), Task.id.desc()]
+
+
+def _task_sort_key(t: Task, sort: str):
+    if sort == 'priority':
+        return [t.priority_rank, t.id]
+    if sort == 'status':
+        return [t.status_rank, t.id]
+    if sort == 'due_date':
+        return [t.due_date.isoformat() if t.due_date else None, t.id]
+    return [t.created_at.isoformat(), t.id]
+
+
+def _task_after(sort: str, values):
+    """Keyset predicate selecting rows strictly after the cursor in `_task_order`."""
+    key, last_id = values
+    last_id = int(last_id)
+    if sort == 'priority':
+        return tuple_(Task.priority_rank, Task.id) < tuple_(int(key), last_id)
+    if sort == 'status':
+        return tuple_(Task.status_rank, Task.id) > tuple_(int(key), last_id)
+    if sort == 'due_date':
+        if key is None:
+            return and_(Task.due_date.is_(None), Task.id > last_id)
+        due = date.fromisoformat(key)
+        return or_(tuple_(Task.due_date, Task.id) > tuple_(due, last_id), Task.due_date.is_(None))
+    return tuple_(Task.created_at, Task.id) < tuple_(datetime.fromisoformat(key), last_id)
+
+
+def load_task(task_id: int):
+    """Fetch a task together with its project and assignee in a single query."""
+    return (
+        Task.query
+        .options(joinedload(Task.project), joinedload(Task.assignee))
+        .populate_existing()
+        .get_or_404(task_id)
+    )
+
+
+def task_statement(task_id: int):
+    """load_task as a statement, for callers with their own (async) session."""
+    return select(Task).options(joinedload(Task.project), joinedload(Task.assignee)).where(Task.id == task_id)
+
+
+def task_response(t: Task):
+    """get_task's response for a task loaded with its refs; checks ownership."""
+    proj = t.project
+    if not proj or proj.owner_id != g.user_id or proj.state != PROJECT_ACTIVE:
+        return jsonify({"error": "Not found"}), 404
+    depends_on(project_ns(proj.id))
+
+    etag = make_etag('task', t.id, t.updated_at, proj.updated_at, t.assigned_to)
+    last_modified = max(t.updated_at, proj.updated_at)
+    unchanged = not_modified(etag, last_modified)
+    if unchanged:
+        return unchanged
+    return with_validators(jsonify(task_to_dict(t, include_refs=True)), etag, last_modified), 200
+
+
+def _is_id(value) -> bool:
+    # bool is an int subclass, but `true` is not task or project 1
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
 @tasks_bp.route('/', methods=['POST'])
-@jwt_required()
+@login_required
+@query_budget(8)
 def create_task():
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
@@ -64,11 +224,17 @@ def create_task():
 
     if not title:
         return jsonify({"error": "'title' is required"}), 400
-    if not project_id:
+    if project_id is None:
         return jsonify({"error": "'project_id' is required"}), 400
-
-    proj = Project.query.get_or_404(project_id)
-    if proj.owner_id != g.user_id:
+    if not _is_id(project_id):
+        return jsonify({"error": "'project_id' must be an integer"}), 400
+    if assigned_to is not None and not _is_id(assigned_to):
+        return jsonify({"error": "'assigned_to' must be an integer"}), 400
+
+    owner_id = project_owner(project_id)
+    if owner_id is None:
+        abort(404)
+    if owner_id != g.user_id:
         return jsonify({"error": "Not found"}), 404
 
     if status not in VALID_STATUSES:
@@ -91,83 +257,476 @@ def create_task():
         assigned_to=assigned_to,
     )
     db.session.add(t)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # Cached owner outlived a project deleted by another worker
+        db.session.rollback()
+        invalidate_project(project_id)
+        return jsonify({"error": "Not found"}), 404
+    if not lock_active_projects([project_id]):
+        # ... or one another worker started archiving or deleting
+        db.session.rollback()
+        invalidate_project(project_id)
+        return jsonify({"error": "Not found"}), 404
+    task_id = t.id
+    delta = TaskStatDelta()
+    delta.add_task(t)
+    delta.apply()
+    if assigned_to:
+        notifications.enqueue([(task_id, notifications.ASSIGNED)])
+    changes.record(g.user_id, [(changes.TASK, task_id, changes.CREATED, project_id)])
     db.session.commit()
+    invalidate(project_tasks_ns(project_id), user_tasks_ns(g.user_id))
+    changes.publish(g.user_id)
+
+    return jsonify(task_to_dict(load_task(task_id), include_refs=True)), 201
+
+
+def _bulk_items(data: dict, key: str):
+    """Return (items, error) for the list under `key` of a bulk request body."""
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        return None, f"'{key}' must be a non-empty list"
+    limit = current_app.config["BULK_MAX_ITEMS"]
+    if len(items) > limit:
+        return None, f"At most {limit} items per request"
+    return items, None
+
+
+def _task_values(item, partial: bool):
+    """Validate the writable task fields of one bulk item.
+
+    Returns (values, error); with `partial` only the keys present are checked,
+    mirroring update_task, otherwise create_task's defaults apply.
+    """
+    if not isinstance(item, dict):
+        return None, "Item must be an object"
+    for key in ("title", "description", "status", "priority", "due_date"):
+        if not isinstance(item.get(key), (str, type(None))):
+            return None, f"'{key}' must be a string"
+    if item.get("assigned_to") is not None and not _is_id(item["assigned_to"]):
+        return None, "'assigned_to' must be an integer"
+    values = {}
+    if not partial or "title" in item:
+        title = (item.get("title") or "").strip()
+        if not title:
+            return None, "'title' cannot be empty" if partial else "'title' is required"
+        values["title"] = title
+    if not partial or "description" in item:
+        values["description"] = (item.get("description") or "").strip() or None
+    if not partial or "status" in item:
+        status = (item.get("status") or ("" if partial else "todo")).strip()
+        if status not in VALID_STATUSES:
+            return None, "Invalid status"
+        values["status"] = status
+        values["status_rank"] = STATUS_RANK[status]
+    if not partial or "priority" in item:
+        priority = (item.get("priority") or ("" if partial else "medium")).strip()
+        if priority not in VALID_PRIORITIES:
+            return None, "Invalid priority"
+        values["priority"] = priority
+        values["priority_rank"] = PRIORITY_RANK[priority]
+    if not partial or "due_date" in item:
+        values["due_date"] = parse_date(item.get("due_date"))
+    if not partial or "assigned_to" in item:
+        values["assigned_to"] = item.get("assigned_to") or None
+    return values, None
+
+
+def _existing_user_ids(user_ids):
+    if not user_ids:
+        return set()
+    return set(db.session.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+
+@tasks_bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_create_tasks():
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    items, error = _bulk_items(request.get_json(silent=True) or {}, "tasks")
+    if error:
+        return jsonify({"error": error}), 400
+
+    results = [None] * len(items)
+    parsed = []
+    for i, item in enumerate(items):
+        values, error = _task_values(item, partial=False)
+        if not error and not _is_id(item.get("project_id")):
+            error = "'project_id' is required"
+        if error:
+            results[i] = {"index": i, "status": 400, "error": error}
+            continue
+        values["project_id"] = item["project_id"]
+        parsed.append((i, values))
+
+    # At most one query each for project ownership and assignee existence
+    owned = owned_project_ids({v["project_id"] for _, v in parsed}, g.user_id)
+    users = _existing_user_ids({v["assigned_to"] for _, v in parsed if v["assigned_to"]})
+
+    rows, row_index = [], []
+    for i, values in parsed:
+        if values["project_id"] not in owned:
+            results[i] = {"index": i, "status": 404, "error": "Not found"}
+        elif values["assigned_to"] and values["assigned_to"] not in users:
+            results[i] = {"index": i, "status": 400, "error": "assigned_to not found"}
+        else:
+            rows.append(values)
+            row_index.append(i)
+
+    if rows:
+        try:
+            ids = db.session.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows).all()
+        except IntegrityError:
+            db.session.rollback()
+            for pid in {r["project_id"] for r in rows}:
+                invalidate_project(pid)
+            return jsonify({"error": "Project not found, retry the request"}), 409
+        # Cached owners may be stale for projects another worker took out of
+        # the active state; drop what landed in those
+        active = lock_active_projects({r["project_id"] for r in rows})
+        stale = [task_id for task_id, r in zip(ids, rows) if r["project_id"] not in active]
+        if stale:
+            db.session.execute(delete(Task).where(Task.id.in_(stale)))
+            for i, r in zip(row_index, rows):
+                if r["project_id"] not in active:
+                    results[i] = {"index": i, "status": 404, "error": "Not found"}
+            for pid in {r["project_id"] for r in rows} - active:
+                invalidate_project(pid)
+            kept = [n for n, r in enumerate(rows) if r["project_id"] in active]
+            rows, ids, row_index = [rows[n] for n in kept], [ids[n] for n in kept], [row_index[n] for n in kept]
+    if rows:
+        delta = TaskStatDelta()
+        for r in rows:
+            delta.add(r["project_id"], r["status"], r["priority"], r["assigned_to"], r["due_date"])
+        delta.apply()
+        notifications.enqueue([(task_id, notifications.ASSIGNED) for task_id, r in zip(ids, rows) if r["assigned_to"]])
+        changes.record(g.user_id, [(changes.TASK, task_id, changes.CREATED, r["project_id"]) for task_id, r in zip(ids, rows)])
+        db.session.commit()
+        invalidate(user_tasks_ns(g.user_id), *{project_tasks_ns(r["project_id"]) for r in rows})
+        changes.publish(g.user_id)
+        for i, task_id in zip(row_index, ids):
+            results[i] = {"index": i, "status": 201, "id": task_id}
+
+    return jsonify({"results": results, "created": len(rows)}), 200
+
+
+@tasks_bp.route('/bulk', methods=['PATCH'])
+@login_required
+def bulk_update_tasks():
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    items, error = _bulk_items(request.get_json(silent=True) or {}, "tasks")
+    if error:
+        return jsonify({"error": error}), 400
+
+    results = [None] * len(items)
+    parsed = []
+    seen = set()
+    for i, item in enumerate(items):
+        values, error = _task_values(item, partial=True)
+        task_id = item.get("id") if not error else None
+        if not error and not _is_id(task_id):
+            error = "'id' is required"
+        elif not error and task_id in seen:
+            error = "Duplicate id"
+        if error:
+            results[i] = {"index": i, "status": 400, "error": error}
+            continue
+        seen.add(task_id)
+        parsed.append((i, task_id, values))
+
+    # Current values come along with the ownership check for notifications and stats
+    owned = {
+        r.id: r for r in db.session.execute(
+            select(Task.id, Task.project_id, Task.status, Task.priority, Task.assigned_to, Task.due_date)
+            .join(Project, Task.project_id == Project.id)
+            .where(Task.id.in_(seen), Project.owner_id == g.user_id, Project.state == PROJECT_ACTIVE)
+        )
+    } if seen else {}
+    users = _existing_user_ids({v["assigned_to"] for _, _, v in parsed if v.get("assigned_to")})
+
+    rows, row_index = [], []
+    for i, task_id, values in parsed:
+        if task_id not in owned:
+            results[i] = {"index": i, "id": task_id, "status": 404, "error": "Not found"}
+        elif values.get("assigned_to") and values["assigned_to"] not in users:
+            results[i] = {"index": i, "id": task_id, "status": 400, "error": "assigned_to not found"}
+        else:
+            if values:
+                rows.append({"id": task_id, **values})
+            row_index.append((i, task_id))
+
+    if rows:
+        # ORM bulk UPDATE by primary key, grouped into executemany batches
+        db.session.execute(update(Task), rows)
+        events = []
+        delta = TaskStatDelta()
+        for r in rows:
+            prev = owned[r["id"]]
+            assignee = r.get("assigned_to", prev.assigned_to)
+            status = r.get("status", prev.status)
+            if assignee and assignee != prev.assigned_to:
+                events.append((r["id"], notifications.ASSIGNED))
+            if assignee and status != prev.status:
+                events.append((r["id"], notifications.STATUS_CHANGED))
+            delta.remove(prev.project_id, prev.status, prev.priority, prev.assigned_to, prev.due_date)
+            delta.add(prev.project_id, status, r.get("priority", prev.priority), assignee, r.get("due_date", prev.due_date))
+        delta.apply()
+        notifications.enqueue(events)
+        changes.record(g.user_id, [(changes.TASK, r["id"], changes.UPDATED, owned[r["id"]].project_id) for r in rows])
+        db.session.commit()
+        invalidate(
+            user_tasks_ns(g.user_id),
+            *{project_tasks_ns(owned[r["id"]].project_id) for r in rows},
+            *(task_ns(r["id"]) for r in rows),
+        )
+        changes.publish(g.user_id)
+    for i, task_id in row_index:
+        results[i] = {"index": i, "id": task_id, "status": 200}
+
+    return jsonify({"results": results, "updated": len(row_index)}), 200
+
+
+@tasks_bp.route('/bulk', methods=['DELETE'])
+@login_required
+def bulk_delete_tasks():
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    ids, error = _bulk_items(request.get_json(silent=True) or {}, "ids")
+    if error:
+        return jsonify({"error": error}), 400
+
+    wanted = {i for i in ids if _is_id(i)}
+    doomed = db.session.execute(
+        select(Task.id, Task.project_id, Task.status, Task.priority, Task.assigned_to, Task.due_date)
+        .join(Project, Task.project_id == Project.id)
+        .where(Task.id.in_(wanted), Project.owner_id == g.user_id, Project.state == PROJECT_ACTIVE)
+    ).all() if wanted else []
+    owned = {r.id for r in doomed}
+    if owned:
+        db.session.execute(delete(Task).where(Task.id.in_(owned)).execution_options(synchronize_session=False))
+        delta = TaskStatDelta()
+        for r in doomed:
+            delta.remove(r.project_id, r.status, r.priority, r.assigned_to, r.due_date)
+        delta.apply()
+        changes.record(g.user_id, [(changes.TASK, r.id, changes.DELETED, r.project_id) for r in doomed])
+        db.session.commit()
+        invalidate(
+            user_tasks_ns(g.user_id),
+            *{project_tasks_ns(r.project_id) for r in doomed},
+            *(task_ns(r.id) for r in doomed),
+        )
+        changes.publish(g.user_id)
+
+    results = []
+    for i, task_id in enumerate(ids):
+        if not _is_id(task_id):
+            results.append({"index": i, "status": 400, "error": "'id' must be an integer"})
+        elif task_id in owned:
+            results.append({"index": i, "id": task_id, "status": 200})
+        else:
+            results.append({"index": i, "id": task_id, "status": 404, "error": "Not found"})
+    return jsonify({"results": results, "deleted": len(owned)}), 200
+
+
+# list_tasks is split into statement builders and a renderer around its two
+# queries so the async read path (app/asgi.py) can run the same logic.
+
+def task_list_validators_statement():
+    """One aggregate over the user's tasks backing list_tasks' ETag.
+
+    Scoped to a single project when project_id is given; the other filters
+    are folded into the ETag via the query string instead of the aggregate.
+    """
+    stmt = (
+        select(func.count(Task.id), func.max(Task.updated_at), func.max(Project.updated_at))
+        .join(Project, Task.project_id == Project.id)
+        .where(Project.owner_id == g.user_id, Project.state == PROJECT_ACTIVE)
+    )
+    project_id = request.args.get('project_id', type=int)
+    if project_id:
+        stmt = stmt.where(Task.project_id == project_id)
+    return stmt
 
-    # Notification disabled
 
-    return jsonify(task_to_dict(t, include_refs=True)), 201
+def task_list_validators(row):
+    count, tasks_changed, projects_changed = row
+    return make_etag('tasks', g.user_id, sorted(request.args.items(multi=True)), count, tasks_changed, projects_changed)
+
+
+class TaskListPlan(NamedTuple):
+    statement: object
+    sort: str
+    page_size: int
+    keyset: bool
+
+
+def task_list_plan():
+    """Build list_tasks' page query from the request; returns ``(plan, error_response)``."""
+    # Tasks within projects owned by current user, with the project and
+    # assignee refs joined in as plain columns
+    stmt = (
+        select(*TASK_LIST_COLUMNS)
+        .join(Project, Task.project_id == Project.id)
+        .outerjoin(User, Task.assigned_to == User.id)
+        .where(Project.owner_id == g.user_id, Project.state == PROJECT_ACTIVE)
+    )
+    stmt, sort = _search_and_order(_apply_task_filters(stmt))
+
+    page_size = page_size_arg()
+    if keyset_requested():
+        if sort == 'relevance':
+            return None, (jsonify({"error": "Cursor pagination over search results needs an explicit sort"}), 400)
+        token = request.args.get('cursor') or ''
+        if token:
+            try:
+                stmt = stmt.where(_task_after(sort, decode_cursor(token, sort)))
+            except (InvalidCursor, TypeError, ValueError):
+                return None, (jsonify({"error": "Invalid cursor"}), 400)
+        return TaskListPlan(stmt.limit(page_size + 1), sort, page_size, True), None
+
+    # Legacy offset pagination
+    page = max(1, request.args.get('page', default=1, type=int))
+    return TaskListPlan(stmt.limit(page_size).offset((page - 1) * page_size), sort, page_size, False), None
+
+
+def task_list_response(plan: TaskListPlan, rows, etag):
+    if plan.keyset:
+        items, next_cursor = keyset_result(rows, plan.page_size, plan.sort, lambda t: _task_sort_key(t, plan.sort))
+        resp = jsonify({
+            "items": [task_row_to_dict(r) for r in items],
+            "next_cursor": next_cursor,
+        })
+    else:
+        resp = jsonify([task_row_to_dict(r) for r in rows])
+    return with_validators(resp, etag), 200
 
 
 @tasks_bp.route('/', methods=['GET'])
-@jwt_required()
+@login_required
+@cached_view(lambda: [user_tasks_ns(g.user_id)])
+@query_budget(2)
 def list_tasks():
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
-    # Base query: tasks within projects owned by current user
-    q = db.session.query(Task).join(Project, Task.project_id == Project.id).filter(Project.owner_id == g.user_id)
+    etag = task_list_validators(db.session.execute(task_list_validators_statement()).one())
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
 
-    # Filters
-    status = request.args.get('status')
-    priority = request.args.get('priority')
-    due_date = parse_date(request.args.get('due_date'))
-    project_id = request.args.get('project_id', type=int)
+    plan, error = task_list_plan()
+    if error:
+        return error
+    rows = db.session.execute(plan.statement).all()
+    return task_list_response(plan, rows, etag)
 
-    if status:
-        q = q.filter(Task.status == status)
-    if priority:
-        q = q.filter(Task.priority == priority)
-    if due_date:
-        q = q.filter(Task.due_date == due_date)
-    if project_id:
-        q = q.filter(Task.project_id == project_id)
 
-    # Sorting
-    sort = (request.args.get('sort') or '').strip()
-    if sort == 'priority':
-        q = q.order_by(Task.priority.desc())
-    elif sort == 'due_date':
-        # SQLite-safe: non-null first, then ascending dates
-        q = q.order_by(Task.due_date.is_(None), Task.due_date.asc())
-    else:
-        q = q.order_by(Task.created_at.desc())
+@tasks_bp.route('/stats', methods=['GET'])
+@login_required
+@query_budget(1)
+def task_stats():
+    """Task counts by status, priority, assignee and overdue across the user's projects."""
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify(user_stats(g.user_id)), 200
 
-    # Pagination
-    page = max(1, request.args.get('page', default=1, type=int))
-    page_size = min(100, max(1, request.args.get('page_size', default=20, type=int)))
-    items = q.limit(page_size).offset((page - 1) * page_size).all()
 
-    return jsonify([task_to_dict(t, include_refs=True) for t in items]), 200
+EXPORT_COLUMNS = (
+    "id", "title", "description", "status", "priority", "due_date",
+    "project_id", "project_name", "assigned_to", "created_at",
+)
+EXPORT_BATCH_SIZE = 1000
+
+
+@tasks_bp.route('/export', methods=['GET'])
+@login_required
+def export_tasks():
+    """Stream every matching task as NDJSON (default) or CSV.
+
+    Accepts the same filters, search and sort as list_tasks. Rows are fetched as plain
+    tuples through a server-side cursor and written out as they arrive, so
+    memory use does not grow with the number of tasks.
+    """
+    if not g.user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    fmt = (request.args.get('format') or 'ndjson').strip().lower()
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({"error": "Invalid format"}), 400
+
+    stmt = (
+        select(
+            Task.id, Task.title, Task.description, Task.status, Task.priority, Task.due_date,
+            Task.project_id, Project.name, Task.assigned_to, Task.created_at,
+        )
+        .join(Project, Task.project_id == Project.id)
+        .where(Project.owner_id == g.user_id, Project.state == PROJECT_ACTIVE)
+    )
+    stmt, _ = _search_and_order(_apply_task_filters(stmt))
+    rows = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    dumps = current_app.json.dumps
+
+    def iso(v):
+        return v.isoformat() if v else None
+
+    def values(r):
+        return (*r[:5], iso(r[5]), *r[6:9], iso(r[9]))
+
+    def ndjson():
+        for batch in rows.partitions():
+            yield "".join(dumps(dict(zip(EXPORT_COLUMNS, values(r)))) + "\n" for r in batch)
+
+    def csv_lines():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(EXPORT_COLUMNS)
+        for batch in rows.partitions():
+            writer.writerows(values(r) for r in batch)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        yield buf.getvalue()
+
+    if fmt == 'csv':
+        body, mimetype = csv_lines(), 'text/csv'
+    else:
+        body, mimetype = ndjson(), 'application/x-ndjson'
+    resp = Response(stream_with_context(body), mimetype=mimetype)
+    resp.headers['Content-Disposition'] = f'attachment; filename=tasks.{fmt}'
+    return resp
 
 
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
-@jwt_required()
+@login_required
+@cached_view(lambda task_id: [task_ns(task_id)])
+@query_budget(1)
 def get_task(task_id: int):
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
-    t = Task.query.get_or_404(task_id)
-    proj = Project.query.get(t.project_id)
-    if not proj or proj.owner_id != g.user_id:
-        return jsonify({"error": "Not found"}), 404
-
-    return jsonify(task_to_dict(t, include_refs=True)), 200
+    return task_response(load_task(task_id))
 
 
 @tasks_bp.route('/<int:task_id>', methods=['PATCH'])
-@jwt_required()
+@login_required
+@query_budget(7)
 def update_task(task_id: int):
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
-    t = Task.query.get_or_404(task_id)
-    proj = Project.query.get(t.project_id)
-    if not proj or proj.owner_id != g.user_id:
+    t = load_task(task_id)
+    proj = t.project
+    if not proj or proj.owner_id != g.user_id or proj.state != PROJECT_ACTIVE:
         return jsonify({"error": "Not found"}), 404
 
     data = request.get_json(silent=True) or {}
     prev_status = t.status
     prev_assigned = t.assigned_to
+    project_id = t.project_id
+    delta = TaskStatDelta()
+    delta.remove_task(t)
     if "title" in data:
         title = (data.get("title") or "").strip()
         if not title:
@@ -189,32 +748,53 @@ def update_task(task_id: int):
         t.due_date = parse_date(data.get("due_date"))
     if "assigned_to" in data:
         assigned_to = data.get("assigned_to")
+        if assigned_to is not None and not _is_id(assigned_to):
+            return jsonify({"error": "'assigned_to' must be an integer"}), 400
         if assigned_to:
-            user = User.query.get(assigned_to)
+            # Don't autoflush the pending edits as a separate UPDATE
+            with db.session.no_autoflush:
+                user = User.query.get(assigned_to)
             if not user:
                 return jsonify({"error": "assigned_to not found"}), 400
             t.assigned_to = assigned_to
         else:
             t.assigned_to = None
 
+    events = []
+    if t.assigned_to and t.assigned_to != prev_assigned:
+        events.append((t.id, notifications.ASSIGNED))
+    if t.assigned_to and t.status != prev_status:
+        events.append((t.id, notifications.STATUS_CHANGED))
+    notifications.enqueue(events)
+    delta.add_task(t)
+    delta.apply()
+    changes.record(g.user_id, [(changes.TASK, task_id, changes.UPDATED, project_id)])
     db.session.commit()
+    invalidate(task_ns(task_id), project_tasks_ns(project_id), user_tasks_ns(g.user_id))
+    changes.publish(g.user_id)
 
-    # Notifications disabled
-
-    return jsonify(task_to_dict(t, include_refs=True)), 200
+    return jsonify(task_to_dict(load_task(task_id), include_refs=True)), 200
 
 
 @tasks_bp.route('/<int:task_id>', methods=['DELETE'])
-@jwt_required()
+@login_required
+@query_budget(4)
 def delete_task(task_id: int):
     if not g.user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
-    t = Task.query.get_or_404(task_id)
-    proj = Project.query.get(t.project_id)
-    if not proj or proj.owner_id != g.user_id:
+    t = load_task(task_id)
+    proj = t.project
+    if not proj or proj.owner_id != g.user_id or proj.state != PROJECT_ACTIVE:
         return jsonify({"error": "Not found"}), 404
 
+    project_id = t.project_id
+    delta = TaskStatDelta()
+    delta.remove_task(t)
     db.session.delete(t)
+    delta.apply()
+    changes.record(g.user_id, [(changes.TASK, task_id, changes.DELETED, project_id)])
     db.session.commit()
+    invalidate(task_ns(task_id), project_tasks_ns(project_id), user_tasks_ns(g.user_id))
+    changes.publish(g.user_id)
     return jsonify({"message": "Deleted"}), 200
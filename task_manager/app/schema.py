@@ -0,0 +1,42 @@
+"""Schema management, kept out of the request-serving startup path.
+
+Migrations are applied by an explicit one-off step per deploy
+(``python -m task_manager.manage``, or ``flask --app task_manager.manage
+db ...`` for the full Flask-Migrate CLI). Flask-Migrate and Alembic are
+only imported here, so API and worker processes never load them.
+"""
+import os
+
+from flask import current_app
+from sqlalchemy import inspect
+
+from . import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Revision matching the tables the old db.create_all() bootstrap produced
+BASELINE_REVISION = '0001_initial'
+
+
+def init_migrations(app):
+    """Attach Flask-Migrate to `app` (needed by the `flask db` commands and upgrade_database)."""
+    from flask_migrate import Migrate
+
+    if 'migrate' not in app.extensions:
+        Migrate(app, db, directory=MIGRATIONS_DIR, render_as_batch=True)
+
+
+def upgrade_database():
+    """Apply pending migrations, adopting databases created before migrations existed.
+
+    Must run inside an app context.
+    """
+    from flask_migrate import stamp, upgrade
+
+    from . import models  # noqa: F401  (metadata for the migration environment)
+
+    init_migrations(current_app)
+    tables = set(inspect(db.engine).get_table_names())
+    if 'alembic_version' not in tables and {'user', 'project', 'task'} <= tables:
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
@@ -0,0 +1,57 @@
+import re
+
+from flask import request
+from sqlalchemy import column, false, func, literal_column, or_, table
+
+from . import db
+from .models import Task
+
+# Created by migration 0006_task_search and kept in sync by the database
+# itself: a generated tsvector column + GIN index on Postgres, an
+# external-content FTS5 table maintained by triggers on SQLite.
+TS_CONFIG = 'english'
+TITLE_WEIGHT = 4.0  # SQLite bm25 column weight, ~ the A vs B setweight() on Postgres
+task_fts = table('task_fts', column('rowid'))
+search_vector = literal_column('task.search_vector')
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def search_arg() -> str:
+    return (request.args.get('q') or '').strip()
+
+
+def _fts5_query(text: str) -> str:
+    # Quote every term so user input can't hit FTS5 query syntax
+    # (AND/OR/NEAR, column filters, stray quotes); terms are ANDed.
+    return ' '.join(f'"{tok}"' for tok in _TOKEN.findall(text))
+
+
+def apply_search(q, text: str):
+    """Restrict a Query/Select over Task to rows matching `text`.
+
+    Returns ``(q, order_by)`` where ``order_by`` ranks the best matches
+    first, with id as a tie-breaker.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        tsquery = func.websearch_to_tsquery(TS_CONFIG, text)
+        q = q.filter(search_vector.op('@@')(tsquery))
+        return q, [func.ts_rank_cd(search_vector, tsquery).desc(), Task.id.desc()]
+
+    if dialect == 'sqlite':
+        match = _fts5_query(text)
+        if not match:
+            return q.filter(false()), [Task.id.desc()]
+        q = q.join(task_fts, task_fts.c.rowid == Task.id).filter(literal_column('task_fts').op('MATCH')(match))
+        # bm25() is lower-is-better; title hits outweigh description hits
+        return q, [func.bm25(literal_column('task_fts'), TITLE_WEIGHT, 1.0).asc(), Task.id.desc()]
+
+    # No index on other backends: substring match on every term, unranked
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return q.filter(false()), [Task.id.desc()]
+    for tok in tokens:
+        pattern = f'%{tok}%'
+        q = q.filter(or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+    return q, [Task.id.desc()]
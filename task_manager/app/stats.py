@@ -0,0 +1,191 @@
+"""Per-project task counters, updated by TaskStatDelta in the same transaction as each task write.
+
+rebuild() recomputes them from the task table, nightly and to seed a fresh table.
+"""
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import case, cast, delete, func, insert, literal, select, String, union_all, update
+
+from . import db
+from .models import PRIORITIES, STATUSES, Project, Task, TaskStat
+
+STATUS = 'status'
+PRIORITY = 'priority'
+ASSIGNEE = 'assignee'
+# Open tasks per due day, so overdue is the sum of the days before today
+DUE = 'due'
+
+UNASSIGNED = ''
+
+
+def task_buckets(status, priority, assigned_to, due_date):
+    """The (kind, key) buckets a task with these values is counted in."""
+    buckets = [
+        (STATUS, status or ''),
+        (PRIORITY, priority or ''),
+        (ASSIGNEE, str(assigned_to) if assigned_to else UNASSIGNED),
+    ]
+    if due_date and status != 'done':
+        buckets.append((DUE, due_date.isoformat()))
+    return buckets
+
+
+class TaskStatDelta:
+    """Accumulates counter changes for one transaction.
+
+    Usage::
+
+        delta = TaskStatDelta()
+        delta.remove_task(t)      # before the edits
+        ...
+        delta.add_task(t)         # after them
+        delta.apply()
+    """
+
+    def __init__(self):
+        self.changes = Counter()
+
+    def add(self, project_id, status, priority, assigned_to, due_date, n: int = 1):
+        for kind, key in task_buckets(status, priority, assigned_to, due_date):
+            self.changes[(project_id, kind, key)] += n
+
+    def remove(self, project_id, status, priority, assigned_to, due_date, n: int = 1):
+        self.add(project_id, status, priority, assigned_to, due_date, -n)
+
+    def add_task(self, t: Task, n: int = 1):
+        self.add(t.project_id, t.status, t.priority, t.assigned_to, t.due_date, n)
+
+    def remove_task(self, t: Task):
+        self.add_task(t, -1)
+
+    def apply(self):
+        # Sorted so concurrent writers lock counter rows in the same order
+        rows = [
+            {"project_id": p, "kind": k, "key": key, "count": n}
+            for (p, k, key), n in sorted(self.changes.items()) if n
+        ]
+        self.changes.clear()
+        if rows:
+            _upsert(rows)
+
+
+def _upsert(rows):
+    table = TaskStat.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        # Imported here: loading the postgresql dialect package costs startup
+        # time in processes that never use it
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.project_id, table.c.kind, table.c.key],
+            set_={"count": table.c.count + stmt.excluded['count']},
+        )
+        db.session.execute(stmt, rows)
+        return
+    # No portable upsert: update in place, insert the buckets that didn't exist yet
+    for row in rows:
+        result = db.session.execute(
+            update(table)
+            .where(table.c.project_id == row["project_id"], table.c.kind == row["kind"], table.c.key == row["key"])
+            .values(count=table.c.count + row["count"])
+        )
+        if not result.rowcount:
+            db.session.execute(insert(table), row)
+
+
+def forget_project(project_id: int):
+    db.session.execute(delete(TaskStat).where(TaskStat.project_id == project_id))
+
+
+def _bucket_queries(project_ids=None):
+    def grouped(kind, key, *where):
+        stmt = select(Task.project_id, literal(kind, String), key, func.count()).where(*where)
+        if project_ids is not None:
+            stmt = stmt.where(Task.project_id.in_(project_ids))
+        return stmt.group_by(Task.project_id, key)
+
+    return union_all(
+        grouped(STATUS, func.coalesce(Task.status, '')),
+        grouped(PRIORITY, func.coalesce(Task.priority, '')),
+        grouped(ASSIGNEE, func.coalesce(cast(Task.assigned_to, String), UNASSIGNED)),
+        grouped(DUE, cast(Task.due_date, String), Task.due_date.isnot(None),
+                func.coalesce(Task.status, '') != 'done'),
+    )
+
+
+def rebuild(conn, project_ids=None) -> int:
+    """Recompute counters from the task table on `conn`; returns the bucket count.
+
+    Scoped to `project_ids` when given. Runs in the caller's transaction.
+    """
+    table = TaskStat.__table__
+    clear = delete(table)
+    if project_ids is not None:
+        clear = clear.where(table.c.project_id.in_(project_ids))
+    conn.execute(clear)
+    result = conn.execute(
+        insert(table).from_select(['project_id', 'kind', 'key', 'count'], _bucket_queries(project_ids))
+    )
+    return result.rowcount
+
+
+def rebuild_task_stats() -> int:
+    """Worker entry point: rebuild every project's counters in one transaction."""
+    n = rebuild(db.session.connection())
+    db.session.commit()
+    return n
+
+
+def summarize(*where) -> dict:
+    """Fold the counters matching `where` into the stats response shape."""
+    today = date.today().isoformat()
+    bucket = case(
+        (TaskStat.kind == DUE, case((TaskStat.key < today, 'overdue'), else_='upcoming')),
+        else_=TaskStat.key,
+    )
+    # Group on the derived column via a subquery; grouping on the CASE itself
+    # trips Postgres over the repeated bind parameters
+    inner = select(TaskStat.kind, bucket.label('bucket'), TaskStat.count).where(*where).subquery()
+    rows = db.session.execute(
+        select(inner.c.kind, inner.c.bucket, func.sum(inner.c.count))
+        .group_by(inner.c.kind, inner.c.bucket)
+    )
+
+    by_status = dict.fromkeys(STATUSES, 0)
+    by_priority = dict.fromkeys(PRIORITIES, 0)
+    by_assignee = {}
+    due = {'overdue': 0, 'upcoming': 0}
+    for kind, key, n in rows:
+        n = int(n or 0)
+        if not n:
+            continue
+        if kind == STATUS:
+            by_status[key] = by_status.get(key, 0) + n
+        elif kind == PRIORITY:
+            by_priority[key] = by_priority.get(key, 0) + n
+        elif kind == ASSIGNEE:
+            by_assignee['unassigned' if key == UNASSIGNED else key] = n
+        elif kind == DUE:
+            due[key] = n
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_priority": by_priority,
+        "by_assignee": by_assignee,
+        "overdue": due['overdue'],
+    }
+
+
+def project_stats(project_id: int) -> dict:
+    return summarize(TaskStat.project_id == project_id)
+
+
+def user_stats(user_id: int) -> dict:
+    """Counters summed over every project owned by `user_id`."""
+    owned = select(Project.id).where(Project.owner_id == user_id)
+    return summarize(TaskStat.project_id.in_(owned))
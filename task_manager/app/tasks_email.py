@@ -1,8 +1,13 @@
 from flask import current_app
-from flask_mail import Message
-from . import mail, db
-from .models import User, Task, Project
+from sqlalchemy import select
+from . import db
+from .mailer import get_mailer
+from .models import PROJECT_ACTIVE, User, Task, Project
 from datetime import date
+from itertools import groupby
+
+# Rows pulled per round trip while streaming the overdue query
+OVERDUE_FETCH_SIZE = 1000
 
 # Plain function definitions so this module can be imported before Celery exists.
 def send_task_notification(task_id: int, action: str):  # will be wrapped by celery.task later
@@ -18,50 +23,84 @@ def send_task_notification(task_id: int, action: str):  # will be wrapped by cel
             return
         subject = f"Task '{task.title}': {action.replace('_', ' ').title()}"
         body = f"Hello {user.username},\n\nThe task '{task.title}' has been {action}.\n\nStatus: {task.status}\nPriority: {task.priority}\nDue: {task.due_date}\n\nRegards,\nTask Manager"
-        msg = Message(subject=subject, recipients=[user.email], body=body)
         try:
-            mail.send(msg)
+            get_mailer().send(subject, [user.email], body)
         except Exception as e:
             current_app.logger.exception("Failed to send task notification: %s", e)
 
 
 def send_daily_overdue_summary():  # will be wrapped by celery.task later
-    """Send a daily summary email of overdue tasks to each user."""
-    with current_app.app_context():
-        today = date.today()
-        users = User.query.all()
-        for u in users:
-            overdue = (
-                db.session.query(Task)
-                .join(Project, Task.project_id == Project.id)
-                .filter(Task.assigned_to == u.id)
-                .filter(Task.due_date.isnot(None))
-                .filter(Task.due_date < today)
-                .order_by(Task.due_date.asc())
-                .all()
-            )
-            if not overdue or not u.email:
-                continue
-            lines = [
-                f"- [{t.status}] {t.title} (Project: {t.project.name if t.project else t.project_id}) due {t.due_date}"
-                for t in overdue
-            ]
-            subject = "Your overdue tasks summary"
-            body = (
-                f"Hello {u.username},\n\nThe following tasks are overdue:\n\n" + "\n".join(lines) + "\n\nRegards,\nTask Manager"
-            )
-            msg = Message(subject=subject, recipients=[u.email], body=body)
-            try:
-                mail.send(msg)
-            except Exception as e:
-                current_app.logger.exception("Failed to send summary email: %s", e)
+    """Queue a summary email of overdue tasks for every assignee that has any.
+
+    One streamed query walks overdue tasks ordered by assignee (user and
+    project names joined in), so memory holds only the current batch of
+    recipients. Each batch goes to send_overdue_batch, which is a Celery
+    task once init_celery_tasks ran and is called inline otherwise.
+    """
+    today = date.today()
+    batch_size = current_app.config["OVERDUE_SUMMARY_BATCH_SIZE"]
+    stmt = (
+        select(User.id, User.username, User.email, Task.title, Task.status, Task.due_date, Project.name)
+        .join(Task, Task.assigned_to == User.id)
+        .join(Project, Task.project_id == Project.id)
+        .where(Task.due_date.isnot(None), Task.due_date < today, Project.state == PROJECT_ACTIVE)
+        .where(User.email.isnot(None), User.email != '')
+        .order_by(Task.assigned_to, Task.due_date.asc(), Task.id)
+        .execution_options(yield_per=OVERDUE_FETCH_SIZE)
+    )
+    batch = []
+    queued = 0
+    for _, rows in groupby(db.session.execute(stmt), key=lambda r: r[0]):
+        rows = list(rows)
+        batch.append({
+            "email": rows[0].email,
+            "username": rows[0].username,
+            "lines": [f"- [{r.status}] {r.title} (Project: {r.name}) due {r.due_date}" for r in rows],
+        })
+        if len(batch) >= batch_size:
+            _dispatch_overdue_batch(batch)
+            queued += len(batch)
+            batch = []
+    if batch:
+        _dispatch_overdue_batch(batch)
+        queued += len(batch)
+    return queued
+
+
+def _dispatch_overdue_batch(batch):
+    if hasattr(send_overdue_batch, "delay"):
+        send_overdue_batch.delay(batch)
+    else:
+        send_overdue_batch(batch)
+
+
+def send_overdue_batch(summaries):  # will be wrapped by celery.task later
+    """Send pre-rendered overdue summaries over one SMTP connection, reconnecting if it drops."""
+    subject = "Your overdue tasks summary"
+    get_mailer().send_many([
+        (
+            subject,
+            [s["email"]],
+            f"Hello {s['username']},\n\nThe following tasks are overdue:\n\n" + "\n".join(s["lines"]) + "\n\nRegards,\nTask Manager",
+        )
+        for s in summaries
+    ])
 
 
 def init_celery_tasks(celery):
     """Register the above functions as Celery tasks once celery is initialized.
     Rebinds the module-level names so imports elsewhere (e.g., routes) pick up the task objects.
     """
-    global send_task_notification, send_daily_overdue_summary
+    global send_task_notification, send_daily_overdue_summary, send_overdue_batch
+    from .changes import prune_change_log
+    from .notifications import drain_notifications
+    from .project_jobs import run_project_jobs
+    from .stats import rebuild_task_stats
     send_task_notification = celery.task(name='tasks.send_task_notification')(send_task_notification)
     send_daily_overdue_summary = celery.task(name='tasks.send_daily_overdue_summary')(send_daily_overdue_summary)
-    return send_task_notification, send_daily_overdue_summary
+    send_overdue_batch = celery.task(name='tasks.send_overdue_batch')(send_overdue_batch)
+    celery.task(name='tasks.drain_notifications')(drain_notifications)
+    celery.task(name='tasks.rebuild_task_stats')(rebuild_task_stats)
+    celery.task(name='tasks.prune_change_log')(prune_change_log)
+    celery.task(name='tasks.run_project_jobs')(run_project_jobs)
+    return send_task_notification, send_daily_overdue_summary, send_overdue_batch
@@ -0,0 +1,9 @@
+try:
+    from .app import create_app  # package context
+    from .app.asgi import create_asgi_app
+except ImportError:  # pragma: no cover
+    from app import create_app  # fallback when run directly
+    from app.asgi import create_asgi_app
+
+# Async counterpart of run.py: uvicorn task_manager.asgi:app
+app = create_asgi_app(create_app())
@@ -1,10 +1,10 @@
-from task_manager.app import create_app, celery as flask_celery  # package-safe import
+from task_manager.app import create_worker_app  # package-safe import
+from task_manager.app.celery_worker import make_celery
+from task_manager.app.tasks_email import init_celery_tasks
 
-# Initialize the Flask app (sets up extensions and celery instance)
-flask_app = create_app()
+# Worker/beat app: database, mailer and config only (no blueprints or JWT)
+flask_app = create_worker_app()
+celery = make_celery(flask_app)
 
-# Use the Celery instance created by the factory
-celery = flask_celery
-
-# Register tasks (import side effects)
-import task_manager.app.tasks_email  # noqa: F401,E402
+# Register tasks
+init_celery_tasks(celery)
@@ -6,8 +6,144 @@ def _default_sqlite_uri():
     path = os.path.join(basedir, 'task_manager.db')
     return f'sqlite:///{path}'
 
+def _env_bool(name, default="false"):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+def _engine_options(uri):
+    """SQLAlchemy engine options, tuned per backend from DB_* / SQLITE_* env vars."""
+    if uri.startswith("sqlite"):
+        # Seconds a writer waits on a locked database before failing;
+        # WAL and the other pragmas are applied per connection in db_pool.py
+        return {"connect_args": {"timeout": float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))}}
+    options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        # Recycle before server/proxy idle timeouts and after failovers
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", "true"),
+    }
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    if uri.startswith("postgres") and statement_timeout > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL") or _default_sqlite_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_WAL = _env_bool("SQLITE_WAL", "true")
+    # Apply migrations in create_app (local development); deployments run
+    # `python -m task_manager.manage` once instead
+    MIGRATE_ON_STARTUP = _env_bool("MIGRATE_ON_STARTUP")
+    # ASGI mode (task_manager/asgi.py, SERVER_MODE=asgi in the Docker image):
+    # async driver URL, defaulting to DATABASE_URL with aiosqlite/asyncpg
+    # swapped in
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or None
+    # Serve task reads and event streams on the event loop; async reads skip
+    # the response cache, whose backends block. false routes every request
+    # through the thread pool below
+    ASGI_ASYNC_READS = _env_bool("ASGI_ASYNC_READS", "true")
+    # Threads running the Flask app for routes without an async implementation
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "16"))
     SECRET_KEY = os.getenv("SECRET_KEY", "secret-key")
-    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key")
\ No newline at end of file
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key")
+    # Any werkzeug hash method; existing hashes are upgraded on the next login
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # Threads hashing passwords (hashlib releases the GIL, so a login storm
+    # takes this many cores), and how many hashes may be pending before
+    # login/register answer 503 instead of queueing
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL") or None
+    CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND") or None
+    MAIL_SERVER = os.getenv("MAIL_SERVER") or None
+    MAIL_PORT = int(os.getenv("MAIL_PORT", "25"))
+    MAIL_USERNAME = os.getenv("MAIL_USERNAME") or None
+    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD") or None
+    MAIL_USE_TLS = _env_bool("MAIL_USE_TLS")
+    MAIL_USE_SSL = _env_bool("MAIL_USE_SSL")
+    MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", "noreply@taskmanager.local")
+    MAIL_POOL_SIZE = int(os.getenv("MAIL_POOL_SIZE", "2"))
+    # Task notification outbox: changes to one task within the coalescing
+    # window are merged into one email. Nothing is queued unless enabled and
+    # MAIL_SERVER is set. Drained by Celery beat when a broker is configured,
+    # else by a thread in each web process; failed sends are retried
+    NOTIFICATIONS_ENABLED = _env_bool("NOTIFICATIONS_ENABLED", "true")
+    NOTIFICATION_COALESCE_SECONDS = float(os.getenv("NOTIFICATION_COALESCE_SECONDS", "30"))
+    NOTIFICATION_DRAIN_INTERVAL = float(os.getenv("NOTIFICATION_DRAIN_INTERVAL", "5"))
+    NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "500"))
+    # Recipients per queued batch of the daily overdue summary
+    OVERDUE_SUMMARY_BATCH_SIZE = int(os.getenv("OVERDUE_SUMMARY_BATCH_SIZE", "100"))
+    # auto: orjson when installed, else Flask's stdlib provider; or force orjson|default
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+    # Per-process project -> owner cache used for authorization checks
+    AUTHZ_CACHE_SIZE = int(os.getenv("AUTHZ_CACHE_SIZE", "10000"))
+    AUTHZ_CACHE_TTL = float(os.getenv("AUTHZ_CACHE_TTL", "60"))
+    # Response cache for the project/task read endpoints: auto|memory|redis|fake|off
+    # (auto = redis when RESPONSE_CACHE_URL is set, else off). memory is per
+    # process and other workers never see its invalidations, so only use it
+    # with a single worker and no Celery jobs; fake is for tests
+    RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "auto")
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL") or None
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    # Token-bucket rate limits per client, answered with 429: auto|memory|redis|off
+    # (auto = redis when RATE_LIMIT_URL is set, else per process; an
+    # unreachable redis admits everything). Limits are
+    # "<requests>/<second|minute|hour|day>[:<burst>]" and cover blueprint
+    # routes; RATE_LIMITS overrides them per endpoint or blueprint, e.g.
+    # "auth.login=10/minute,tasks=off"
+    RATE_LIMIT = os.getenv("RATE_LIMIT", "auto")
+    RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL") or None
+    RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "20/second:60")
+    RATE_LIMITS = os.getenv("RATE_LIMITS", "auth.login=10/minute,auth.register=20/hour:5")
+    # Clients tracked by the memory backend
+    RATE_LIMIT_SIZE = int(os.getenv("RATE_LIMIT_SIZE", "100000"))
+    # Clients are JWT users; logins are limited per submitted username. Requests
+    # without a user (login, register) are also limited per address when it is
+    # the client's own: with PROXY_FIX_X_FOR set, or with this on (no proxy, or
+    # uvicorn's --forwarded-allow-ips)
+    RATE_LIMIT_BY_IP = _env_bool("RATE_LIMIT_BY_IP")
+    # Requests per process allowed in flight on expensive endpoints (or
+    # blueprints); the rest get 503 with Retry-After instead of queueing
+    CONCURRENCY_LIMITS = os.getenv(
+        "CONCURRENCY_LIMITS",
+        "tasks.export_tasks=2,tasks.bulk_create_tasks=4,tasks.bulk_update_tasks=4,tasks.bulk_delete_tasks=4",
+    )
+    CONCURRENCY_RETRY_AFTER = int(os.getenv("CONCURRENCY_RETRY_AFTER", "1"))
+    # Reverse proxies in front of the WSGI server whose X-Forwarded-For to
+    # trust for the client address (uvicorn: use --forwarded-allow-ips)
+    PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", "0"))
+    # Upper bound on items accepted by the /tasks/bulk endpoints
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+    # Change feed (/changes): wake-ups for event streams go through auto|memory|redis
+    # (auto = redis when CHANGE_FEED_REDIS_URL is set, else this process only)
+    CHANGE_FEED_BROKER = os.getenv("CHANGE_FEED_BROKER", "auto")
+    CHANGE_FEED_REDIS_URL = os.getenv("CHANGE_FEED_REDIS_URL") or None
+    CHANGE_FEED_PAGE_SIZE = int(os.getenv("CHANGE_FEED_PAGE_SIZE", "500"))
+    # Seconds between keepalives on an idle stream, and before a stream is
+    # closed for the client to reconnect (releasing its worker)
+    CHANGE_STREAM_HEARTBEAT = float(os.getenv("CHANGE_STREAM_HEARTBEAT", "15"))
+    CHANGE_STREAM_MAX_SECONDS = float(os.getenv("CHANGE_STREAM_MAX_SECONDS", "300"))
+    CHANGE_LOG_RETENTION_DAYS = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "7"))
+    # Project delete/archive/restore jobs: tasks moved per transaction, the
+    # pause between chunks for other writers, and the runner's poll interval
+    # (beat schedule, or the in-process runner without a Celery broker). Jobs
+    # within one chunk finish inside the request
+    PROJECT_JOB_CHUNK_SIZE = int(os.getenv("PROJECT_JOB_CHUNK_SIZE", "1000"))
+    PROJECT_JOB_CHUNK_PAUSE_MS = float(os.getenv("PROJECT_JOB_CHUNK_PAUSE_MS", "50"))
+    PROJECT_JOB_INTERVAL = float(os.getenv("PROJECT_JOB_INTERVAL", "30"))
+    # Per-request timing and SQL counts, served as Prometheus metrics on
+    # /metrics. Metrics are per process: scrape each worker, as with /healthz
+    REQUEST_METRICS = _env_bool("REQUEST_METRICS", "true")
+    # Expose app/db timings to clients in a Server-Timing response header
+    SERVER_TIMING = _env_bool("SERVER_TIMING")
+    # Log statements / requests slower than these (milliseconds, 0 disables);
+    # bound parameters are logged by type only. With REQUEST_METRICS off and
+    # both at 0 no hooks or engine listeners are installed
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+    SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+    # Fail requests that exceed their declared @query_budget (meant for test runs)
+    ENFORCE_QUERY_BUDGETS = _env_bool("ENFORCE_QUERY_BUDGETS")
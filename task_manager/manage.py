@@ -0,0 +1,25 @@
+"""One-off schema management, run once per deploy before starting API/worker processes.
+
+    python -m task_manager.manage               # apply pending migrations
+    flask --app task_manager.manage db history  # any Flask-Migrate command
+"""
+try:
+    from .app import create_worker_app  # package context
+    from .app.schema import init_migrations, upgrade_database
+except ImportError:  # pragma: no cover
+    from app import create_worker_app  # fallback when run directly
+    from app.schema import init_migrations, upgrade_database
+
+app = create_worker_app()
+init_migrations(app)
+
+
+@app.cli.command("upgrade-db")
+def upgrade_db_command():
+    """Apply pending migrations, adopting pre-migration databases."""
+    upgrade_database()
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        upgrade_database()
@@ -0,0 +1,35 @@
+"""Indexes for the task/project filter and sort columns
+
+Revision ID: 0002_query_indexes
+Revises: 0001_initial
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_query_indexes'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_project_owner_created', 'project', ['owner_id', 'created_at', 'id'])
+    op.create_index('ix_task_project_created', 'task', ['project_id', 'created_at', 'id'])
+    op.create_index('ix_task_project_status', 'task', ['project_id', 'status'])
+    op.create_index('ix_task_project_priority', 'task', ['project_id', 'priority'])
+    op.create_index('ix_task_project_due', 'task', ['project_id', 'due_date'])
+    op.create_index('ix_task_created', 'task', ['created_at', 'id'])
+    op.create_index('ix_task_assigned_due', 'task', ['assigned_to', 'due_date'])
+
+
+def downgrade():
+    op.drop_index('ix_task_assigned_due', table_name='task')
+    op.drop_index('ix_task_created', table_name='task')
+    op.drop_index('ix_task_project_due', table_name='task')
+    op.drop_index('ix_task_project_priority', table_name='task')
+    op.drop_index('ix_task_project_status', table_name='task')
+    op.drop_index('ix_task_project_created', table_name='task')
+    op.drop_index('ix_project_owner_created', table_name='project')
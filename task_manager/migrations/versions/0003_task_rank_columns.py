@@ -0,0 +1,56 @@
+"""Ordinal status_rank/priority_rank columns on task
+
+Revision ID: 0003_task_rank_columns
+Revises: 0002_query_indexes
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_task_rank_columns'
+down_revision = '0002_query_indexes'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of models.STATUSES / models.PRIORITIES at the time of writing
+STATUSES = ('todo', 'in_progress', 'done')
+PRIORITIES = ('low', 'medium', 'high')
+
+
+def _case(column, values, default):
+    whens = " ".join(f"WHEN '{v}' THEN {i}" for i, v in enumerate(values))
+    return f"CASE {column} {whens} ELSE {values.index(default)} END"
+
+
+def upgrade():
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.add_column(sa.Column('status_rank', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('priority_rank', sa.SmallInteger(), nullable=True))
+
+    op.execute(
+        f"UPDATE task SET status_rank = {_case('status', STATUSES, 'todo')}, "
+        f"priority_rank = {_case('priority', PRIORITIES, 'medium')}"
+    )
+
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.alter_column('status_rank', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.alter_column('priority_rank', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.drop_index('ix_task_project_status')
+        batch_op.drop_index('ix_task_project_priority')
+        batch_op.create_index('ix_task_project_status', ['project_id', 'status_rank'])
+        batch_op.create_index('ix_task_project_priority', ['project_id', 'priority_rank', 'id'])
+        batch_op.create_index('ix_task_priority', ['priority_rank', 'id'])
+
+
+def downgrade():
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_index('ix_task_priority')
+        batch_op.drop_index('ix_task_project_priority')
+        batch_op.drop_index('ix_task_project_status')
+        batch_op.create_index('ix_task_project_status', ['project_id', 'status'])
+        batch_op.create_index('ix_task_project_priority', ['project_id', 'priority'])
+        batch_op.drop_column('priority_rank')
+        batch_op.drop_column('status_rank')
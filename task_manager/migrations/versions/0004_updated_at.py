@@ -0,0 +1,34 @@
+"""updated_at on project and task for conditional GETs
+
+Revision ID: 0004_updated_at
+Revises: 0003_task_rank_columns
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_updated_at'
+down_revision = '0003_task_rank_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('project', 'task'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+    op.create_index('ix_task_project_updated', 'task', ['project_id', 'updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_task_project_updated', table_name='task')
+    for table in ('task', 'project'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
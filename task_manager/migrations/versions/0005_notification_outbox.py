@@ -0,0 +1,37 @@
+"""notification_event outbox table
+
+Revision ID: 0005_notification_outbox
+Revises: 0004_updated_at
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_notification_outbox'
+down_revision = '0004_updated_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notification_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('action', sa.String(length=32), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_notification_event_task', 'notification_event', ['task_id'])
+    op.create_index('ix_notification_event_claim', 'notification_event', ['claim_token'])
+
+
+def downgrade():
+    op.drop_index('ix_notification_event_claim', table_name='notification_event')
+    op.drop_index('ix_notification_event_task', table_name='notification_event')
+    op.drop_table('notification_event')
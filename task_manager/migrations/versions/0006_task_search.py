@@ -0,0 +1,74 @@
+"""full-text search index over task title/description
+
+Revision ID: 0006_task_search
+Revises: 0005_notification_outbox
+Create Date: 2026-10-17 13:00:00.000000
+
+Postgres gets a generated tsvector column with a GIN index; SQLite gets an
+external-content FTS5 table kept in sync by triggers. Other backends get
+nothing and fall back to LIKE matching (see app/search.py).
+
+Note for later SQLite migrations: batch mode rebuilds `task` by copying it
+to a new table, which drops these triggers. Re-run SQLITE_TRIGGERS after
+any batch_alter_table('task').
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_task_search'
+down_revision = '0005_notification_outbox'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_TRIGGERS = (
+    """
+    CREATE TRIGGER task_fts_ai AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_fts_ad AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_fts_au AFTER UPDATE OF title, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX ix_task_search ON task USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE task_fts USING fts5("
+            "title, description, content='task', content_rowid='id', tokenize='porter unicode61')"
+        )
+        for ddl in SQLITE_TRIGGERS:
+            op.execute(ddl)
+        op.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_task_search")
+        op.execute("ALTER TABLE task DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('task_fts_ai', 'task_fts_ad', 'task_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS task_fts")
@@ -0,0 +1,54 @@
+"""task_stat counters, backfilled from existing tasks
+
+Revision ID: 0007_task_stats
+Revises: 0006_task_search
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_task_stats'
+down_revision = '0006_task_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    task_stat = op.create_table(
+        'task_stat',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('project_id', 'kind', 'key'),
+    )
+
+    # Same buckets as app/stats.py:task_buckets
+    task = sa.table(
+        'task',
+        sa.column('project_id', sa.Integer), sa.column('status', sa.String),
+        sa.column('priority', sa.String), sa.column('assigned_to', sa.Integer),
+        sa.column('due_date', sa.Date),
+    )
+
+    def grouped(kind, key, *where):
+        return (
+            sa.select(task.c.project_id, sa.literal(kind, sa.String), key, sa.func.count())
+            .where(*where)
+            .group_by(task.c.project_id, key)
+        )
+
+    status = sa.func.coalesce(task.c.status, '')
+    op.execute(task_stat.insert().from_select(['project_id', 'kind', 'key', 'count'], sa.union_all(
+        grouped('status', status),
+        grouped('priority', sa.func.coalesce(task.c.priority, '')),
+        grouped('assignee', sa.func.coalesce(sa.cast(task.c.assigned_to, sa.String), '')),
+        grouped('due', sa.cast(task.c.due_date, sa.String), task.c.due_date.isnot(None), status != 'done'),
+    )))
+
+
+def downgrade():
+    op.drop_table('task_stat')
@@ -0,0 +1,40 @@
+"""change_log table backing the per-user change feed
+
+Revision ID: 0008_change_log
+Revises: 0007_task_stats
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_change_log'
+down_revision = '0007_task_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=16), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('action', sa.String(length=16), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+        # Never reuse a pruned seq: clients hold them as cursors
+        sqlite_autoincrement=True,
+    )
+    op.create_index('ix_change_log_user_seq', 'change_log', ['user_id', 'seq'])
+    op.create_index('ix_change_log_created', 'change_log', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_change_log_created', table_name='change_log')
+    op.drop_index('ix_change_log_user_seq', table_name='change_log')
+    op.drop_table('change_log')
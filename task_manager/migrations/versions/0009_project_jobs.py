@@ -0,0 +1,127 @@
+"""ON DELETE CASCADE task foreign keys, project state, task_archive and project_job
+
+Revision ID: 0009_project_jobs
+Revises: 0008_change_log
+Create Date: 2026-10-17 21:00:00.000000
+
+On SQLite the task table is rebuilt (batch mode), which drops the
+full-text search triggers from 0006_task_search; they are re-created
+below. On Postgres the new foreign keys are added NOT VALID and then
+validated, so the existing rows are checked without blocking writes.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_project_jobs'
+down_revision = '0008_change_log'
+branch_labels = None
+depends_on = None
+
+# Names SQLite's unnamed foreign keys get while reflected for the rebuild
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# (name, local column, referred table, ON DELETE) for the new constraints,
+# and what Postgres called the old ones
+TASK_FOREIGN_KEYS = (
+    ('fk_task_project_id_project', 'project_id', 'project', 'CASCADE', 'task_project_id_fkey'),
+    ('fk_task_assigned_to_user', 'assigned_to', 'user', 'SET NULL', 'task_assigned_to_fkey'),
+)
+
+# Frozen copy of 0006_task_search.SQLITE_TRIGGERS
+SQLITE_TRIGGERS = (
+    """
+    CREATE TRIGGER task_fts_ai AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_fts_ad AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_fts_au AFTER UPDATE OF title, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+)
+
+
+def _rebuild_task_foreign_keys(ondelete: bool):
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        with op.batch_alter_table('task', naming_convention=SQLITE_NAMING, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': ondelete}) as batch_op:
+            for name, column, referred, action, _ in TASK_FOREIGN_KEYS:
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=action if ondelete else None)
+        for ddl in SQLITE_TRIGGERS:
+            op.execute(ddl)
+        return
+
+    for name, column, referred, action, old_name in TASK_FOREIGN_KEYS:
+        current, new = (old_name, name) if ondelete else (name, old_name)
+        op.drop_constraint(current, 'task', type_='foreignkey')
+        op.create_foreign_key(new, 'task', referred, [column], ['id'], ondelete=action if ondelete else None,
+                              postgresql_not_valid=dialect == 'postgresql')
+        if dialect == 'postgresql':
+            op.execute(f'ALTER TABLE task VALIDATE CONSTRAINT "{new}"')
+
+
+def upgrade():
+    _rebuild_task_foreign_keys(ondelete=True)
+
+    op.add_column('project', sa.Column('state', sa.String(length=16), nullable=False, server_default='active'))
+
+    op.create_table(
+        'task_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=120), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('priority', sa.String(length=20), nullable=True),
+        sa.Column('status_rank', sa.SmallInteger(), nullable=False),
+        sa.Column('priority_rank', sa.SmallInteger(), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=True),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('assigned_to', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_task_archive_project', 'task_archive', ['project_id', 'id'])
+
+    op.create_table(
+        'project_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_project_job_status', 'project_job', ['status', 'id'])
+    op.create_index('ix_project_job_project', 'project_job', ['project_id'])
+
+
+def downgrade():
+    op.drop_index('ix_project_job_project', table_name='project_job')
+    op.drop_index('ix_project_job_status', table_name='project_job')
+    op.drop_table('project_job')
+    op.drop_index('ix_task_archive_project', table_name='task_archive')
+    op.drop_table('task_archive')
+    with op.batch_alter_table('project') as batch_op:
+        batch_op.drop_column('state')
+    _rebuild_task_foreign_keys(ondelete=False)
@@ -0,0 +1,151 @@
+import shutil
+import smtplib
+from collections import namedtuple
+
+import pytest
+
+from task_manager.app import create_app, db
+from task_manager.app.schema import upgrade_database
+from task_manager.config import Config
+
+# Applied to every test app on top of Config; tests pass more to make_app()
+TEST_CONFIG = {
+    "TESTING": True,
+    "ENFORCE_QUERY_BUDGETS": True,
+    "MIGRATE_ON_STARTUP": False,
+    # A broker keeps create_app from starting the outbox drainer and job runner threads
+    "CELERY_BROKER_URL": "memory://",
+    "JWT_SECRET_KEY": "test-jwt-secret-key-of-at-least-32-bytes",
+    "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+    "RESPONSE_CACHE": "off",
+    "RATE_LIMIT": "off",
+    "NOTIFICATIONS_ENABLED": False,
+    "MAIL_SERVER": None,
+}
+
+Login = namedtuple("Login", "id headers")
+
+
+def _create_app(uri: str, overrides: dict):
+    with pytest.MonkeyPatch.context() as mp:
+        for key, value in {**TEST_CONFIG, "SQLALCHEMY_DATABASE_URI": uri, **overrides}.items():
+            mp.setattr(Config, key, value, raising=False)
+        return create_app()
+
+
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory):
+    """A database migrated once per run; every test starts from a copy."""
+    path = tmp_path_factory.mktemp("template") / "template.db"
+    app = _create_app(f"sqlite:///{path}", {})
+    with app.app_context():
+        upgrade_database()
+        db.engine.dispose()
+    return path
+
+
+@pytest.fixture
+def make_app(tmp_path, template_db):
+    apps = []
+
+    def make(**overrides):
+        path = tmp_path / f"app{len(apps)}.db"
+        shutil.copy(template_db, path)
+        app = _create_app(f"sqlite:///{path}", overrides)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.engine.dispose()
+
+
+class FakeSMTP:
+    """Stands in for smtplib.SMTP; records every session and message."""
+
+    sessions = []
+    sent = []
+    # Messages a session delivers before the server drops it (None: never)
+    drop_after = None
+    refused = set()
+
+    def __init__(self, host, port, timeout=None):
+        self.sessions.append(self)
+        self.delivered = 0
+
+    def _check(self):
+        if self.drop_after is not None and self.delivered >= self.drop_after:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    def send_message(self, msg):
+        self._check()
+        if msg["To"] in self.refused:
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"No such user")})
+        self.delivered += 1
+        self.sent.append(msg)
+
+    def noop(self):
+        self._check()
+        return 250, b"OK"
+
+    def quit(self):
+        self._check()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    monkeypatch.setattr("smtplib.SMTP", FakeSMTP)
+    monkeypatch.setattr(FakeSMTP, "sessions", [])
+    monkeypatch.setattr(FakeSMTP, "sent", [])
+    monkeypatch.setattr(FakeSMTP, "refused", set())
+    monkeypatch.setattr(FakeSMTP, "drop_after", None)
+    return FakeSMTP
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class Api:
+    """Shortcuts for the setup steps most tests share."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def user(self, name: str = "alice") -> Login:
+        self.client.post("/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "pw"})
+        r = self.client.post("/auth/login", json={"username": name, "password": "pw"})
+        assert r.status_code == 200, r.get_json()
+        body = r.get_json()
+        return Login(body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"})
+
+    def project(self, login: Login, name: str = "Project") -> int:
+        r = self.client.post("/projects/", json={"name": name}, headers=login.headers)
+        assert r.status_code == 201, r.get_json()
+        return r.get_json()["id"]
+
+    def task(self, login: Login, project_id: int, title: str = "Task", **fields) -> int:
+        r = self.client.post("/tasks/", json={"title": title, "project_id": project_id, **fields}, headers=login.headers)
+        assert r.status_code == 201, r.get_json()
+        return r.get_json()["id"]
+
+    def tasks(self, login: Login, project_id: int, n: int, **fields) -> list:
+        items = [{"title": f"Task {i}", "project_id": project_id, **fields} for i in range(n)]
+        r = self.client.post("/tasks/bulk", json={"tasks": items}, headers=login.headers)
+        assert r.get_json()["created"] == n, r.get_json()
+        return [item["id"] for item in r.get_json()["results"]]
+
+
+@pytest.fixture
+def api(client):
+    return Api(client)
@@ -0,0 +1,86 @@
+import pytest
+from conftest import Api
+
+from task_manager.app.admission import parse_limit, take_token
+
+
+def test_parse_limit():
+    limit = parse_limit("20/second:40")
+    assert (limit.rate, limit.burst) == (20, 40)
+    assert parse_limit("10/minute").burst == 10
+    assert parse_limit(" OFF ") is None
+    for spec in ("10", "10/fortnight", "0/second", "x/minute"):
+        with pytest.raises(RuntimeError):
+            parse_limit(spec)
+
+
+def test_take_token():
+    limit = parse_limit("1/second:2")
+    assert take_token(2, 0, limit) == (1, 0)
+    tokens, wait = take_token(0.5, 0, limit)
+    assert (tokens, wait) == (0.5, 0.5)
+    assert take_token(0, 10, limit) == (1, 0)
+
+
+def test_invalid_config_fails_at_startup(make_app):
+    with pytest.raises(RuntimeError, match="Invalid limit entry"):
+        make_app(RATE_LIMIT="memory", RATE_LIMITS="tasks")
+    with pytest.raises(RuntimeError, match="Invalid concurrency limit"):
+        make_app(CONCURRENCY_LIMITS="tasks=0")
+    with pytest.raises(RuntimeError, match="RATE_LIMIT_URL"):
+        make_app(RATE_LIMIT="redis", RATE_LIMIT_URL=None)
+
+
+def test_users_get_their_own_bucket(make_app):
+    app = make_app(RATE_LIMIT="memory", RATE_LIMIT_DEFAULT="3/minute", RATE_LIMITS="")
+    client = app.test_client()
+    api = Api(client)
+    alice, bob = api.user("alice"), api.user("bob")
+
+    assert [client.get("/projects/", headers=alice.headers).status_code for _ in range(4)] == [200, 200, 200, 429]
+    r = client.get("/projects/", headers=alice.headers)
+    assert r.get_json()["error"] == "Too many requests, retry later"
+    assert 1 <= int(r.headers["Retry-After"]) <= 20
+    assert client.get("/projects/", headers=bob.headers).status_code == 200
+
+
+def _logins(app, usernames):
+    client = app.test_client()
+    for name in set(usernames):
+        client.post("/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "pw"})
+    return [client.post("/auth/login", json={"username": name, "password": "pw"}).status_code for name in usernames]
+
+
+def test_logins_are_limited_per_username(make_app):
+    app = make_app(RATE_LIMIT="memory", RATE_LIMITS="auth.login=2/minute")
+    assert _logins(app, ["alice", "alice", "alice", "bob"]) == [200, 200, 429, 200]
+    # Registration has no username bucket and no trusted address to key on
+    client = app.test_client()
+    assert [client.post("/auth/register", json={}).status_code for _ in range(3)] == [400, 400, 400]
+
+
+@pytest.mark.parametrize("overrides", [{"RATE_LIMIT_BY_IP": True}, {"PROXY_FIX_X_FOR": 1}])
+def test_anonymous_requests_limited_by_a_trusted_address(make_app, overrides):
+    app = make_app(RATE_LIMIT="memory", RATE_LIMITS="auth.login=2/minute", **overrides)
+    assert _logins(app, ["alice", "bob", "carol"]) == [200, 200, 429]
+
+
+def test_concurrency_limit(make_app):
+    app = make_app(CONCURRENCY_LIMITS="tasks.export_tasks=1", CONCURRENCY_RETRY_AFTER=3)
+    client = app.test_client()
+    alice = Api(client).user()
+    slot = app.extensions["admission"].slots["tasks.export_tasks"]
+
+    assert slot.acquire(blocking=False)
+    try:
+        r = client.get("/tasks/export", headers=alice.headers)
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "3"
+        # Other endpoints are unaffected
+        assert client.get("/tasks/", headers=alice.headers).status_code == 200
+    finally:
+        slot.release()
+    assert client.get("/tasks/export", headers=alice.headers).status_code == 200
+    # The slot is given back once the response is done
+    assert slot.acquire(blocking=False)
+    slot.release()
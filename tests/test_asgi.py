@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from conftest import Api
+
+from task_manager.app.asgi import create_asgi_app
+
+
+class AsgiClient:
+    """Just enough of an ASGI server to call the app in-process."""
+
+    def __init__(self, flask_app):
+        self.app = create_asgi_app(flask_app)
+
+    async def get(self, target: str, headers=None):
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+            "root_path": "", "client": ("127.0.0.1", 50000), "server": ("localhost", 80),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+        start = messages[0]
+        return (
+            start["status"],
+            {k.decode().lower(): v.decode() for k, v in start["headers"]},
+            b"".join(m.get("body", b"") for m in messages[1:]),
+        )
+
+    async def close(self):
+        await self.app.engine.dispose()
+
+
+@pytest.fixture
+def asgi(app):
+    return AsgiClient(app)
+
+
+def _run(asgi, coro):
+    async def run():
+        try:
+            return await coro
+        finally:
+            await asgi.close()
+    return asyncio.run(run())
+
+
+def test_async_reads_match_wsgi(client, api, asgi):
+    alice, bob = api.user("alice"), api.user("bob")
+    pid = api.project(alice)
+    tid = api.task(alice, pid, "Ship it", assigned_to=bob.id)
+    api.tasks(alice, pid, 3)
+    targets = ["/tasks/", f"/tasks/{tid}", "/tasks/?sort=priority&page_size=2", "/tasks/?cursor=", "/tasks/?cursor=bad",
+               "/tasks/999", "/projects/"]
+
+    async def fetch_all(headers):
+        return [await asgi.get(target, headers) for target in targets]
+
+    responses = _run(asgi, fetch_all(alice.headers))
+    for target, (status, headers, body) in zip(targets, responses):
+        expected = client.get(target, headers=alice.headers)
+        assert status == expected.status_code, target
+        assert body == expected.get_data(), target
+        assert headers.get("etag") == expected.headers.get("ETag"), target
+
+
+def test_async_conditional_and_auth(client, api, asgi):
+    alice, bob = api.user("alice"), api.user("bob")
+    tid = api.task(alice, api.project(alice))
+    etag = client.get("/tasks/", headers=alice.headers).headers["ETag"]
+
+    async def fetch():
+        return (
+            await asgi.get("/tasks/", {**alice.headers, "If-None-Match": etag}),
+            await asgi.get(f"/tasks/{tid}", bob.headers),
+            await asgi.get("/tasks/"),
+            await asgi.get("/tasks/", {"Authorization": "Bearer nonsense"}),
+        )
+
+    statuses = [status for status, _, _ in _run(asgi, fetch())]
+    assert statuses == [304, 404, 401, 422]
+
+
+def test_before_request_hooks_run_off_the_event_loop(make_app):
+    app = make_app()
+    threads = []
+    app.before_request(lambda: threads.append(threading.get_ident()))
+    alice = Api(app.test_client()).user()
+    asgi = AsgiClient(app)
+    threads.clear()
+
+    async def fetch():
+        status, _, _ = await asgi.get("/tasks/", alice.headers)
+        return status, threading.get_ident()
+
+    status, loop_thread = _run(asgi, fetch())
+    assert status == 200
+    assert len(threads) == 1
+    assert threads[0] != loop_thread
+
+
+def test_async_stream(make_app):
+    app = make_app(CHANGE_STREAM_MAX_SECONDS=0.2, CHANGE_STREAM_HEARTBEAT=0.05)
+    api = Api(app.test_client())
+    alice = api.user()
+    tid = api.task(alice, api.project(alice))
+    asgi = AsgiClient(app)
+
+    status, headers, body = _run(asgi, asgi.get("/changes/stream?since=0", alice.headers))
+    assert status == 200
+    assert headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in body.decode().splitlines() if line.startswith("data: ")]
+    assert (events[-1]["entity"], events[-1]["id"]) == ("task", tid)
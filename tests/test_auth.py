@@ -0,0 +1,76 @@
+from sqlalchemy import select
+
+from task_manager.app import db, identity
+from task_manager.app.models import User
+from task_manager.app.passwords import PasswordHasher, normalize_method
+
+
+def _login(client, password="pw"):
+    return client.post("/auth/login", json={"username": "alice", "password": password})
+
+
+def test_register_login_me(client, api):
+    alice = api.user()
+    r = client.post("/auth/register", json={"username": "alice", "email": "other@example.com", "password": "pw"})
+    assert r.status_code == 400
+    assert client.post("/auth/register", json={"username": "bob"}).status_code == 400
+
+    assert _login(client, "wrong").status_code == 401
+    assert client.post("/auth/login", json={"username": "nobody", "password": "pw"}).status_code == 401
+    assert client.get("/auth/me", headers=alice.headers).get_json()["username"] == "alice"
+    assert client.get("/auth/me").status_code == 401
+    assert client.get("/auth/me", headers={"Authorization": "Bearer nonsense"}).status_code == 422
+
+
+def test_normalize_method():
+    assert normalize_method("scrypt") == "scrypt:32768:8:1"
+    assert normalize_method("scrypt:16384") == "scrypt:16384:8:1"
+    assert normalize_method("pbkdf2:sha256:1000") == "pbkdf2:sha256:1000"
+    assert normalize_method("pbkdf2").startswith("pbkdf2:sha256:")
+
+
+def test_login_upgrades_old_hashes(app, client, api):
+    api.user()
+    app.extensions["password_hasher"] = PasswordHasher("pbkdf2:sha256:2000", workers=1, queue=4, timeout=10)
+
+    def stored():
+        with app.app_context():
+            return db.session.scalar(select(User.password).where(User.username == "alice"))
+
+    assert stored().startswith("pbkdf2:sha256:1000$")
+    assert _login(client).status_code == 200
+    assert stored().startswith("pbkdf2:sha256:2000$")
+    assert _login(client).status_code == 200
+
+
+def test_busy_hasher_answers_503(app, client, api):
+    api.user()
+    hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, queue=1, timeout=10)
+    app.extensions["password_hasher"] = hasher
+    assert hasher._slots.acquire(blocking=False)
+    try:
+        r = _login(client)
+        assert r.status_code == 503
+        assert r.headers["Retry-After"]
+    finally:
+        hasher._slots.release()
+    assert _login(client).status_code == 200
+
+
+def test_public_routes_skip_the_token(client, api, monkeypatch):
+    alice = api.user()
+    calls = []
+
+    def verify():
+        calls.append(True)
+        return verify_jwt_in_request()
+
+    verify_jwt_in_request = identity.verify_jwt_in_request
+    monkeypatch.setattr(identity, "verify_jwt_in_request", verify)
+    bad = {"Authorization": "Bearer nonsense"}
+    assert client.get("/healthz", headers=bad).status_code == 200
+    assert client.post("/auth/login", json={"username": "alice", "password": "pw"}, headers=bad).status_code == 200
+    assert calls == []
+
+    assert client.get("/tasks/", headers=alice.headers).status_code == 200
+    assert calls == [True]
@@ -0,0 +1,46 @@
+from task_manager.app.authz import invalidate_project, owned_project_ids, project_owner
+from task_manager.app.query_counter import count_queries
+
+
+def test_owner_is_cached(app, api):
+    alice = api.user()
+    pid = api.project(alice)
+    with app.app_context():
+        invalidate_project(pid)
+        with count_queries() as counter:
+            assert project_owner(pid) == alice.id
+            assert project_owner(pid) == alice.id
+        assert counter.count == 1
+
+        invalidate_project(pid)
+        with count_queries() as counter:
+            assert project_owner(pid) == alice.id
+        assert counter.count == 1
+        assert project_owner(999) is None
+
+
+def test_owned_project_ids_queries_only_the_uncached(app, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    mine, theirs = api.project(alice), api.project(bob)
+    with app.app_context():
+        for pid in (mine, theirs):
+            invalidate_project(pid)
+        project_owner(mine)
+        with count_queries() as counter:
+            assert owned_project_ids([mine, theirs, 999], alice.id) == {mine}
+        assert counter.count == 1
+        with count_queries() as counter:
+            assert owned_project_ids([mine, theirs], bob.id) == {theirs}
+        assert counter.count == 0
+
+
+def test_inactive_projects_have_no_owner(app, client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    api.task(alice, pid)
+    client.post(f"/projects/{pid}/archive", headers=alice.headers)
+    with app.app_context():
+        assert project_owner(pid) is None
+        assert owned_project_ids([pid], alice.id) == set()
+    r = client.post("/tasks/", json={"title": "late", "project_id": pid}, headers=alice.headers)
+    assert r.status_code == 404
@@ -0,0 +1,107 @@
+import json
+
+from conftest import Api
+
+from task_manager.app.changes import prune_change_log
+
+
+def _changes(client, login, since, **args):
+    r = client.get("/changes/", query_string={"since": since, **args}, headers=login.headers)
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()
+
+
+def test_feed_follows_writes(client, api):
+    alice = api.user()
+    start = client.get("/changes/", headers=alice.headers).get_json()
+    assert start["changes"] == []
+
+    pid = api.project(alice)
+    tid = api.task(alice, pid, "Draft")
+    client.patch(f"/tasks/{tid}", json={"title": "Final"}, headers=alice.headers)
+    other = api.task(alice, pid, "Gone")
+    client.delete(f"/tasks/{other}", headers=alice.headers)
+
+    body = _changes(client, alice, start["cursor"] or 0)
+    # One entry per entity, carrying its current row
+    assert [(c["entity"], c["id"], c["action"]) for c in body["changes"]] == [
+        ("project", pid, "created"), ("task", tid, "updated"), ("task", other, "deleted"),
+    ]
+    assert body["changes"][1]["data"]["title"] == "Final"
+    assert body["changes"][2]["data"] is None
+    assert body["has_more"] is False
+
+    assert _changes(client, alice, body["cursor"])["changes"] == []
+    client.patch(f"/projects/{pid}", json={"name": "Renamed"}, headers=alice.headers)
+    later = _changes(client, alice, body["cursor"])["changes"]
+    assert [(c["entity"], c["data"]["name"]) for c in later] == [("project", "Renamed")]
+
+
+def test_feeds_are_per_user(client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    api.task(alice, api.project(alice))
+    assert _changes(client, bob, 0)["changes"] == []
+
+
+def test_limit_pages_through(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    api.tasks(alice, pid, 5)
+    seen, cursor, pages = [], 0, 0
+    while True:
+        body = _changes(client, alice, cursor, limit=2)
+        seen += [c["seq"] for c in body["changes"]]
+        cursor, pages = body["cursor"], pages + 1
+        if not body["has_more"]:
+            break
+    assert pages == 3
+    assert len(seen) == 6
+    assert seen == sorted(seen)
+
+
+def test_invalid_since(client, api):
+    alice = api.user()
+    for since in ("-1", "abc"):
+        assert client.get(f"/changes/?since={since}", headers=alice.headers).status_code == 400
+
+
+def test_pruned_cursor_is_gone(make_app):
+    app = make_app(CHANGE_LOG_RETENTION_DAYS=0)
+    client = app.test_client()
+    api = Api(client)
+    alice = api.user()
+    api.tasks(alice, api.project(alice), 3)
+    with app.app_context():
+        assert prune_change_log() > 0
+    assert client.get("/changes/?since=0", headers=alice.headers).status_code == 410
+    cursor = client.get("/changes/", headers=alice.headers).get_json()["cursor"]
+    assert _changes(client, alice, cursor)["changes"] == []
+
+
+def test_stream_refused_on_sync_workers(client, api):
+    alice = api.user()
+    r = client.get("/changes/stream", headers=alice.headers)
+    assert r.status_code == 501
+    assert "/changes/?since=" in r.get_json()["error"]
+
+
+def test_stream_sends_changes(make_app):
+    app = make_app(CHANGE_STREAM_MAX_SECONDS=0.2, CHANGE_STREAM_HEARTBEAT=0.05)
+    client = app.test_client()
+    api = Api(client)
+    alice = api.user()
+    tid = api.task(alice, api.project(alice))
+
+    r = client.get("/changes/stream?since=0", headers=alice.headers, environ_overrides={"wsgi.multithread": True})
+    assert r.status_code == 200
+    assert r.mimetype == "text/event-stream"
+    body = r.get_data(as_text=True)
+    assert body.startswith("retry: ")
+    events = [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+    assert [(e["entity"], e["id"]) for e in events][-1] == ("task", tid)
+    assert ": keepalive" in body
+
+    last = events[-1]["seq"]
+    r = client.get("/changes/stream", headers={**alice.headers, "Last-Event-ID": str(last)},
+                   environ_overrides={"wsgi.multithread": True})
+    assert "data: " not in r.get_data(as_text=True)
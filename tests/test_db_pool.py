@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from task_manager.app import db
+from task_manager.app.db_pool import InstrumentedQueuePool, engine_options
+
+
+def test_healthz_reports_the_pool(client):
+    body = client.get("/healthz").get_json()
+    assert body["status"] == "ok"
+    assert body["db_pool"]["class"]
+    assert body["response_cache"] is None
+
+
+def test_sqlite_pragmas(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+
+
+def test_server_databases_get_the_instrumented_pool():
+    config = {"SQLALCHEMY_DATABASE_URI": "postgresql://db/tasks", "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": 5}}
+    assert engine_options(SimpleNamespace(config=config)) == {"pool_size": 5, "poolclass": InstrumentedQueuePool}
+    config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///tasks.db"
+    assert "poolclass" not in engine_options(SimpleNamespace(config=config))
+
+
+def test_pool_counts_waits_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    stats = engine.pool.stats.snapshot()
+    assert (stats["checkouts"], stats["timeouts"]) == (2, 1)
+    assert stats["wait_seconds_max"] >= 0.05
+    engine.dispose()
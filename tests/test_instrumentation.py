@@ -0,0 +1,45 @@
+import logging
+
+from sqlalchemy import select, text
+
+from task_manager.app import db
+from task_manager.app.instrumentation import EXTENSION_KEY
+
+
+def test_metrics(client, api):
+    alice = api.user()
+    client.get("/tasks/", headers=alice.headers)
+    client.get("/tasks/999", headers=alice.headers)
+    body = client.get("/metrics").get_data(as_text=True)
+
+    route = 'blueprint="tasks",endpoint="tasks.list_tasks",method="GET"'
+    assert f'http_requests_total{{{route},status="200"}} 1' in body
+    assert f'http_request_duration_seconds_count{{{route}}} 1' in body
+    assert f'http_request_sql_statements_bucket{{{route},le="+Inf"}} 1' in body
+    assert 'endpoint="tasks.get_task",method="GET",status="404"' in body
+    assert "\ndb_pool_" in body
+
+
+def test_server_timing(make_app):
+    client = make_app(SERVER_TIMING=True).test_client()
+    header = client.get("/healthz").headers["Server-Timing"]
+    assert header.startswith("app;dur=")
+    assert 'desc="0 queries"' in header
+
+
+def test_nothing_installed_when_disabled(make_app):
+    app = make_app(REQUEST_METRICS=False, SLOW_QUERY_MS=0, SLOW_REQUEST_MS=0)
+    client = app.test_client()
+    assert EXTENSION_KEY not in app.extensions
+    assert client.get("/metrics").status_code == 404
+    assert "Server-Timing" not in client.get("/healthz").headers
+
+
+def test_slow_queries_are_logged_without_their_parameters(make_app, caplog):
+    app = make_app(SLOW_QUERY_MS=0.000001)
+    with app.app_context(), caplog.at_level(logging.WARNING):
+        db.session.execute(select(text(":secret")), {"secret": "hunter2"})
+    (record,) = [r for r in caplog.records if r.getMessage().startswith("Slow query")]
+    assert "hunter2" not in record.getMessage()
+    assert record.getMessage().endswith("with (str)")
+    assert "\ndb_slow_queries_total " in app.test_client().get("/metrics").get_data(as_text=True)
@@ -0,0 +1,92 @@
+import pytest
+from conftest import Api
+from sqlalchemy import func, select
+
+from task_manager.app import db
+from task_manager.app.models import NotificationEvent
+from task_manager.app.notifications import drain_notifications
+
+ENABLED = {"NOTIFICATIONS_ENABLED": True, "MAIL_SERVER": "smtp.example.com", "NOTIFICATION_COALESCE_SECONDS": 0}
+
+
+def _pending(app):
+    with app.app_context():
+        return db.session.scalar(select(func.count(NotificationEvent.id)))
+
+
+def _drain(app):
+    with app.app_context():
+        return drain_notifications()
+
+
+def _assign(client, *names):
+    api = Api(client)
+    alice = api.user("alice")
+    pid = api.project(alice)
+    tasks = [api.task(alice, pid, assigned_to=api.user(name).id) for name in names]
+    return alice, tasks
+
+
+@pytest.mark.parametrize("overrides", [
+    {"NOTIFICATIONS_ENABLED": True},
+    {"NOTIFICATIONS_ENABLED": False, "MAIL_SERVER": "smtp.example.com"},
+])
+def test_nothing_queued_without_a_mail_server_to_send_through(make_app, smtp, overrides):
+    app = make_app(**overrides)
+    _assign(app.test_client(), "bob")
+    assert _pending(app) == 0
+    assert _drain(app) == 0
+
+
+def test_changes_to_a_task_fold_into_one_email(make_app, smtp):
+    app = make_app(**ENABLED)
+    client = app.test_client()
+    alice, (tid,) = _assign(client, "bob")
+    client.patch(f"/tasks/{tid}", json={"status": "done"}, headers=alice.headers)
+    assert _pending(app) == 2
+
+    assert _drain(app) == 1
+    assert _pending(app) == 0
+    (msg,) = smtp.sent
+    assert msg["To"] == "bob@example.com"
+    assert msg["Subject"] == "Task 'Task': Assigned, Status Changed"
+
+
+def test_dropped_sessions_are_replaced(make_app, smtp):
+    app = make_app(**ENABLED)
+    _assign(app.test_client(), "bob", "carol", "dave")
+    smtp.drop_after = 1
+    assert _drain(app) == 3
+    assert len(smtp.sent) == 3
+    assert len(smtp.sessions) == 3
+
+    # The pooled session drops on its next send; the drain reconnects and delivers
+    _assign(app.test_client(), "erin")
+    assert _drain(app) == 1
+    assert smtp.sent[-1]["To"] == "erin@example.com"
+    assert len(smtp.sessions) == 4
+
+
+def test_failed_sends_stay_queued(make_app, smtp):
+    app = make_app(**ENABLED)
+    _assign(app.test_client(), "bob", "carol")
+    smtp.refused = {"bob@example.com"}
+    assert _drain(app) == 1
+    assert [msg["To"] for msg in smtp.sent] == ["carol@example.com"]
+    assert _pending(app) == 1
+
+    smtp.refused = set()
+    assert _drain(app) == 1
+    assert _pending(app) == 0
+
+
+def test_unreachable_server_keeps_everything_queued(make_app, smtp, monkeypatch):
+    app = make_app(**ENABLED)
+    _assign(app.test_client(), "bob")
+
+    def refuse(*args, **kwargs):
+        raise ConnectionRefusedError(111, "Connection refused")
+
+    monkeypatch.setattr(smtp, "__init__", refuse)
+    assert _drain(app) == 0
+    assert _pending(app) == 1
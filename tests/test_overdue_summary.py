@@ -0,0 +1,53 @@
+from conftest import Api
+
+from task_manager.app.tasks_email import send_daily_overdue_summary
+
+
+def test_one_summary_per_assignee_in_batches(make_app, smtp):
+    app = make_app(MAIL_SERVER="smtp.example.com", OVERDUE_SUMMARY_BATCH_SIZE=2)
+    client = app.test_client()
+    api = Api(client)
+    alice, bob, carol, dave = (api.user(name) for name in ("alice", "bob", "carol", "dave"))
+    pid = api.project(alice, "Launch")
+    api.task(alice, pid, "Old", assigned_to=bob.id, due_date="2000-01-02")
+    api.task(alice, pid, "Older", assigned_to=bob.id, due_date="2000-01-01")
+    api.task(alice, pid, "Later", assigned_to=bob.id, due_date="2999-01-01")
+    api.task(alice, pid, "Unassigned", due_date="2000-01-01")
+    api.task(alice, pid, "Carol's", assigned_to=carol.id, due_date="2000-01-01")
+    api.task(alice, pid, "Dave's", assigned_to=dave.id, due_date="2000-01-01")
+    archived = api.project(alice, "Archived")
+    api.task(alice, archived, "Shelved", assigned_to=carol.id, due_date="2000-01-01")
+    client.post(f"/projects/{archived}/archive", headers=alice.headers)
+
+    with app.app_context():
+        assert send_daily_overdue_summary() == 3
+    # Two batches of at most two summaries, one SMTP session each
+    assert len(smtp.sessions) == 2
+    bodies = {msg["To"]: msg.get_content() for msg in smtp.sent}
+    assert set(bodies) == {"bob@example.com", "carol@example.com", "dave@example.com"}
+    assert bodies["bob@example.com"].index("Older") < bodies["bob@example.com"].index("- [todo] Old ")
+    assert "(Project: Launch) due 2000-01-01" in bodies["bob@example.com"]
+    assert "Later" not in bodies["bob@example.com"]
+    assert "Shelved" not in bodies["carol@example.com"]
+
+
+def test_nothing_overdue(make_app, smtp):
+    app = make_app(MAIL_SERVER="smtp.example.com")
+    with app.app_context():
+        assert send_daily_overdue_summary() == 0
+    assert smtp.sessions == []
+
+
+def test_a_dropped_connection_does_not_lose_the_rest_of_the_batch(make_app, smtp):
+    app = make_app(MAIL_SERVER="smtp.example.com")
+    api = Api(app.test_client())
+    alice = api.user("alice")
+    pid = api.project(alice)
+    for name in ("bob", "carol", "dave"):
+        api.task(alice, pid, assigned_to=api.user(name).id, due_date="2000-01-01")
+    smtp.drop_after = 1
+
+    with app.app_context():
+        assert send_daily_overdue_summary() == 3
+    assert sorted(msg["To"] for msg in smtp.sent) == ["bob@example.com", "carol@example.com", "dave@example.com"]
+    assert len(smtp.sessions) == 3
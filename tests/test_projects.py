@@ -0,0 +1,139 @@
+from conftest import Api
+from sqlalchemy import func, select
+
+from task_manager.app import db
+from task_manager.app.authz import remember_owner
+from task_manager.app.models import Task
+from task_manager.app.project_jobs import run_project_jobs
+
+
+def test_project_crud(client, api):
+    alice = api.user()
+    r = client.post("/projects/", json={"name": "  Website  ", "description": ""}, headers=alice.headers)
+    assert r.status_code == 201
+    project = r.get_json()
+    assert (project["name"], project["description"], project["state"]) == ("Website", None, "active")
+
+    assert client.post("/projects/", json={"name": " "}, headers=alice.headers).status_code == 400
+    r = client.patch(f"/projects/{project['id']}", json={"name": "Site"}, headers=alice.headers)
+    assert r.get_json()["name"] == "Site"
+    assert client.patch(f"/projects/{project['id']}", json={"name": ""}, headers=alice.headers).status_code == 400
+
+    api.tasks(alice, project["id"], 2)
+    body = client.get(f"/projects/{project['id']}", headers=alice.headers).get_json()
+    assert len(body["tasks"]) == 2
+
+
+def test_projects_are_private(client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    pid = api.project(alice)
+    assert client.get(f"/projects/{pid}", headers=bob.headers).status_code == 404
+    assert client.get(f"/projects/{pid}/stats", headers=bob.headers).status_code == 404
+    assert client.patch(f"/projects/{pid}", json={"name": "x"}, headers=bob.headers).status_code == 404
+    assert client.delete(f"/projects/{pid}", headers=bob.headers).status_code == 404
+    assert client.get("/projects/", headers=bob.headers).get_json() == []
+
+
+def test_project_list_cursor(client, api):
+    alice = api.user()
+    created = [api.project(alice, f"P{i}") for i in range(7)]
+    assert [p["id"] for p in client.get("/projects/", headers=alice.headers).get_json()] == created[::-1]
+
+    seen, cursor = [], ""
+    while True:
+        body = client.get(f"/projects/?page_size=3&cursor={cursor}", headers=alice.headers).get_json()
+        seen += [p["id"] for p in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == created[::-1]
+    assert client.get("/projects/?cursor=nope", headers=alice.headers).status_code == 400
+
+
+def test_small_project_jobs_run_inline(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    ids = api.tasks(alice, pid, 3, priority="high")
+    stats = client.get(f"/projects/{pid}/stats", headers=alice.headers).get_json()
+
+    r = client.post(f"/projects/{pid}/archive", headers=alice.headers)
+    assert r.status_code == 200
+    assert r.get_json()["job"]["status"] == "done"
+    assert client.get("/tasks/", headers=alice.headers).get_json() == []
+    archived = client.get(f"/projects/{pid}", headers=alice.headers).get_json()
+    assert archived["state"] == "archived"
+    assert sorted(t["id"] for t in archived["tasks"]) == ids
+
+    # Archived projects are read-only
+    assert client.patch(f"/tasks/{ids[0]}", json={"title": "x"}, headers=alice.headers).status_code == 404
+    assert client.post("/tasks/", json={"title": "x", "project_id": pid}, headers=alice.headers).status_code == 404
+    assert client.post(f"/projects/{pid}/archive", headers=alice.headers).status_code == 409
+    assert client.patch(f"/projects/{pid}", json={"name": "x"}, headers=alice.headers).status_code == 409
+
+    assert client.post(f"/projects/{pid}/restore", headers=alice.headers).status_code == 200
+    assert sorted(t["id"] for t in client.get("/tasks/", headers=alice.headers).get_json()) == ids
+    assert client.get(f"/projects/{pid}/stats", headers=alice.headers).get_json() == stats
+
+    assert client.delete(f"/projects/{pid}", headers=alice.headers).status_code == 200
+    assert client.get(f"/projects/{pid}", headers=alice.headers).status_code == 404
+    assert client.get(f"/tasks/{ids[0]}", headers=alice.headers).status_code == 404
+
+
+def test_large_project_jobs_run_in_chunks(make_app):
+    app = make_app(PROJECT_JOB_CHUNK_SIZE=2, PROJECT_JOB_CHUNK_PAUSE_MS=0)
+    client = app.test_client()
+    api = Api(client)
+    alice = api.user()
+    pid = api.project(alice)
+    api.tasks(alice, pid, 5)
+
+    r = client.post(f"/projects/{pid}/archive", headers=alice.headers)
+    assert r.status_code == 202
+    job_url = r.headers["Location"]
+    assert client.get(job_url, headers=alice.headers).get_json()["status"] == "pending"
+    # Another job cannot start while this one holds the project
+    assert client.delete(f"/projects/{pid}", headers=alice.headers).status_code == 409
+
+    with app.app_context():
+        assert run_project_jobs() == 1
+    job = client.get(job_url, headers=alice.headers).get_json()
+    assert (job["status"], job["processed"], job["total"], job["progress"]) == ("done", 5, 5, 1.0)
+    assert client.get(f"/projects/{pid}", headers=alice.headers).get_json()["state"] == "archived"
+
+    r = client.delete(f"/projects/{pid}", headers=alice.headers)
+    assert r.status_code == 202
+    # The project is gone at once, before the runner gets to it
+    assert client.get(f"/projects/{pid}", headers=alice.headers).status_code == 404
+    assert client.get("/projects/", headers=alice.headers).get_json() == []
+    with app.app_context():
+        run_project_jobs()
+    assert client.get(r.headers["Location"], headers=alice.headers).get_json()["status"] == "done"
+
+
+def test_jobs_are_private(client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    pid = api.project(alice)
+    job = client.post(f"/projects/{pid}/archive", headers=alice.headers).get_json()["job"]
+    assert client.get(f"/projects/jobs/{job['id']}", headers=alice.headers).status_code == 200
+    assert client.get(f"/projects/jobs/{job['id']}", headers=bob.headers).status_code == 404
+
+
+def test_stale_owner_cache_cannot_insert_into_archived_projects(app, client, api):
+    alice = api.user()
+    pid, other = api.project(alice), api.project(alice)
+    assert client.post(f"/projects/{pid}/archive", headers=alice.headers).status_code == 200
+    # As if another worker had cached the owner before the archive
+    with app.app_context():
+        remember_owner(pid, alice.id)
+    r = client.post("/tasks/", json={"title": "x", "project_id": pid}, headers=alice.headers)
+    assert r.status_code == 404
+
+    with app.app_context():
+        remember_owner(pid, alice.id)
+    items = [{"title": "a", "project_id": other}, {"title": "b", "project_id": pid}]
+    body = client.post("/tasks/bulk", json={"tasks": items}, headers=alice.headers).get_json()
+    assert [r["status"] for r in body["results"]] == [201, 404]
+    assert body["created"] == 1
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Task).where(Task.project_id == pid)) == 0
+    assert client.get(f"/projects/{other}/stats", headers=alice.headers).get_json()["total"] == 1
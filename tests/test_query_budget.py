@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import select
+
+from task_manager.app import db
+from task_manager.app.query_counter import assert_max_queries, count_queries, query_budget
+
+
+def _add_view(app, budget: int, statements: int):
+    @app.get("/_budget")
+    @query_budget(budget)
+    def spend():
+        for i in range(statements):
+            db.session.execute(select(i))
+        return {}
+
+
+def test_budget_exceeded_fails_with_the_statements(app):
+    _add_view(app, budget=1, statements=2)
+    with pytest.raises(AssertionError, match="Expected at most 1 queries, got 2"):
+        app.test_client().get("/_budget")
+
+
+def test_budget_met(app):
+    _add_view(app, budget=2, statements=2)
+    assert app.test_client().get("/_budget").status_code == 200
+
+
+def test_budget_not_enforced_by_default(make_app):
+    app = make_app(ENFORCE_QUERY_BUDGETS=False)
+    _add_view(app, budget=0, statements=3)
+    assert app.test_client().get("/_budget").status_code == 200
+
+
+def test_count_queries(app):
+    with app.app_context():
+        with count_queries() as counter:
+            db.session.execute(select(1))
+            db.session.execute(select(2))
+        assert counter.count == 2
+        with pytest.raises(AssertionError):
+            with assert_max_queries(0):
+                db.session.execute(select(1))
+
+
+def test_hot_reads_within_budget(app, client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    tid = api.tasks(alice, pid, 30)[0]
+    with app.app_context():
+        with assert_max_queries(2):
+            assert client.get("/tasks/?page_size=100", headers=alice.headers).status_code == 200
+        with assert_max_queries(1):
+            assert client.get(f"/tasks/{tid}", headers=alice.headers).status_code == 200
+        with assert_max_queries(2):
+            assert client.get("/projects/", headers=alice.headers).status_code == 200
+        with assert_max_queries(3):
+            assert client.get(f"/projects/{pid}", headers=alice.headers).status_code == 200
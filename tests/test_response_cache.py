@@ -0,0 +1,105 @@
+import pytest
+from conftest import Api
+
+from task_manager.app.query_counter import count_queries
+from task_manager.app.response_cache import FakeBackend, cache_stats, get_response_cache
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(RESPONSE_CACHE="fake")
+
+
+def _queries(app, client, path, headers):
+    with app.app_context(), count_queries() as counter:
+        r = client.get(path, headers=headers)
+    assert r.status_code == 200
+    return counter.count, r
+
+
+def test_off_unless_configured(make_app):
+    app = make_app(RESPONSE_CACHE="auto", RESPONSE_CACHE_URL=None)
+    with app.app_context():
+        assert get_response_cache() is None
+        assert cache_stats() is None
+
+
+def test_hit_skips_the_view(app, client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    tid = api.task(alice, pid)
+    with app.app_context():
+        assert isinstance(get_response_cache().backend, FakeBackend)
+
+    for path in ("/tasks/", f"/tasks/{tid}", "/projects/", f"/projects/{pid}"):
+        missed, first = _queries(app, client, path, alice.headers)
+        hit, second = _queries(app, client, path, alice.headers)
+        assert hit < missed, path
+        assert second.get_json() == first.get_json()
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+    with app.app_context():
+        stats = cache_stats()
+    assert (stats["backend"], stats["hits"], stats["misses"]) == ("FakeBackend", 4, 4)
+
+
+def test_hit_answers_if_none_match(client, api):
+    alice = api.user()
+    api.task(alice, api.project(alice))
+    etag = client.get("/tasks/", headers=alice.headers).headers["ETag"]
+    assert client.get("/tasks/", headers={**alice.headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_writes_invalidate(client, api):
+    alice = api.user()
+    pid = api.project(alice, "Before")
+    tid = api.task(alice, pid, "Old")
+
+    def fetch():
+        return (
+            client.get("/tasks/", headers=alice.headers).get_json(),
+            client.get(f"/tasks/{tid}", headers=alice.headers).get_json(),
+            client.get(f"/projects/{pid}", headers=alice.headers).get_json(),
+        )
+
+    fetch()
+    client.patch(f"/tasks/{tid}", json={"title": "New"}, headers=alice.headers)
+    listed, task, project = fetch()
+    assert listed[0]["title"] == task["title"] == project["tasks"][0]["title"] == "New"
+
+    client.patch(f"/projects/{pid}", json={"name": "After"}, headers=alice.headers)
+    listed, task, project = fetch()
+    assert listed[0]["project"]["name"] == task["project"]["name"] == project["name"] == "After"
+
+    api.tasks(alice, pid, 2)
+    assert len(client.get("/tasks/", headers=alice.headers).get_json()) == 3
+    client.delete(f"/tasks/{tid}", headers=alice.headers)
+    assert len(client.get("/tasks/", headers=alice.headers).get_json()) == 2
+    assert client.get(f"/tasks/{tid}", headers=alice.headers).status_code == 404
+
+    client.post(f"/projects/{pid}/archive", headers=alice.headers)
+    assert client.get("/tasks/", headers=alice.headers).get_json() == []
+    assert client.get(f"/projects/{pid}", headers=alice.headers).get_json()["state"] == "archived"
+
+
+def test_entries_are_per_user(app, client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    pid = api.project(alice)
+    tid = api.task(alice, pid)
+    assert len(client.get("/tasks/", headers=alice.headers).get_json()) == 1
+    assert client.get(f"/tasks/{tid}", headers=alice.headers).status_code == 200
+
+    assert client.get("/tasks/", headers=bob.headers).get_json() == []
+    assert client.get(f"/tasks/{tid}", headers=bob.headers).status_code == 404
+    assert client.get(f"/projects/{pid}", headers=bob.headers).status_code == 404
+
+
+def test_memory_backend(make_app):
+    app = make_app(RESPONSE_CACHE="memory")
+    client = app.test_client()
+    alice = Api(client).user()
+    client.get("/projects/", headers=alice.headers)
+    client.get("/projects/", headers=alice.headers)
+    with app.app_context():
+        stats = cache_stats()
+    assert (stats["backend"], stats["hits"], stats["misses"]) == ("MemoryBackend", 1, 1)
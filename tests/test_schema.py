@@ -0,0 +1,12 @@
+from sqlalchemy import inspect
+
+from task_manager.app import db
+
+
+def test_migrations_create_the_model_indexes(app):
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            declared = {ix.name for ix in table.indexes}
+            migrated = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            assert declared <= migrated, table.name
@@ -0,0 +1,274 @@
+import pytest
+from conftest import Api
+
+from task_manager.app import db
+from task_manager.app.stats import project_stats, rebuild
+
+
+def test_task_crud(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    r = client.post("/tasks/", json={"title": " Write docs ", "project_id": pid, "priority": "high"}, headers=alice.headers)
+    assert r.status_code == 201
+    task = r.get_json()
+    assert (task["title"], task["status"], task["priority"]) == ("Write docs", "todo", "high")
+    assert task["project"]["id"] == pid
+
+    r = client.patch(f"/tasks/{task['id']}", json={"status": "done", "assigned_to": alice.id}, headers=alice.headers)
+    assert r.status_code == 200
+    assert r.get_json()["status"] == "done"
+    assert r.get_json()["assigned_user"]["id"] == alice.id
+
+    assert client.get(f"/tasks/{task['id']}", headers=alice.headers).get_json()["status"] == "done"
+    assert client.delete(f"/tasks/{task['id']}", headers=alice.headers).status_code == 200
+    assert client.get(f"/tasks/{task['id']}", headers=alice.headers).status_code == 404
+
+
+@pytest.mark.parametrize("body, error", [
+    ({"project_id": 1}, "'title' is required"),
+    ({"title": "x"}, "'project_id' is required"),
+    ({"title": "x", "project_id": 1, "status": "later"}, "Invalid status"),
+    ({"title": "x", "project_id": 1, "assigned_to": 999}, "assigned_to not found"),
+    ({"title": "x", "project_id": True}, "'project_id' must be an integer"),
+    ({"title": "x", "project_id": 1.9}, "'project_id' must be an integer"),
+    ({"title": "x", "project_id": "1"}, "'project_id' must be an integer"),
+    ({"title": "x", "project_id": 1, "assigned_to": True}, "'assigned_to' must be an integer"),
+])
+def test_create_task_validation(client, api, body, error):
+    alice = api.user()
+    api.project(alice)
+    r = client.post("/tasks/", json=body, headers=alice.headers)
+    assert r.status_code == 400
+    assert r.get_json()["error"] == error
+
+
+def test_tasks_are_private(client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    pid = api.project(alice)
+    tid = api.task(alice, pid)
+    assert client.get(f"/tasks/{tid}", headers=bob.headers).status_code == 404
+    assert client.patch(f"/tasks/{tid}", json={"title": "mine"}, headers=bob.headers).status_code == 404
+    assert client.delete(f"/tasks/{tid}", headers=bob.headers).status_code == 404
+    assert client.post("/tasks/", json={"title": "x", "project_id": pid}, headers=bob.headers).status_code == 404
+    assert client.get("/tasks/", headers=bob.headers).get_json() == []
+
+
+def test_list_requires_token(client):
+    assert client.get("/tasks/").status_code == 401
+
+
+def test_filters(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    api.task(alice, pid, "Fix login page", status="done", priority="high")
+    api.task(alice, pid, "Write release notes", priority="low")
+    api.task(alice, pid, "Review login flow")
+
+    def titles(query):
+        return sorted(t["title"] for t in client.get(f"/tasks/?{query}", headers=alice.headers).get_json())
+
+    assert titles("status=done") == ["Fix login page"]
+    assert titles("priority=low") == ["Write release notes"]
+    assert titles("status=unknown") == []
+
+
+@pytest.mark.parametrize("sort", ["", "priority", "status", "due_date"])
+def test_cursor_pages_match_offset_pages(client, api, sort):
+    alice = api.user()
+    pid = api.project(alice)
+    priorities = ["low", "medium", "high"]
+    for i in range(23):
+        api.task(alice, pid, f"Task {i}", priority=priorities[i % 3], status="done" if i % 4 else "todo",
+                 due_date=f"2030-01-0{i % 5 + 1}" if i % 3 else None)
+
+    offset, page = [], 1
+    while True:
+        rows = client.get(f"/tasks/?sort={sort}&page_size=5&page={page}", headers=alice.headers).get_json()
+        if not rows:
+            break
+        offset += [t["id"] for t in rows]
+        page += 1
+
+    keyset, cursor = [], ""
+    while True:
+        body = client.get(f"/tasks/?sort={sort}&page_size=5&cursor={cursor}", headers=alice.headers).get_json()
+        keyset += [t["id"] for t in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(offset) == 23
+    assert keyset == offset
+
+
+def test_cursor_errors(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    api.tasks(alice, pid, 3)
+    assert client.get("/tasks/?cursor=garbage", headers=alice.headers).status_code == 400
+    cursor = client.get("/tasks/?page_size=1&cursor=", headers=alice.headers).get_json()["next_cursor"]
+    # A cursor only continues the order it was minted for
+    assert client.get(f"/tasks/?sort=priority&cursor={cursor}", headers=alice.headers).status_code == 400
+    assert client.get("/tasks/?q=task&cursor=", headers=alice.headers).status_code == 400
+
+
+def test_bulk_create_reports_each_item(client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    pid = api.project(alice)
+    foreign = api.project(bob)
+    r = client.post("/tasks/bulk", json={"tasks": [
+        {"title": "ok", "project_id": pid, "assigned_to": bob.id},
+        {"title": "", "project_id": pid},
+        {"title": "bool project", "project_id": True},
+        {"title": "not mine", "project_id": foreign},
+        {"title": "no such user", "project_id": pid, "assigned_to": 999},
+        {"title": "dict assignee", "project_id": pid, "assigned_to": {"id": 1}},
+        {"title": 5, "project_id": pid},
+        "not an object",
+    ]}, headers=alice.headers)
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["created"] == 1
+    assert [res["status"] for res in body["results"]] == [201, 400, 400, 404, 400, 400, 400, 400]
+    assert client.get(f"/tasks/{body['results'][0]['id']}", headers=alice.headers).get_json()["assigned_to"] == bob.id
+
+
+def test_bulk_limits(make_app):
+    app = make_app(BULK_MAX_ITEMS=2)
+    client = app.test_client()
+    alice = Api(client).user()
+    assert client.post("/tasks/bulk", json={"tasks": []}, headers=alice.headers).status_code == 400
+    r = client.post("/tasks/bulk", json={"tasks": [{"title": "x", "project_id": 1}] * 3}, headers=alice.headers)
+    assert r.status_code == 400
+    assert r.get_json()["error"] == "At most 2 items per request"
+
+
+def test_bulk_update(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    a, b = api.tasks(alice, pid, 2)
+    r = client.patch("/tasks/bulk", json={"tasks": [
+        {"id": a, "status": "done"},
+        {"id": a, "status": "todo"},
+        {"id": True, "status": "done"},
+        {"id": 999, "status": "done"},
+        {"id": b, "priority": "urgent"},
+    ]}, headers=alice.headers)
+    body = r.get_json()
+    assert body["updated"] == 1
+    assert [res["status"] for res in body["results"]] == [200, 400, 400, 404, 400]
+    assert client.get(f"/tasks/{a}", headers=alice.headers).get_json()["status"] == "done"
+
+
+@pytest.mark.parametrize("bad_id", [{"a": 1}, [1], True, "1", None, 1.5])
+def test_bulk_delete_rejects_non_integer_ids(client, api, bad_id):
+    alice = api.user()
+    pid = api.project(alice)
+    (tid,) = api.tasks(alice, pid, 1)
+    r = client.delete("/tasks/bulk", json={"ids": [bad_id, tid]}, headers=alice.headers)
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["deleted"] == 1
+    assert body["results"][0] == {"index": 0, "status": 400, "error": "'id' must be an integer"}
+    assert body["results"][1]["status"] == 200
+
+
+def test_bulk_delete_only_own_tasks(client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    mine = api.tasks(alice, api.project(alice), 2)
+    theirs = api.tasks(bob, api.project(bob), 1)
+    r = client.delete("/tasks/bulk", json={"ids": [*mine, *theirs]}, headers=alice.headers)
+    assert r.get_json()["deleted"] == 2
+    assert [res["status"] for res in r.get_json()["results"]] == [200, 200, 404]
+    assert client.get(f"/tasks/{theirs[0]}", headers=bob.headers).status_code == 200
+
+
+def test_export(client, api):
+    alice = api.user()
+    pid = api.project(alice, "Docs")
+    api.tasks(alice, pid, 3)
+    r = client.get("/tasks/export", headers=alice.headers)
+    lines = r.get_data(as_text=True).splitlines()
+    assert r.mimetype == "application/x-ndjson"
+    assert len(lines) == 3
+    r = client.get("/tasks/export?format=csv&status=todo", headers=alice.headers)
+    rows = r.get_data(as_text=True).splitlines()
+    assert rows[0].startswith("id,title")
+    assert len(rows) == 4
+    assert client.get("/tasks/export?format=xml", headers=alice.headers).status_code == 400
+
+
+def test_list_etag(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    tid = api.task(alice, pid)
+    etag = client.get("/tasks/", headers=alice.headers).headers["ETag"]
+    assert client.get("/tasks/", headers={**alice.headers, "If-None-Match": etag}).status_code == 304
+
+    client.patch(f"/tasks/{tid}", json={"title": "Renamed"}, headers=alice.headers)
+    r = client.get("/tasks/", headers={**alice.headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("path", ["/tasks/", "/projects/{pid}"])
+def test_delete_is_not_hidden_by_if_modified_since(client, api, path):
+    alice = api.user()
+    pid = api.project(alice)
+    first, _ = api.tasks(alice, pid, 2)
+    path = path.format(pid=pid)
+    r = client.get(path, headers=alice.headers)
+    # Lists carry only an ETag: a delete moves the count, not the newest updated_at
+    assert "Last-Modified" not in r.headers
+
+    client.delete(f"/tasks/{first}", headers=alice.headers)
+    r = client.get(path, headers={**alice.headers, "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert r.status_code == 200
+
+
+def test_single_task_last_modified(client, api):
+    alice = api.user()
+    tid = api.task(alice, api.project(alice))
+    r = client.get(f"/tasks/{tid}", headers=alice.headers)
+    since = r.headers["Last-Modified"]
+    assert client.get(f"/tasks/{tid}", headers={**alice.headers, "If-Modified-Since": since}).status_code == 304
+
+
+def test_search(client, api):
+    alice = api.user()
+    pid = api.project(alice)
+    api.task(alice, pid, "Fix login page", status="done")
+    api.task(alice, pid, "Write release notes", description="Mention the login fix")
+    api.task(alice, pid, "Review signup flow")
+
+    def titles(query):
+        return [t["title"] for t in client.get(f"/tasks/?{query}", headers=alice.headers).get_json()]
+
+    assert sorted(titles("q=login")) == ["Fix login page", "Write release notes"]
+    assert titles("q=login&status=done") == ["Fix login page"]
+    assert titles("q=nothing") == []
+
+
+def test_stats_counters_match_a_rebuild(app, client, api):
+    alice, bob = api.user("alice"), api.user("bob")
+    pid = api.project(alice)
+    ids = api.tasks(alice, pid, 6, due_date="2000-01-01")
+    api.task(alice, pid, "Assigned", assigned_to=bob.id, priority="high")
+    client.patch(f"/tasks/{ids[0]}", json={"status": "done", "due_date": None}, headers=alice.headers)
+    client.patch("/tasks/bulk", json={"tasks": [{"id": ids[1], "assigned_to": bob.id, "priority": "low"}]},
+                 headers=alice.headers)
+    client.delete(f"/tasks/{ids[2]}", headers=alice.headers)
+    client.delete("/tasks/bulk", json={"ids": [ids[3]]}, headers=alice.headers)
+
+    stats = client.get("/tasks/stats", headers=alice.headers).get_json()
+    assert stats["total"] == 5
+    assert stats["by_status"]["done"] == 1
+    assert stats["by_assignee"] == {str(bob.id): 2, "unassigned": 3}
+    assert stats["overdue"] == 3
+
+    with app.app_context():
+        incremental = project_stats(pid)
+        rebuild(db.session.connection(), [pid])
+        db.session.commit()
+        assert project_stats(pid) == incremental
+    assert client.get(f"/projects/{pid}/stats", headers=alice.headers).get_json()["total"] == 5